@@ -22,6 +22,7 @@ from app.model.symbol_reqeust_model import SymbolRequestModel
 from app.utils.dynamodb.model.stock_symbol_model import StockSymbol, StockSymbol2
 from app.scheduler import auto_trading_scheduler
 from app.utils.auto_trading_bot import AutoTradingBot
+from app.utils.indicator_cache import IndicatorFrameCache
 from app.utils.database import get_db, get_db_session
 from app.utils.crud_sql import SQLExecutor
 from app.utils.dynamodb.model.simulation_history_model import SimulationHistory
@@ -40,6 +41,9 @@ scheduler = BackgroundScheduler(timezone=timezone('Asia/Seoul'))
 
 #3분 간격으로 실행
 #scheduler.add_job(auto_trading_scheduler.scheduled_trading_bnuazz15bot_real_task, 'cron', day_of_week='mon-fri', hour='15', minute='15')# 월~금 3시 10분에 실행
+# 시장 데이터 스냅샷 (15:10 봇 실행 전 일봉/공매도/외인기관 추정치 미리 조회)
+# weeklybot(14:30)은 주봉을 조회해 봉 저장소를 거치지 않으므로 그 전에는 스냅샷을 만들지 않음
+scheduler.add_job(auto_trading_scheduler.market_snapshot_task, 'cron', day_of_week='mon-fri', hour='14', minute='55')  # 15:10 봇 이전 (14시 30분 추정치 입력 이후)
 scheduler.add_job(auto_trading_scheduler.scheduled_trading_schedulerbot_task, 'cron', day_of_week='mon-fri', hour='15', minute='10')  # 월~금 3시 10분에 실행
 scheduler.add_job(auto_trading_scheduler.scheduled_trading_dreaminmindbot_task, 'cron', day_of_week='mon-fri', hour='15', minute='10')  # 월~금 3시 10분에 실행
 #scheduler.add_job(auto_trading_scheduler.scheduled_trading_bnuazz15bot_task, 'cron', day_of_week='mon-fri', hour='15', minute='00') # 월~금 3시 10분에 실행
@@ -114,7 +118,8 @@ async def simulate_single_trade(data: SimulationTradingModel):
         initial_capital = simulation_data.get('initial_capital'),
         take_profit_logic=simulation_data.get("take_profit_logic"),
         stop_loss_logic=simulation_data.get("stop_loss_logic"),
-        indicators=simulation_data.get("indicators")
+        indicators=simulation_data.get("indicators"),
+        use_short_sale=simulation_data.get("use_short_sale")
     )
 
     csv_url = save_df_to_s3(data_df, bucket_name="sb-fsts")
@@ -195,6 +200,7 @@ async def get_simulation_bulk(simulation_id: str):
 
     params_presigned_url = ""
     result_presigned_url = ""
+    history_presigned_url = ""
 
     if status == "completed":
         
@@ -216,12 +222,21 @@ async def get_simulation_bulk(simulation_id: str):
             ExpiresIn=3600
         )
 
+        # 컬럼형 히스토리 (Parquet)
+        history_presigned_url = s3_client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': bucket_name, 'Key': f"simulation-results/{simulation_id}/simulation_history.parquet"},
+            ExpiresIn=3600
+        )
+
     response_dict = {
         "status": status,
         "total_task_cnt": total_task_cnt,
         "completed_task_cnt": completed_task_cnt,
         "params_presigned_url": params_presigned_url,
-        "result_presigned_url": result_presigned_url
+        "result_presigned_url": result_presigned_url,
+        "history_presigned_url": history_presigned_url,
+        "stage_profile": json.loads(item.stage_profile) if item.stage_profile else None
     }
 
     return response_dict
@@ -296,6 +311,16 @@ async def post_price_change_selected(data: SymbolRequestModel):
     presigned_url = save_df_to_s3(df, bucket_name="sb-fsts", folder_prefix="price-change/")
     return {"status": "success", "result_presigned_url": presigned_url}
     
+@app.get("/stock/indicator-cache/stats")
+async def get_indicator_cache_stats():
+    # 지표 캐시 적중/미스 횟수 (이 프로세스 기준)
+    cache = IndicatorFrameCache.default()
+    if cache is None:
+        return {"enabled": False}
+
+    return {"enabled": True, **cache.get_stats()}
+
+
 @app.get("/health")
 async def health_check():
     print('health!!')
@@ -22,4 +22,6 @@ class SimulationTradingBulkModel(BaseModel):
     rsi_sell_threshold: Optional[int]
     rsi_period: Optional[int]
     take_profit_logic: Optional[dict]
-    stop_loss_logic: Optional[dict]
\ No newline at end of file
+    stop_loss_logic: Optional[dict]
+    use_short_sale: Optional[bool] = None  # None 이면 매매 로직 기준으로 자동 판단
+    output_mode: Optional[str] = None  # None 이면 full (종목 × 날짜 전체), sparse 는 매수/매도 + 일별 포트폴리오 평가만 기록
@@ -24,3 +24,4 @@ class SimulationTradingModel(BaseModel):
     take_profit_logic: Optional[dict]
     stop_loss_logic: Optional[dict]
     indicators: Optional[List[dict]]
+    use_short_sale: Optional[bool] = None  # None 이면 매매 로직 기준으로 자동 판단
@@ -3,10 +3,14 @@ from pytz import timezone
 import requests
 import json
 import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from app.utils.database import get_db, get_db_session
 from app.utils.crud_sql import SQLExecutor
 from app.utils.auto_trading_bot import AutoTradingBot
+from app.utils.kis_rate_limiter import KisPriority
 from app.utils.dynamodb.crud import DynamoDBExecutor
 from app.utils.dynamodb.model.auto_trading_balance_model import AutoTradingBalance
 from app.utils.dynamodb.model.stock_symbol_model import StockSymbol, StockSymbol2
@@ -40,6 +44,137 @@ def get_netbuy_summary_by_investor():
     netbuy_summary_by_investor(id='bnuazz15bot_real', virtual = False, trading_bot_name = 'bnuazz15bot_real')
 
 
+def market_snapshot_task():
+    build_market_snapshot(id='schedulerbot', virtual=False)
+
+
+def build_market_snapshot(id, virtual=False, lookback_days=300):
+    """
+    스케줄 봇 실행 전 당일 시장 데이터 스냅샷 생성 (코스닥150)
+    - 일봉/공매도 이력을 로컬 저장소에 채워 두어 봇 실행 시에는 오늘 봉만 추가 조회
+    - 14시 30분 입력 이후면 외인/기관 추정치도 미리 조회해 프로세스 캐시에 저장
+    - 15:10 봇 두 개가 같은 종목 저장소를 동시에 읽으므로 저장소는 종목별 lock / 변경 시에만 저장 (bar_store, short_sale_store)
+    """
+    started_at = time.perf_counter()
+
+    trading_bot = AutoTradingBot(id=id, virtual=virtual)
+
+    end_date = date.today()
+    start_date = end_date - timedelta(days=lookback_days)
+    interval = "day"
+
+    stocks = list(StockSymbol.scan(
+        filter_condition=(StockSymbol.type == 'kosdaq150')
+    ))
+
+    def warm_symbol(stock):
+        try:
+            trading_bot._get_ohlc(stock.symbol, start_date, end_date, interval)
+
+            if trading_bot.short_sale_store is not None:
+                trading_bot.get_short_sale_daily_trend_df_multi(stock.symbol, start_date, end_date)
+
+            return True
+        except Exception as e:
+            print(f"❌ {stock.symbol} 스냅샷 생성 실패: {e}")
+            return False
+
+    max_workers = int(os.getenv("RANKING_FETCH_WORKERS", 8))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        warmed = sum(executor.map(warm_symbol, stocks))
+
+    bars_elapsed = time.perf_counter() - started_at
+
+    # 외인/기관 추정치 (당일 최종 입력이 있는 응답만 캐시됨)
+    try:
+        trading_bot.get_investor_trend_estimates([stock.symbol for stock in stocks])
+    except Exception as e:
+        print(f"❌ 외인/기관 추정치 스냅샷 실패: {e}")
+
+    total_elapsed = time.perf_counter() - started_at
+    print(
+        f"📦 시장 데이터 스냅샷 완료 ({warmed}/{len(stocks)}종목) | 봉/공매도: {bars_elapsed:.2f}s | "
+        f"전체: {total_elapsed:.2f}s | 차트 API 조회: {trading_bot.bar_store.fetch_count if trading_bot.bar_store else '-'}회"
+    )
+
+
+def rank_by_estimated_trade_value(trading_bot, stocks, start_date, end_date, interval):
+    """
+    외인/기관 추정 순매수 기반 예상 거래대금 내림차순으로 종목 정렬
+    - 1단계: 최신 종가를 스레드 풀로 동시 조회
+    - 2단계: 외인/기관 추정치를 비동기로 동시 조회
+    - 종가 조회에 실패한 종목은 -1, 추정치가 없는 종목은 0 으로 정렬 (개별 실패가 전체 정렬을 막지 않음)
+    """
+    started_at = time.perf_counter()
+
+    # 1단계: 최신 종가 조회
+    def get_close_price(stock):
+        try:
+            # OHLC 데이터 가져오기 (최신 종가용)
+            ohlc_data = trading_bot._get_ohlc(stock.symbol, start_date, end_date, interval)
+            if not ohlc_data:
+                print(f"❌ {stock.symbol} OHLC 데이터 없음")
+                return None
+
+            # 가장 마지막 종가
+            return ohlc_data[-1].close
+        except Exception as e:
+            print(f"❌ {stock.symbol} 종가 조회 실패: {e}")
+            return None
+
+    max_workers = int(os.getenv("RANKING_FETCH_WORKERS", 8))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        close_prices = list(executor.map(get_close_price, stocks))
+
+    price_elapsed = time.perf_counter() - started_at
+
+    # 2단계: 외인/기관 추정치 조회 (종가가 있는 종목만)
+    symbols = [stock.symbol for stock, close_price in zip(stocks, close_prices) if close_price is not None]
+    try:
+        estimates = trading_bot.get_investor_trend_estimates(symbols)
+    except Exception as e:
+        print(f"❌ 외인/기관 추정치 조회 실패: {e}")
+        estimates = {}
+
+    estimate_elapsed = time.perf_counter() - started_at - price_elapsed
+
+    # 3단계: 예상 거래대금 계산
+    trade_values = []
+    for stock, close_price in zip(stocks, close_prices):
+        if close_price is None:
+            trade_values.append(-1)
+            continue
+
+        api_response = estimates.get(stock.symbol)
+        if api_response is None:
+            # 기존 순차 조회와 동일하게 응답이 없으면 거래대금 0
+            print(f"❌ API 응답이 None입니다: symbol={stock.symbol}")
+            trade_values.append(0)
+            continue
+
+        # 외국인+기관 순매수 기반 거래대금 계산
+        trade_value = trading_bot.calculate_trade_value_from_fake_qty(
+            api_response=api_response,
+            close_price=close_price,
+            symbol=stock.symbol
+        )
+
+        print(f"📊 {stock.symbol_name} | 종가: {close_price:,} | 예상 거래대금: {trade_value:,}원")
+        trade_values.append(trade_value)
+
+    # ✅ 거래대금 기준 내림차순 정렬 (같은 값은 기존 순서 유지)
+    order = sorted(range(len(stocks)), key=lambda i: trade_values[i], reverse=True)
+    sorted_stocks = [stocks[i] for i in order]
+
+    total_elapsed = time.perf_counter() - started_at
+    print(
+        f"⏱️ 종목 정렬 완료 ({len(stocks)}종목) | 종가 조회: {price_elapsed:.2f}s | "
+        f"외인/기관 추정치 조회: {estimate_elapsed:.2f}s | 전체: {total_elapsed:.2f}s"
+    )
+
+    return sorted_stocks
+
+
 def scheduled_trading(id, virtual = False, trading_bot_name = 'schedulerbot', sorting = 'trade_volume'):
     
     # TO-DO
@@ -57,42 +192,9 @@ def scheduled_trading(id, virtual = False, trading_bot_name = 'schedulerbot', so
         filter_condition=(StockSymbol.type == 'kosdaq150')
     ))
 
-    # ✅ 거래대금 기준 정렬 함수
-    def get_estimated_trade_value(stock):
-        try:
-            
-            symbol = stock.symbol
-
-            # OHLC 데이터 가져오기 (최신 종가용)
-            ohlc_data = trading_bot._get_ohlc(symbol, start_date, end_date, interval)
-            if not ohlc_data:
-                print(f"❌ {symbol} OHLC 데이터 없음")
-                return -1
-
-            # 가장 마지막 종가
-            last_candle = ohlc_data[-1]
-            close_price = last_candle.close
-
-            # 외국인+기관 순매수 기반 거래대금 계산
-            trade_value = trading_bot.calculate_trade_value_from_fake_qty(
-                api_response=None,  # 내부에서 API 호출함
-                close_price=close_price,
-                symbol=symbol
-            )
-
-            print(f"📊 {stock.symbol_name} | 종가: {close_price:,} | 예상 거래대금: {trade_value:,}원")
-            return trade_value
-        except Exception as e:
-            print(f"❌ {stock.symbol} 거래대금 계산 실패: {e}")
-            return -1
-
     if sorting == 'trade_volume':
-        # ✅ 거래대금 기준 내림차순 정렬
-        sorted_symbols = sorted(
-            result,
-            key=lambda stock: get_estimated_trade_value(stock),
-            reverse=True
-        )
+        # ✅ 거래대금 기준 내림차순 정렬 (종가/외인기관 추정치 동시 조회)
+        sorted_symbols = rank_by_estimated_trade_value(trading_bot, result, start_date, end_date, interval)
     else:
         sorted_symbols = result
 
@@ -124,6 +226,7 @@ def scheduled_trading(id, virtual = False, trading_bot_name = 'schedulerbot', so
 
     # ✅ scheduled_trading 시작 시 잔고 조회
     account = trading_bot.kis.account()
+    trading_bot._wait_kis_rate_limit('balance', KisPriority.ORDER, account=True)
     balance: KisBalance = account.balance()
     
     print(f'------ {trading_bot_name}의 계좌 익절/손절이 완료되었습니다. 이제부터 주식 자동 트레이딩을 시작합니다!')            
@@ -246,6 +349,7 @@ def netbuy_summary_by_investor(id, virtual, trading_bot_name):
 
     # 3. 계좌 잔고 조회
     kis_account = trading_bot.kis.account()
+    trading_bot._wait_kis_rate_limit('balance', KisPriority.ORDER, account=True)
     kis_balance: KisBalance = kis_account.balance()
 
     # 4. 보유 종목 필터링 (수량 > 0)
@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 import numpy as np
 import pandas as pd
@@ -6,6 +7,9 @@ import math
 import json
 import os
 import boto3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
 
 from pykis import PyKis, KisChart, KisStock, KisQuote, KisAccessToken, KisOrderableAmount
 from datetime import datetime, date, time, timedelta
@@ -13,6 +17,19 @@ import mplfinance as mpf
 from pytz import timezone
 from app.utils.dynamodb.model.simulation_history_model import SimulationHistory
 from app.utils.technical_indicator import TechnicalIndicator
+from app.utils.level_tracker import ConfirmedLevelTracker
+from app.utils.trading_signal import TradingSignals
+from app.utils.bar_store import OhlcBar, OhlcBarStore
+from app.utils.short_sale_store import ShortSaleStore
+from app.utils.kis_rate_limiter import KisPriority, get_kis_rate_limiter
+from app.utils.kis_client import KisHttpClient, AsyncKisHttpClient, KIS_REAL_DOMAIN, KIS_VIRTUAL_DOMAIN
+from app.utils.symbol_prep import to_ohlc_bars, get_indicator_df, prepare_symbols, attach_panel_indicators
+from app.utils.indicator_dependency import resolve_indicators
+from app.utils.simulation_history import OUTPUT_MODES, PortfolioEquityCurve, SimulationHistoryColumns
+from app.utils.simulation_progress import SimulationProgressReporter
+from app.utils.simulation_checkpoint import SimulationCheckpointStore
+from app.utils.stage_profiler import StageProfiler
+from app.utils.sampled_logger import get_logger
 from app.utils.webhook import Webhook
 from app.utils.trading_logic import TradingLogic
 from app.utils.crud_sql import SQLExecutor
@@ -32,10 +49,21 @@ indicator = TechnicalIndicator()
 logic = TradingLogic()
 webhook = Webhook()
 
+# 공매도 컬럼을 읽지 않는 로직 (rsi 컬럼만 전달받음) → 이 로직들만 쓰면 공매도 조회 생략
+SHORT_SALE_FREE_LOGICS = {'rsi_trading', 'rsi_trading2'}
+
+# 종목×일 루프 로그 (SIM_LOG_LEVEL / SIM_LOG_RATE_PER_SEC / SIM_LOG_SAMPLE_EVERY / SIM_LOG_FORMAT)
+logger = get_logger("auto_trading_bot")
+
 class AutoTradingBot:
     """
         실전투자와 모의투자를 선택적으로 설정 가능
     """
+
+    # (날짜, 종목코드) → 당일 최종(14시 30분 입력) 외인기관 추정 응답, 같은 프로세스의 봇들이 공유
+    _investor_estimate_cache = {}
+    _investor_estimate_cache_lock = threading.Lock()
+
     def __init__(self, id, virtual=False, app_key=None, secret_key=None, account=None):
 
         result = list(UserInfo.scan(
@@ -66,6 +94,20 @@ class AutoTradingBot:
                 self.secret_key = secret_key
                 self.account = account
 
+        # 로컬 OHLC 봉 저장소 (OHLC_BAR_STORE_ENABLED=false 이면 매번 KIS 조회)
+        if os.getenv("OHLC_BAR_STORE_ENABLED", "true").lower() == "true":
+            self.bar_store = OhlcBarStore()
+        else:
+            self.bar_store = None
+
+        # 로컬 공매도 저장소 및 동시 조회 설정
+        if os.getenv("SHORT_SALE_STORE_ENABLED", "true").lower() == "true":
+            self.short_sale_store = ShortSaleStore()
+        else:
+            self.short_sale_store = None
+
+        self.short_sale_fetch_workers = int(os.getenv("SHORT_SALE_FETCH_WORKERS", 4))
+
         # PyKis 객체 생성
         self.create_kis_object()    
 
@@ -129,23 +171,60 @@ class AutoTradingBot:
         )
 
     # 봉 데이터를 가져오는 함수
-    def _get_ohlc(self, symbol, start_date, end_date, interval='day', mode="default"):
+    def _wait_kis_rate_limit(self, endpoint, priority=KisPriority.MARKET_DATA, tokens=1, account=False):
+        """
+        KIS 요청 전 프로세스 전역 제한기 대기
+        - account=True (주문/계좌 조회) 이면 모의투자 시 모의 도메인 제한기 사용
+        """
+        get_kis_rate_limiter(virtual=self.virtual and account).acquire(endpoint, priority, tokens)
+
+    def _fetch_ohlc(self, symbol, start_date, end_date, interval='day'):
+        # pykis 차트 조회는 100봉 단위로 나눠 요청하므로 기간만큼 토큰 사용
+        days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days
+        self._wait_kis_rate_limit('chart', KisPriority.MARKET_DATA, tokens=max(1, math.ceil(days / 140)))
+
         symbol_stock: KisStock = self.kis.stock(symbol)  # SK하이닉스 (코스피)
         chart: KisChart = symbol_stock.chart(
             start=start_date,
             end=end_date,
             period=interval
         ) # 2023년 1월 1일부터 2023년 12월 31일까지의 일봉입니다.
-        klines = chart.bars
+        return chart.bars
+
+    def _get_ohlc(self, symbol, start_date, end_date, interval='day', mode="default"):
+        # ✅ 로컬 봉 저장소에 없는 구간만 KIS에서 조회
+        if self.bar_store is not None and self.bar_store.supports(interval):
+            klines = self.bar_store.get_bars(
+                symbol, start_date, end_date, interval,
+                fetch=lambda start, end: self._fetch_ohlc(symbol, start, end, interval)
+            )
+        else:
+            klines = self._fetch_ohlc(symbol, start_date, end_date, interval)
 
         # 첫 번째 데이터를 제외하고, 각 항목의 open 값을 전날 close 값으로 변경 
         # mode = continuous
         if mode == 'continuous':
             for i in range(1, len(klines)):
-                klines[i].open = klines[i - 1].close  # 전날의 close로 open 값을 변경
+                if isinstance(klines[i], OhlcBar):
+                    klines[i] = klines[i]._replace(open=klines[i - 1].close)  # 전날의 close로 open 값을 변경
+                else:
+                    klines[i].open = klines[i - 1].close  # 전날의 close로 open 값을 변경
             
         return klines
 
+    def _build_date_index(self, ohlc_data):
+        """
+        봉 데이터의 정규화된 날짜 → 봉 위치(index) 매핑을 한 번만 생성
+        - 시뮬레이션 루프에서 날짜 존재 여부 확인과 캔들 조회를 O(1)로 처리
+        - df는 ohlc_data 순서 그대로 생성되므로 같은 위치를 df 행 위치로도 사용 가능
+        """
+        date_index = {}
+        for i, c in enumerate(ohlc_data):
+            # 같은 날짜가 여러 개면 첫 번째 봉 사용 (기존 next() 조회와 동일)
+            date_index.setdefault(pd.Timestamp(c.time).tz_localize(None).normalize(), i)
+
+        return date_index
+
     def calculate_pnl(self, trading_history, current_price, trade_amount):
         """Parameters:
         - trading_history: dict, 거래 내역 및 계산 결과 저장
@@ -233,7 +312,7 @@ class AutoTradingBot:
     def simulate_trading(
             self, symbol, stock_name, stock_type, start_date, end_date, target_trade_value_krw, target_trade_value_ratio, min_trade_value, buy_trading_logic=None, sell_trading_logic=None,
             interval='day', buy_percentage = None, ohlc_mode = 'default', initial_capital=None, rsi_period = 25, take_profit_logic=None, 
-            stop_loss_logic=None, indicators=None
+            stop_loss_logic=None, indicators=None, use_short_sale=None
         ):
 
         valid_symbols = []
@@ -245,15 +324,25 @@ class AutoTradingBot:
         # ✅ OHLC 데이터 가져오기
         ohlc_data = self._get_ohlc(symbol, start_date_for_ohlc, end_date, interval, ohlc_mode)
         
-        df = self._create_ohlc_df(ohlc_data=ohlc_data, symbol = symbol, start_date=start_date_for_ohlc, end_date=end_date, indicators=indicators, rsi_period=rsi_period)
+        df = self._create_ohlc_df(
+            ohlc_data=ohlc_data, symbol = symbol, start_date=start_date_for_ohlc, end_date=end_date, indicators=indicators, rsi_period=rsi_period,
+            use_short_sale=self._needs_short_sale(buy_trading_logic, sell_trading_logic, use_short_sale),
+            required_indicators=resolve_indicators(buy_trading_logic, sell_trading_logic, indicators, chart=True),
+            interval=interval
+        )
 
-        print(f" df2: {df}" )
+        # ✅ df 전체 출력은 종목마다 수천 줄 → 크기만 디버그 로그
+        logger.debug(f"🔍 차트 df: {symbol}", key="chart_df", rows=len(df), columns=len(df.columns))
         
         valid_symbol['symbol'] = symbol
         valid_symbol['stock_name'] = stock_name
         valid_symbol['stock_type'] = stock_type
         valid_symbol['ohlc_data'] = ohlc_data
+        valid_symbol['date_index'] = self._build_date_index(ohlc_data)
+        valid_symbol['level_tracker'] = ConfirmedLevelTracker(df, lookback_next=5)
+        valid_symbol['high_trendline'] = indicator.cal_high_trendline_series(df)
         valid_symbol['df'] = df
+        valid_symbol['signals'] = self._create_trading_signals(valid_symbol, buy_trading_logic, sell_trading_logic)
 
         valid_symbols.append(valid_symbol)
 
@@ -295,8 +384,7 @@ class AutoTradingBot:
 
         # 공통된 모든 날짜 모으기
         all_dates = set()
-        dates = [pd.Timestamp(c.time).tz_localize(None).normalize() for c in ohlc_data]
-        all_dates.update(d for d in dates if d >= start_date)
+        all_dates.update(d for d in valid_symbol['date_index'] if d >= start_date)
 
         holding = {
             'symbol': symbol,
@@ -333,38 +421,32 @@ class AutoTradingBot:
                 s = next((s for s in symbols if s['symbol'] == symbol), None)
 
                 if s is None:
-                    print(f"❌ 해당 symbol 종목이 없습니다: {symbol}")
+                    logger.warning(f"❌ 해당 symbol 종목이 없습니다: {symbol}", key="symbol_missing")
                     continue  # 해당 symbol 종목이 없으면 건너뜀
 
                 df = s['df']
                 ohlc_data = s['ohlc_data']
                 stock_name = s['stock_name']
 
-                if not any(pd.Timestamp(c.time).tz_localize(None).normalize() == current_date for c in ohlc_data):
+                # ✅ 날짜 → 봉 위치 인덱스로 O(1) 조회
+                candle_idx = s['date_index'].get(current_date)
+                if candle_idx is None:
                     continue
                                     
-                df = df[df.index <= pd.Timestamp(current_date)]
-
                 # 🔍 현재 row 위치
-                current_idx = len(df) - 1
+                current_idx = candle_idx
 
-                lookback_next = 5
-                # ✅ 현재 시점까지 확정된 지지선만 사용
-                support = self.get_latest_confirmed_support(df, current_idx=current_idx, lookback_next = lookback_next)
-                resistance = self.get_latest_confirmed_resistance(df, current_idx=current_idx, lookback_next = lookback_next)
-                high_trendline = indicator.get_latest_trendline_from_highs(df, current_idx=current_idx)
-                
                 # ✅ 아무 데이터도 없으면 조용히 빠져나가기
-                if df.empty or len(df) < 2:
+                if current_idx < 1:
                     continue
 
                 # candle_time = df.index[-1]
-                candle = next(c for c in ohlc_data if pd.Timestamp(c.time).tz_localize(None) == current_date)
+                candle = ohlc_data[candle_idx]
                 close_price = float(candle.close)
                 
                 timestamp_str = current_date.date().isoformat()
                 
-                print(f"💰 시뮬 중: {symbol} / 날짜: {timestamp_str} / 사용가능한 예수금: {global_state['krw_balance']:,}")
+                logger.debug(f"💰 시뮬 중: {symbol}", key="sim_progress", 날짜=timestamp_str, 사용가능한_예수금=global_state['krw_balance'])
 
                 trade_quantity = 0
                 realized_pnl = None
@@ -522,16 +604,7 @@ class AutoTradingBot:
                         simulation_histories.append(trading_history)
 
                 # ✅ 매도 조건 (익절/손절 먼저 처리됨, 이 블럭은 전략 로직 기반 매도)
-                sell_logic_reasons = self._get_trading_logic_reasons(
-                    trading_logics=sell_trading_logic,
-                    symbol=symbol,
-                    candle=candle,
-                    ohlc_df=df,
-                    trade_type='SELL',
-                    support = support,
-                    resistance = resistance,
-                    high_trendline = high_trendline
-                )
+                sell_logic_reasons = s['signals'].get_reasons('SELL', current_idx)
 
                 # ✅ 매도 실행
                 if len(sell_logic_reasons) > 0 and holding['total_quantity'] > 0:
@@ -597,31 +670,25 @@ class AutoTradingBot:
                 # 알맞은 종목 찾기
                 holding = next((h for h in global_state['account_holdings'] if h['symbol'] == symbol), None)
 
-                if not any(pd.Timestamp(c.time).tz_localize(None).normalize() == current_date for c in ohlc_data):
+                # ✅ 날짜 → 봉 위치 인덱스로 O(1) 조회
+                candle_idx = s['date_index'].get(current_date)
+                if candle_idx is None:
                     continue
                                     
-                df = df[df.index <= pd.Timestamp(current_date)]
-
                 # 🔍 현재 row 위치
-                current_idx = len(df) - 1
+                current_idx = candle_idx
 
-                lookback_next = 5
-                # ✅ 현재 시점까지 확정된 지지선만 사용
-                support = self.get_latest_confirmed_support(df, current_idx=current_idx, lookback_next = lookback_next)
-                resistance = self.get_latest_confirmed_resistance(df, current_idx=current_idx, lookback_next = lookback_next)
-                high_trendline = indicator.get_latest_trendline_from_highs(df, current_idx=current_idx)
-                
                 # ✅ 아무 데이터도 없으면 조용히 빠져나가기
-                if df.empty or len(df) < 2:
+                if current_idx < 1:
                     continue
 
                 # candle_time = df.index[-1]
-                candle = next(c for c in ohlc_data if pd.Timestamp(c.time).tz_localize(None) == current_date)
+                candle = ohlc_data[candle_idx]
                 close_price = float(candle.close)
                 
                 timestamp_str = current_date.date().isoformat()
                 
-                print(f"💰 시뮬 중: {symbol} / 날짜: {timestamp_str} / 사용가능한 예수금: {global_state['krw_balance']:,}")
+                logger.debug(f"💰 시뮬 중: {symbol}", key="sim_progress", 날짜=timestamp_str, 사용가능한_예수금=global_state['krw_balance'])
 
                 trade_quantity = 0
                 realized_pnl = None
@@ -645,16 +712,7 @@ class AutoTradingBot:
                 holding['close_price'] = close_price
                 
                 # ✅ 매수 조건
-                buy_logic_reasons = self._get_trading_logic_reasons(
-                    trading_logics=buy_trading_logic,
-                    symbol=symbol,
-                    candle=candle,
-                    ohlc_df=df,
-                    trade_type='BUY',
-                    support = support,
-                    resistance = resistance,
-                    high_trendline = high_trendline
-                )
+                buy_logic_reasons = s['signals'].get_reasons('BUY', current_idx)
 
                 # ✅ 직접 지정된 target_trade_value_krw가 있으면 사용, 없으면 비율로 계산
                 if target_trade_value_krw and target_trade_value_krw > 0:
@@ -809,10 +867,12 @@ class AutoTradingBot:
         except (TypeError, ValueError):
             return 0.0  # 또는 np.nan
     
-    def simulate_trading_bulk(self, simulation_settings):
-
-        buy_percentage = simulation_settings.get("buy_percentage", None)
-
+    def _prepare_bulk_symbols(self, simulation_settings, profiler):
+        """
+        일괄 시뮬레이션 종목 준비 (OHLC/공매도 조회 → 지표/지지·저항선/추세선/매매 신호 계산)
+        - 반환: (유효 종목 목록, 실패 종목 이름 set)
+        - 단계별 소요 시간은 profiler 에 기록 (워커 단계는 'prep.' 접두어, 워커 시간 합계)
+        """
         valid_symbols = []
 
         start_date = simulation_settings["start_date"] - timedelta(days=180)
@@ -820,35 +880,132 @@ class AutoTradingBot:
         interval = simulation_settings["interval"]
 
         failed_stocks = set()  # 중복 제거 자동 처리
-        
-        # 사전에 계산된 OHLC 데이터와 DataFrame을 저장 (api 이슈)
+
+        rsi_period = simulation_settings['rsi_period']
+        stock_type_map = simulation_settings['stock_type']
+        buy_trading_logic = simulation_settings["buy_trading_logic"]
+        sell_trading_logic = simulation_settings["sell_trading_logic"]
+        simulation_start_date = pd.Timestamp(simulation_settings["start_date"]).normalize()
+        use_short_sale = self._needs_short_sale(buy_trading_logic, sell_trading_logic, simulation_settings.get("use_short_sale"))
+        required_indicators = resolve_indicators(buy_trading_logic, sell_trading_logic)
+
+        # 종목별 계산 워커 수 (기본 1 = 현재 프로세스에서 순차 계산, 병렬은 prep_workers / SIMULATION_PREP_WORKERS 로 지정)
+        prep_workers = simulation_settings.get("prep_workers") or int(os.getenv("SIMULATION_PREP_WORKERS", 1))
+
+        # 1단계: OHLC/공매도 데이터 조회 (api 이슈로 메인 프로세스에서 순차 조회)
+        prep_symbols = []
+        prep_tasks = []
         for stock_name, symbol in simulation_settings["selected_symbols"].items():
-            
-            valid_symbol = {}
             try:
                 # ✅ OHLC 데이터 가져오기
-                ohlc_data = self._get_ohlc(symbol, start_date, end_date, interval)
-                rsi_period = simulation_settings['rsi_period']
-                
-                df = self._create_ohlc_df(ohlc_data=ohlc_data, symbol = symbol, start_date=start_date, end_date=end_date, rsi_period=rsi_period)
-                
-                        # ✅ type 가져오기
-                stock_type_map = simulation_settings['stock_type']
-                stock_type = stock_type_map.get(symbol, "unknown")
-        
-                # 유효한 종목만 저장
-                valid_symbol['symbol'] = symbol
-                valid_symbol['stock_name'] = stock_name
-                valid_symbol['ohlc_data'] = ohlc_data
-                valid_symbol['df'] = df
-                valid_symbol['stock_type'] = stock_type
+                with profiler.stage('ohlc_fetch'):
+                    ohlc_data = self._get_ohlc(symbol, start_date, end_date, interval)
 
-                valid_symbols.append(valid_symbol)
+                if use_short_sale:
+                    with profiler.stage('short_sale_fetch'):
+                        short_df = self._get_short_sale_df(symbol, start_date, end_date)
+                else:
+                    short_df = None
+
+                date_index = self._build_date_index(ohlc_data)
+                start_idx = next((i for d, i in date_index.items() if d >= simulation_start_date), len(ohlc_data))
+
+                prep_symbols.append({
+                    'symbol': symbol,
+                    'stock_name': stock_name,
+                    'ohlc_data': ohlc_data,
+                    'date_index': date_index,
+                })
+                prep_tasks.append({
+                    'symbol': symbol,
+                    'interval': interval,
+                    'ohlc_data': to_ohlc_bars(ohlc_data),
+                    'short_df': short_df,
+                    'rsi_period': rsi_period,
+                    'buy_trading_logic': buy_trading_logic,
+                    'sell_trading_logic': sell_trading_logic,
+                    'start_idx': start_idx,
+                    'required_indicators': required_indicators,
+                })
 
             except Exception as e:
+                print(f'{stock_name} 데이터 조회 실패. 사유 : {str(e)}')
+                failed_stocks.add(stock_name)
+
+        # 2단계: 전 종목 공통 지표(EMA/SMA/RSI/MACD/Stochastic/Bollinger)를 패널 모드로 한 번에 계산
+        if prep_tasks and os.getenv("INDICATOR_PANEL_ENABLED", "true").lower() == "true":
+            with profiler.stage('indicator_panel'):
+                attach_panel_indicators(prep_tasks)
+
+        # 3단계: 나머지 지표/지지·저항선/추세선/매매 신호를 프로세스 풀에서 종목별 계산
+        with profiler.stage('symbol_prep'):
+            prep_results = prepare_symbols(prep_tasks, max_workers=prep_workers)
+
+        for result, error in prep_results:
+            if error is None:
+                profiler.merge({f"prep.{name}": stage for name, stage in result.get('stage_profile', {}).items()})
+
+        # 사전에 계산된 OHLC 데이터와 신호 테이블을 저장 (입력 종목 순서 유지)
+        for prep_symbol, (result, error) in zip(prep_symbols, prep_results):
+            stock_name = prep_symbol['stock_name']
+
+            if error is not None:
                 # 지표 계산에 실패한 종목 리스트
-                print(f'{stock_name} 지표 계산 실패. 사유 : {str(e)}')
+                print(f'{stock_name} 지표 계산 실패. 사유 : {str(error)}')
                 failed_stocks.add(stock_name)
+                continue
+
+            # 유효한 종목만 저장
+            valid_symbol = prep_symbol
+            valid_symbol['signals'] = TradingSignals.from_arrays(
+                {'BUY': buy_trading_logic, 'SELL': sell_trading_logic}, result['signals']
+            )
+            # ✅ type 가져오기
+            valid_symbol['stock_type'] = stock_type_map.get(valid_symbol['symbol'], "unknown")
+
+            valid_symbols.append(valid_symbol)
+
+        cache_hits = sum(1 for result, error in prep_results if error is None and result.get('cache_hit'))
+        print(f"📦 지표 캐시 적중: {cache_hits}/{len(prep_results)} 종목")
+
+        return valid_symbols, failed_stocks
+
+    def simulate_trading_bulk(self, simulation_settings, checkpoint_store=None, progress_writer=None, profiler=None):
+
+        # 단계별 소요 시간 (task_job 에서 넘기면 S3/DynamoDB 저장 단계까지 이어서 기록)
+        profiler = profiler if profiler is not None else StageProfiler()
+
+        buy_percentage = simulation_settings.get("buy_percentage", None)
+
+        # 결과 기록 방식 (full: 종목 × 날짜 전체, sparse: 매수/매도 + 일별 포트폴리오 평가)
+        output_mode = simulation_settings.get("output_mode") or os.getenv("SIMULATION_OUTPUT_MODE", "full")
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"지원하지 않는 output_mode: {output_mode} (가능: {OUTPUT_MODES})")
+
+        # 체크포인트 (같은 simulation_id 로 다시 실행되면 마지막 저장 지점부터 재개)
+        checkpoint_fingerprint = SimulationCheckpointStore.fingerprint(simulation_settings) if checkpoint_store is not None else None
+        if checkpoint_store is not None:
+            with profiler.stage('checkpoint_load'):
+                prepared = checkpoint_store.load('prepared', checkpoint_fingerprint)
+        else:
+            prepared = None
+
+        if prepared is not None:
+            # 조회/지표/신호 계산이 끝난 종목 데이터 복원 (KIS 조회, 지표 계산 생략)
+            valid_symbols = prepared['valid_symbols']
+            failed_stocks = set(prepared['failed_stocks'])
+            print(f"♻️ 체크포인트에서 종목 데이터 복원: {len(valid_symbols)} 종목")
+        else:
+            valid_symbols, failed_stocks = self._prepare_bulk_symbols(simulation_settings, profiler)
+
+            if checkpoint_store is not None:
+                started = perf_counter()
+                size = checkpoint_store.save('prepared', checkpoint_fingerprint, {
+                    # pykis 봉 객체 대신 pickle 가능한 OhlcBar 로 저장
+                    'valid_symbols': [{**symbol, 'ohlc_data': to_ohlc_bars(symbol['ohlc_data'])} for symbol in valid_symbols],
+                    'failed_stocks': sorted(failed_stocks),
+                })
+                profiler.add('checkpoint_save', perf_counter() - started, bytes=size)
                         
         # ✅ 세션 상태에 저장
         simulation_settings["selected_symbols"] = valid_symbols #simulation_settings["selected_symbols"]에 type 추가되도 괜찮?
@@ -859,7 +1016,6 @@ class AutoTradingBot:
         min_trade_value = simulation_settings.get("min_trade_value", 0)
 
         account_holdings = []
-        simulation_histories = []
 
         # account
         global_state = {
@@ -889,14 +1045,12 @@ class AutoTradingBot:
         # 공통된 모든 날짜 모으기
         all_dates = set()
         for symbol in symbols:
-            ohlc_data = symbol['ohlc_data']
-            dates = [pd.Timestamp(c.time).tz_localize(None).normalize() for c in ohlc_data]
-            all_dates.update(d for d in dates if d >= start_date)
+            all_dates.update(d for d in symbol['date_index'] if d >= start_date)
 
             holding_dict = {
                 'symbol': symbol['symbol'],
-                'stock_name': stock_name,
-                'stock_type': stock_type,
+                'stock_name': symbol['stock_name'],
+                'stock_type': symbol['stock_type'],
                 'timestamp_str': "",
                 'close_price': 0,
                 'total_quantity': 0,
@@ -921,417 +1075,251 @@ class AutoTradingBot:
 
         date_range = sorted(list(all_dates))  # 날짜 정렬
 
-        # total count 반영
-        dynamodb_executor = DynamoDBExecutor()
-
-        pk_name = 'simulation_id'
+        # 히스토리는 종목 × 날짜 크기로 미리 할당한 컬럼 배열에 기록 (sparse 는 매매 행만 기록하므로 작게 시작)
+        simulation_histories = SimulationHistoryColumns(
+            capacity=len(symbols) * len(date_range) if output_mode == 'full' else 1024
+        )
 
-        # 한국 시간대
-        kst = timezone("Asia/Seoul")
-        # 현재 시간을 KST로 변환
-        current_time = datetime.now(kst)
-        updated_at = int(current_time.timestamp() * 1000)  # ✅ 밀리세컨드 단위로 SK 생성
-        updated_at_dt = current_time.strftime("%Y-%m-%d %H:%M:%S")
-        completed_task_cnt = 0
+        # 일별 포트폴리오 평가 (예수금 + 보유 종목 평가금액)
+        equity_curve = PortfolioEquityCurve(global_state['initial_capital'], capacity=len(date_range))
 
-        data_model = SimulationHistory(
+        # 저장된 진행 상태가 있으면 다음 날짜부터 재개
+        resume_idx = 0
+        if checkpoint_store is not None:
+            with profiler.stage('checkpoint_load'):
+                state = checkpoint_store.load('state', checkpoint_fingerprint)
+        else:
+            state = None
+        if state is not None and state['date_cnt'] == len(date_range):
+            resume_idx = state['next_idx']
+            global_state = state['global_state']
+            simulation_histories = state['simulation_histories']
+            equity_curve = state['equity_curve']
+            print(f"♻️ 체크포인트에서 재개: {date_range[resume_idx].date()} ({resume_idx}/{len(date_range)})")
+
+        # total count / 진행률은 메모리에 기록하고 백그라운드 스레드가 주기적으로 DynamoDB 에 반영
+        # progress_writer: 진행률 기록 함수 (None 이면 DynamoDB, 벤치마크 등 AWS 없이 실행할 때 지정)
+        progress_reporter = SimulationProgressReporter(
             simulation_id=simulation_settings['simulation_id'],
-            updated_at=updated_at,
-            updated_at_dt=updated_at_dt,
-            total_task_cnt=len(date_range)
-        )
-
-        result = dynamodb_executor.execute_update(data_model, pk_name)
+            total_task_cnt=len(date_range),
+            writer=progress_writer
+        ).start()
+        progress_reporter.advance(resume_idx)
    
         # ✅ 시뮬레이션 시작
-        for idx, current_date in enumerate(date_range): # ✅ 하루 기준 고정 portfolio_value 계산 (종목별 보유 상태 반영)            
-            for holding in global_state['account_holdings']:
-                symbol = holding['symbol']
-
-                # symbols 리스트에서 해당 symbol과 일치하는 s 찾기
-                s = next((s for s in symbols if s['symbol'] == symbol), None)
-
-                if s is None:
-                    print(f"❌ 해당 symbol 종목이 없습니다: {symbol}")
-                    continue  # 해당 symbol 종목이 없으면 건너뜀
-
-                df = s['df']
-                ohlc_data = s['ohlc_data']
-                stock_name = s['stock_name']
-                stock_type = s['stock_type']
-
-                if not any(pd.Timestamp(c.time).tz_localize(None).normalize() == current_date for c in ohlc_data):
-                    continue
-                                    
-                df = df[df.index <= pd.Timestamp(current_date)]
-    
-                # 🔍 현재 row 위치
-                current_idx = len(df) - 1
-
-                lookback_next = 5
-                # ✅ 현재 시점까지 확정된 지지선만 사용
-                support = self.get_latest_confirmed_support(df, current_idx=current_idx, lookback_next=lookback_next)
-                resistance = self.get_latest_confirmed_resistance(df, current_idx=current_idx, lookback_next=lookback_next)
-                high_trendline = indicator.get_latest_trendline_from_highs(df, current_idx=current_idx)
-                
-                # ✅ 아무 데이터도 없으면 조용히 빠져나가기
-                if df.empty or len(df) < 2:
-                    continue
-
-                # candle_time = df.index[-1]
-                candle = next(c for c in ohlc_data if pd.Timestamp(c.time).tz_localize(None) == current_date)
-                close_price = float(candle.close)
-                
-                timestamp_str = current_date.date().isoformat()
-                
-                print(f"💰 시뮬 중: {symbol} / 날짜: {timestamp_str} / 사용가능한 예수금: {global_state['krw_balance']:,}")
-
-                trade_quantity = 0
-                realized_pnl = None
-                sell_yn = False
-                buy_yn = False
-                total_buy_cost = 0
-                
-                buy_fee = 0
-                sell_fee = 0
-                tax = 0
-
-                #익절, 손절
-                take_profit_hit = False
-                stop_loss_hit = False
-                
-                buy_logic_reasons = []
-                sell_logic_reasons = []
-                
-                # 데이터 최신화
-                holding['timestamp_str'] = timestamp_str
-                holding['close_price'] = close_price
-
-                # ✅ 익절/손절 조건 우선 적용
-                if holding['total_quantity'] > 0:
-                    current_roi = ((close_price - holding['avg_price']) / holding['avg_price']) * 100
-
-                    # 익절 조건 계산
-                    if take_profit_logic_name == 'fixed': # 고정 비율 익절
-                        target_roi = current_roi
-                    elif take_profit_logic_name == 'trailing': # 종가 최고점 기준으로 roi 계산
-                        if holding['stop_loss_logic']['max_close_price'] > 0:
-                            target_roi = ((close_price - holding['stop_loss_logic']['max_close_price'] ) / holding['stop_loss_logic']['max_close_price'] ) * 100
-                    else:
-                        target_roi = current_roi
-
-                    # 익절 조건
-                    if use_take_profit and target_roi >= take_profit_ratio:
-                        # 실제 매도 조건 충족
-                        fee = holding['total_quantity'] * close_price * 0.00014
-                        tax = holding['total_quantity'] * close_price * 0.0015
-                        revenue = holding['total_quantity'] * close_price - fee - tax
-                        realized_pnl = revenue - (holding['avg_price'] * holding['total_quantity'])
-                        realized_roi = (realized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
-                        unrealized_pnl = (close_price - holding['avg_price']) * holding['total_quantity']
-                        unrealized_roi = (unrealized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
-
-                        global_state['krw_balance'] += revenue
-
-                        trade_quantity = holding['total_quantity']
-
-                        holding['total_quantity'] = 0
-                        holding['total_buy_cost'] = 0
-                        holding['avg_price'] = 0
-                        holding['stop_loss_logic']['max_close_price'] = 0 # 최고가 초기화
-
-                        take_profit_hit = True
-                        reason = f"익절 조건 충족 target_roi : ({target_roi:.2f}%), roi : ({current_roi:.2f}%)"
-
-                        trading_history = self._create_trading_history(
-                            symbol=symbol,
-                            stock_name=stock_name,
-                            stock_type = stock_type,
-                            fee=fee,
-                            tax=tax,
-                            revenue=revenue,
-                            timestamp=current_date,
-                            timestamp_str=timestamp_str,
-                            reason=reason,
-                            trade_type='SELL',
-                            trade_quantity=trade_quantity,
-                            avg_price=holding['avg_price'],
-                            buy_logic_reasons=buy_logic_reasons,
-                            sell_logic_reasons=sell_logic_reasons,
-                            take_profit_hit=take_profit_hit,
-                            stop_loss_hit=stop_loss_hit,
-                            realized_pnl=realized_pnl,
-                            realized_roi=realized_roi,
-                            unrealized_pnl=unrealized_pnl,
-                            unrealized_roi=unrealized_roi,
-                            krw_balance=global_state['krw_balance'],
-                            total_quantity=holding['total_quantity'],
-                            total_buy_cost=holding['total_buy_cost'],
-                            close_price=close_price
-                        )
-
-                        holding['trading_histories'].append(trading_history)
-
-                        sell_yn = True
-
-                        simulation_histories.append(trading_history)
-
-                    # 손절 조건 계산
-                    if stop_loss_logic_name == 'fixed': # 고정 비율 익절
-                        target_roi = current_roi
-                    elif stop_loss_logic_name == 'trailing': # 최고가 기준으로 roi 계산
-                        if holding['stop_loss_logic']['max_close_price'] > 0:
-                            target_roi = ((close_price - holding['stop_loss_logic']['max_close_price'] ) / holding['stop_loss_logic']['max_close_price'] ) * 100 
-                    else:
-                        target_roi = current_roi
-
-                    # 손절 조건
-                    if use_stop_loss and target_roi <= -stop_loss_ratio:
-                        # 실제 손절 조건 충족
-                        fee = holding['total_quantity'] * close_price * 0.00014
-                        tax = holding['total_quantity'] * close_price * 0.0015
-                        revenue = holding['total_quantity'] * close_price - fee - tax
-                        realized_pnl = revenue - (holding['avg_price'] * holding['total_quantity'])
-                        realized_roi = (realized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
-                        unrealized_pnl = (close_price - holding['avg_price']) * holding['total_quantity']
-                        unrealized_roi = (unrealized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
-
-                        global_state['krw_balance'] += revenue
-
-                        trade_quantity = holding['total_quantity']
-
-                        holding['total_quantity'] = 0
-                        holding['total_buy_cost'] = 0
-                        holding['avg_price'] = 0
-                        holding['stop_loss_logic']['max_close_price'] = 0 # 최고가 초기화
-
-                        stop_loss_hit = True
-                        reason = f"손절 조건 충족 target_roi : ({target_roi:.2f}%), roi : ({current_roi:.2f}%)"
-
-                        trading_history = self._create_trading_history(
-                            symbol=symbol,
-                            stock_name=stock_name,
-                            stock_type = stock_type,
-                            fee=fee,
-                            tax=tax,
-                            revenue=revenue,
-                            timestamp=current_date,
-                            timestamp_str=timestamp_str,
-                            reason=reason,
-                            trade_type='SELL',
-                            trade_quantity=trade_quantity,
-                            avg_price=holding['avg_price'],
-                            buy_logic_reasons=buy_logic_reasons,
-                            sell_logic_reasons=sell_logic_reasons,
-                            take_profit_hit=take_profit_hit,
-                            stop_loss_hit=stop_loss_hit,
-                            realized_pnl=realized_pnl,
-                            realized_roi=realized_roi,
-                            unrealized_pnl=unrealized_pnl,
-                            unrealized_roi=unrealized_roi,
-                            krw_balance=global_state['krw_balance'],
-                            total_quantity=holding['total_quantity'],
-                            total_buy_cost=holding['total_buy_cost'],
-                            close_price=close_price
-                        )
-
-                        holding['trading_histories'].append(trading_history)
-
-                        sell_yn = True
-
-                        simulation_histories.append(trading_history)
-
-                # ✅ 매도 조건 (익절/손절 먼저 처리됨, 이 블럭은 전략 로직 기반 매도)
-                sell_logic_reasons = self._get_trading_logic_reasons(
-                    trading_logics=simulation_settings["sell_trading_logic"],
-                    symbol=symbol,
-                    candle=candle,
-                    ohlc_df=df,
-                    trade_type='SELL',
-                    support = support,
-                    resistance = resistance,
-                    high_trendline = high_trendline
-                )
-
-                # ✅ 매도 실행
-                if len(sell_logic_reasons) > 0 and holding['total_quantity'] > 0:
-                    fee = holding['total_quantity'] * close_price * 0.00014
-                    tax = holding['total_quantity'] * close_price * 0.0015
-                    revenue = holding['total_quantity'] * close_price - fee - tax
-                    realized_pnl = revenue - (holding['avg_price'] * holding['total_quantity'])
-                    realized_roi = (realized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
-                    unrealized_pnl = (close_price - holding['avg_price']) * holding['total_quantity']
-                    unrealized_roi = (unrealized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
-
-                    global_state['krw_balance'] += revenue
-
-                    trade_quantity = holding['total_quantity']
-
-                    holding['total_quantity'] = 0
-                    holding['total_buy_cost'] = 0
-                    holding['avg_price'] = 0
-                    holding['stop_loss_logic']['max_close_price'] = 0 # 최고가 초기화
-
-                    reason = ""
-
-                    trading_history = self._create_trading_history(
-                        symbol=symbol,
-                        stock_name=stock_name,
-                        stock_type = stock_type,
-                        fee=fee,
-                        tax=tax,
-                        revenue=revenue,
-                        timestamp=current_date,
-                        timestamp_str=timestamp_str,
-                        reason=reason,
-                        trade_type='SELL',
-                        trade_quantity=trade_quantity,
-                        avg_price=holding['avg_price'],
-                        buy_logic_reasons=buy_logic_reasons,
-                        sell_logic_reasons=sell_logic_reasons,
-                        take_profit_hit=take_profit_hit,
-                        stop_loss_hit=stop_loss_hit,
-                        realized_pnl=realized_pnl,
-                        realized_roi=realized_roi,
-                        unrealized_pnl=unrealized_pnl,
-                        unrealized_roi=unrealized_roi,
-                        krw_balance=global_state['krw_balance'],
-                        total_quantity=holding['total_quantity'],
-                        total_buy_cost=holding['total_buy_cost'],
-                        close_price=close_price
-                    )
-
-                    holding['trading_histories'].append(trading_history)
-
-                    sell_yn = True
-
-                    simulation_histories.append(trading_history)
-
-            # 매수 로직만 확인                    
-            for s in symbols:
-                symbol = s['symbol']
-                df = s['df']
-                ohlc_data = s['ohlc_data']
-                stock_name = s['stock_name']
-                stock_type = s['stock_type']
-                
-                # 알맞은 종목 찾기
-                holding = next((h for h in global_state['account_holdings'] if h['symbol'] == symbol), None)
-
-                if not any(pd.Timestamp(c.time).tz_localize(None).normalize() == current_date for c in ohlc_data):
-                    continue
-                                    
-                df = df[df.index <= pd.Timestamp(current_date)]
-    
-                # 🔍 현재 row 위치
-                current_idx = len(df) - 1
+        loop_started = perf_counter()
+        try:
+            for idx, current_date in enumerate(date_range[resume_idx:], start=resume_idx): # ✅ 하루 기준 고정 portfolio_value 계산 (종목별 보유 상태 반영)            
+                for holding in global_state['account_holdings']:
+                    symbol = holding['symbol']
 
-                lookback_next = 5
-                # ✅ 현재 시점까지 확정된 지지선만 사용
-                support = self.get_latest_confirmed_support(df, current_idx=current_idx, lookback_next=lookback_next)
-                resistance = self.get_latest_confirmed_resistance(df, current_idx=current_idx, lookback_next=lookback_next)
-                high_trendline = indicator.get_latest_trendline_from_highs(df, current_idx=current_idx)
-                
-                # ✅ 아무 데이터도 없으면 조용히 빠져나가기
-                if df.empty or len(df) < 2:
-                    continue
+                    # symbols 리스트에서 해당 symbol과 일치하는 s 찾기
+                    s = next((s for s in symbols if s['symbol'] == symbol), None)
 
-                # candle_time = df.index[-1]
-                candle = next(c for c in ohlc_data if pd.Timestamp(c.time).tz_localize(None) == current_date)
-                close_price = float(candle.close)
-                
-                timestamp_str = current_date.date().isoformat()
-                
-                print(f"💰 시뮬 중: {symbol} / 날짜: {timestamp_str} / 사용가능한 예수금: {global_state['krw_balance']:,}")
+                    if s is None:
+                        logger.warning(f"❌ 해당 symbol 종목이 없습니다: {symbol}", key="symbol_missing")
+                        continue  # 해당 symbol 종목이 없으면 건너뜀
 
-                trade_quantity = 0
-                realized_pnl = None
-                sell_yn = False
-                buy_yn = False
-                total_buy_cost = 0
-                
-                buy_fee = 0
-                sell_fee = 0
-                tax = 0
-
-                #익절, 손절
-                take_profit_hit = False
-                stop_loss_hit = False
-                
-                buy_logic_reasons = []
-                sell_logic_reasons = []
-                
-                # 데이터 최신화
-                holding['timestamp_str'] = timestamp_str
-                holding['close_price'] = close_price
-  
-                # ✅ 매수 조건
-                buy_logic_reasons = self._get_trading_logic_reasons(
-                    trading_logics=simulation_settings["buy_trading_logic"],
-                    symbol=symbol,
-                    candle=candle,
-                    ohlc_df=df,
-                    trade_type='BUY',
-                    support = support,
-                    resistance = resistance,
-                    high_trendline = high_trendline
-                )
-
-                # ✅ 직접 지정된 target_trade_value_krw가 있으면 사용, 없으면 비율로 계산
-                if target_trade_value_krw and target_trade_value_krw > 0:
-                    trade_amount = min(target_trade_value_krw, global_state['krw_balance'])
-                    min_trade_value = 0 # 고정 금액의 경우 min_trade_value는 무시
-                else:
-                    trade_ratio = trade_ratio if trade_ratio is not None else 100
-                    
-                    # 현재 총 자산을 구하기 위한 로직 
-                    total_market_value = 0
-                    for h in global_state['account_holdings']:
-                        market_value = h['avg_price'] * h['total_quantity']
-                        total_market_value += market_value
-
-                    total_balance = global_state['krw_balance'] + total_market_value
-                    trade_amount = min(total_balance * (trade_ratio / 100), global_state['krw_balance'])
+                    ohlc_data = s['ohlc_data']
+                    stock_name = s['stock_name']
+                    stock_type = s['stock_type']
 
-                # 매수 제약 조건 체크
-                if buy_percentage is None:
-                    buy_condition = True
-                else:
-                    # 매수 비율이 지정되어 있을 경우, 현재 종가와 평균가의 차이가 매수 비율보다 클 때만 매수
-                    if holding['avg_price'] == 0:
-                        buy_condition = True
-                    else:
-                        if buy_percentage < abs(holding['avg_price'] - close_price) / holding['avg_price'] * 100:
-                            buy_condition = True
-                        else:
-                            buy_condition = False
+                    # ✅ 날짜 → 봉 위치 인덱스로 O(1) 조회
+                    candle_idx = s['date_index'].get(current_date)
+                    if candle_idx is None:
+                        continue
+                                    
+                    # 🔍 현재 row 위치
+                    current_idx = candle_idx
 
-                # ✅ 매수 실행
-                if len(buy_logic_reasons) > 0 and min_trade_value <= trade_amount and buy_condition: # 최소 금액 이상일 때, buy_percentage 보다 클 때만 매수
-                    buy_quantity = math.floor(trade_amount / close_price)
-                    cost = buy_quantity * close_price
-                    fee = cost * 0.00014
-                    tax = 0
-                    total_buy_cost = cost + fee
-                    
-                    # 매수 금액이 예수금보다 작거나 같을 때만 매수
-                    if buy_quantity > 0 and total_buy_cost <= global_state['krw_balance']:
+                    # ✅ 아무 데이터도 없으면 조용히 빠져나가기
+                    if current_idx < 1:
+                        continue
 
-                        global_state['krw_balance'] -= total_buy_cost
-                        holding['total_buy_cost'] += total_buy_cost
-                        holding['total_quantity'] += buy_quantity
-                        holding['avg_price'] = holding['total_buy_cost'] / holding['total_quantity']
+                    # candle_time = df.index[-1]
+                    candle = ohlc_data[candle_idx]
+                    close_price = float(candle.close)
+                
+                    timestamp_str = current_date.date().isoformat()
+                
+                    logger.debug(f"💰 시뮬 중: {symbol}", key="sim_progress", 날짜=timestamp_str, 사용가능한_예수금=global_state['krw_balance'])
 
-                        if holding['stop_loss_logic']['max_close_price'] < close_price:
-                            holding['stop_loss_logic']['max_close_price'] = close_price # 최고가 업데이트
+                    trade_quantity = 0
+                    realized_pnl = None
+                    sell_yn = False
+                    buy_yn = False
+                    total_buy_cost = 0
+                
+                    buy_fee = 0
+                    sell_fee = 0
+                    tax = 0
 
-                        revenue = 0
-                        realized_pnl = 0
+                    #익절, 손절
+                    take_profit_hit = False
+                    stop_loss_hit = False
+                
+                    buy_logic_reasons = []
+                    sell_logic_reasons = []
+                
+                    # 데이터 최신화
+                    holding['timestamp_str'] = timestamp_str
+                    holding['close_price'] = close_price
+
+                    # ✅ 익절/손절 조건 우선 적용
+                    if holding['total_quantity'] > 0:
+                        current_roi = ((close_price - holding['avg_price']) / holding['avg_price']) * 100
+
+                        # 익절 조건 계산
+                        if take_profit_logic_name == 'fixed': # 고정 비율 익절
+                            target_roi = current_roi
+                        elif take_profit_logic_name == 'trailing': # 종가 최고점 기준으로 roi 계산
+                            if holding['stop_loss_logic']['max_close_price'] > 0:
+                                target_roi = ((close_price - holding['stop_loss_logic']['max_close_price'] ) / holding['stop_loss_logic']['max_close_price'] ) * 100
+                        else:
+                            target_roi = current_roi
+
+                        # 익절 조건
+                        if use_take_profit and target_roi >= take_profit_ratio:
+                            # 실제 매도 조건 충족
+                            fee = holding['total_quantity'] * close_price * 0.00014
+                            tax = holding['total_quantity'] * close_price * 0.0015
+                            revenue = holding['total_quantity'] * close_price - fee - tax
+                            realized_pnl = revenue - (holding['avg_price'] * holding['total_quantity'])
+                            realized_roi = (realized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
+                            unrealized_pnl = (close_price - holding['avg_price']) * holding['total_quantity']
+                            unrealized_roi = (unrealized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
+
+                            global_state['krw_balance'] += revenue
+
+                            trade_quantity = holding['total_quantity']
+
+                            holding['total_quantity'] = 0
+                            holding['total_buy_cost'] = 0
+                            holding['avg_price'] = 0
+                            holding['stop_loss_logic']['max_close_price'] = 0 # 최고가 초기화
+
+                            take_profit_hit = True
+                            reason = f"익절 조건 충족 target_roi : ({target_roi:.2f}%), roi : ({current_roi:.2f}%)"
+
+                            trading_history = self._create_trading_history(
+                                symbol=symbol,
+                                stock_name=stock_name,
+                                stock_type = stock_type,
+                                fee=fee,
+                                tax=tax,
+                                revenue=revenue,
+                                timestamp=current_date,
+                                timestamp_str=timestamp_str,
+                                reason=reason,
+                                trade_type='SELL',
+                                trade_quantity=trade_quantity,
+                                avg_price=holding['avg_price'],
+                                buy_logic_reasons=buy_logic_reasons,
+                                sell_logic_reasons=sell_logic_reasons,
+                                take_profit_hit=take_profit_hit,
+                                stop_loss_hit=stop_loss_hit,
+                                realized_pnl=realized_pnl,
+                                realized_roi=realized_roi,
+                                unrealized_pnl=unrealized_pnl,
+                                unrealized_roi=unrealized_roi,
+                                krw_balance=global_state['krw_balance'],
+                                total_quantity=holding['total_quantity'],
+                                total_buy_cost=holding['total_buy_cost'],
+                                close_price=close_price
+                            )
+
+                            holding['trading_histories'].append(trading_history)
+
+                            sell_yn = True
+
+                            simulation_histories.append(trading_history)
+
+                        # 손절 조건 계산
+                        if stop_loss_logic_name == 'fixed': # 고정 비율 익절
+                            target_roi = current_roi
+                        elif stop_loss_logic_name == 'trailing': # 최고가 기준으로 roi 계산
+                            if holding['stop_loss_logic']['max_close_price'] > 0:
+                                target_roi = ((close_price - holding['stop_loss_logic']['max_close_price'] ) / holding['stop_loss_logic']['max_close_price'] ) * 100 
+                        else:
+                            target_roi = current_roi
+
+                        # 손절 조건
+                        if use_stop_loss and target_roi <= -stop_loss_ratio:
+                            # 실제 손절 조건 충족
+                            fee = holding['total_quantity'] * close_price * 0.00014
+                            tax = holding['total_quantity'] * close_price * 0.0015
+                            revenue = holding['total_quantity'] * close_price - fee - tax
+                            realized_pnl = revenue - (holding['avg_price'] * holding['total_quantity'])
+                            realized_roi = (realized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
+                            unrealized_pnl = (close_price - holding['avg_price']) * holding['total_quantity']
+                            unrealized_roi = (unrealized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
+
+                            global_state['krw_balance'] += revenue
+
+                            trade_quantity = holding['total_quantity']
+
+                            holding['total_quantity'] = 0
+                            holding['total_buy_cost'] = 0
+                            holding['avg_price'] = 0
+                            holding['stop_loss_logic']['max_close_price'] = 0 # 최고가 초기화
+
+                            stop_loss_hit = True
+                            reason = f"손절 조건 충족 target_roi : ({target_roi:.2f}%), roi : ({current_roi:.2f}%)"
+
+                            trading_history = self._create_trading_history(
+                                symbol=symbol,
+                                stock_name=stock_name,
+                                stock_type = stock_type,
+                                fee=fee,
+                                tax=tax,
+                                revenue=revenue,
+                                timestamp=current_date,
+                                timestamp_str=timestamp_str,
+                                reason=reason,
+                                trade_type='SELL',
+                                trade_quantity=trade_quantity,
+                                avg_price=holding['avg_price'],
+                                buy_logic_reasons=buy_logic_reasons,
+                                sell_logic_reasons=sell_logic_reasons,
+                                take_profit_hit=take_profit_hit,
+                                stop_loss_hit=stop_loss_hit,
+                                realized_pnl=realized_pnl,
+                                realized_roi=realized_roi,
+                                unrealized_pnl=unrealized_pnl,
+                                unrealized_roi=unrealized_roi,
+                                krw_balance=global_state['krw_balance'],
+                                total_quantity=holding['total_quantity'],
+                                total_buy_cost=holding['total_buy_cost'],
+                                close_price=close_price
+                            )
+
+                            holding['trading_histories'].append(trading_history)
+
+                            sell_yn = True
+
+                            simulation_histories.append(trading_history)
+
+                    # ✅ 매도 조건 (익절/손절 먼저 처리됨, 이 블럭은 전략 로직 기반 매도)
+                    sell_logic_reasons = s['signals'].get_reasons('SELL', current_idx)
+
+                    # ✅ 매도 실행
+                    if len(sell_logic_reasons) > 0 and holding['total_quantity'] > 0:
+                        fee = holding['total_quantity'] * close_price * 0.00014
+                        tax = holding['total_quantity'] * close_price * 0.0015
+                        revenue = holding['total_quantity'] * close_price - fee - tax
+                        realized_pnl = revenue - (holding['avg_price'] * holding['total_quantity'])
                         realized_roi = (realized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
                         unrealized_pnl = (close_price - holding['avg_price']) * holding['total_quantity']
                         unrealized_roi = (unrealized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
 
-                        trade_quantity = buy_quantity
+                        global_state['krw_balance'] += revenue
+
+                        trade_quantity = holding['total_quantity']
+
+                        holding['total_quantity'] = 0
+                        holding['total_buy_cost'] = 0
+                        holding['avg_price'] = 0
+                        holding['stop_loss_logic']['max_close_price'] = 0 # 최고가 초기화
 
                         reason = ""
 
@@ -1345,7 +1333,7 @@ class AutoTradingBot:
                             timestamp=current_date,
                             timestamp_str=timestamp_str,
                             reason=reason,
-                            trade_type='BUY',
+                            trade_type='SELL',
                             trade_quantity=trade_quantity,
                             avg_price=holding['avg_price'],
                             buy_logic_reasons=buy_logic_reasons,
@@ -1364,66 +1352,232 @@ class AutoTradingBot:
 
                         holding['trading_histories'].append(trading_history)
 
-                        buy_yn = True
+                        sell_yn = True
 
                         simulation_histories.append(trading_history)
+
+                # 매수 로직만 확인                    
+                for s in symbols:
+                    symbol = s['symbol']
+                    ohlc_data = s['ohlc_data']
+                    stock_name = s['stock_name']
+                    stock_type = s['stock_type']
                 
-                # holding['trading_histories'] 를 활용해서 이미 매매가 이루어진 경우를 확인
-                already_traded_yn = any(
-                    history['timestamp_str'] == timestamp_str and history['trade_type'] in ('BUY', 'SELL')
-                    for history in holding['trading_histories']
-                )
+                    # 알맞은 종목 찾기
+                    holding = next((h for h in global_state['account_holdings'] if h['symbol'] == symbol), None)
 
-                # 매매가 이루어지지 않은 경우
-                if already_traded_yn is False:
+                    # ✅ 날짜 → 봉 위치 인덱스로 O(1) 조회
+                    candle_idx = s['date_index'].get(current_date)
+                    if candle_idx is None:
+                        continue
+                                    
+                    # 🔍 현재 row 위치
+                    current_idx = candle_idx
 
-                    unrealized_pnl = (close_price - holding['avg_price']) * holding['total_quantity']
-                    unrealized_roi = (unrealized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
+                    # ✅ 아무 데이터도 없으면 조용히 빠져나가기
+                    if current_idx < 1:
+                        continue
 
-                    # 최고가 trailing 하고 있을 경우
-                    if holding['stop_loss_logic']['max_close_price'] > 0 and holding['stop_loss_logic']['max_close_price'] < close_price:
-                        holding['stop_loss_logic']['max_close_price'] = close_price # 최고가 업데이트
-                        
-                    # 아무런 매수 없이 히스토리만 생성
-                    simulation_history = self._create_trading_history(
-                        symbol=symbol,
-                        stock_name=stock_name,
-                        stock_type = stock_type,
-                        fee=0,
-                        tax=0,
-                        revenue=0,
-                        timestamp=current_date,
-                        timestamp_str=timestamp_str,
-                        reason="",
-                        trade_type=None,
-                        trade_quantity=0,
-                        avg_price=holding['avg_price'],
-                        buy_logic_reasons=buy_logic_reasons,
-                        sell_logic_reasons=sell_logic_reasons,
-                        take_profit_hit=take_profit_hit,
-                        stop_loss_hit=stop_loss_hit,
-                        realized_pnl=0,
-                        realized_roi=0,
-                        unrealized_pnl=unrealized_pnl,
-                        unrealized_roi=unrealized_roi,
-                        krw_balance=global_state['krw_balance'],
-                        total_quantity=holding['total_quantity'],
-                        total_buy_cost=holding['total_buy_cost'],
-                        close_price=close_price
+                    # candle_time = df.index[-1]
+                    candle = ohlc_data[candle_idx]
+                    close_price = float(candle.close)
+                
+                    timestamp_str = current_date.date().isoformat()
+                
+                    logger.debug(f"💰 시뮬 중: {symbol}", key="sim_progress", 날짜=timestamp_str, 사용가능한_예수금=global_state['krw_balance'])
+
+                    trade_quantity = 0
+                    realized_pnl = None
+                    sell_yn = False
+                    buy_yn = False
+                    total_buy_cost = 0
+                
+                    buy_fee = 0
+                    sell_fee = 0
+                    tax = 0
+
+                    #익절, 손절
+                    take_profit_hit = False
+                    stop_loss_hit = False
+                
+                    buy_logic_reasons = []
+                    sell_logic_reasons = []
+                
+                    # 데이터 최신화
+                    holding['timestamp_str'] = timestamp_str
+                    holding['close_price'] = close_price
+  
+                    # ✅ 매수 조건
+                    buy_logic_reasons = s['signals'].get_reasons('BUY', current_idx)
+
+                    # ✅ 직접 지정된 target_trade_value_krw가 있으면 사용, 없으면 비율로 계산
+                    if target_trade_value_krw and target_trade_value_krw > 0:
+                        trade_amount = min(target_trade_value_krw, global_state['krw_balance'])
+                        min_trade_value = 0 # 고정 금액의 경우 min_trade_value는 무시
+                    else:
+                        trade_ratio = trade_ratio if trade_ratio is not None else 100
+                    
+                        # 현재 총 자산을 구하기 위한 로직 
+                        total_market_value = 0
+                        for h in global_state['account_holdings']:
+                            market_value = h['avg_price'] * h['total_quantity']
+                            total_market_value += market_value
+
+                        total_balance = global_state['krw_balance'] + total_market_value
+                        trade_amount = min(total_balance * (trade_ratio / 100), global_state['krw_balance'])
+
+                    # 매수 제약 조건 체크
+                    if buy_percentage is None:
+                        buy_condition = True
+                    else:
+                        # 매수 비율이 지정되어 있을 경우, 현재 종가와 평균가의 차이가 매수 비율보다 클 때만 매수
+                        if holding['avg_price'] == 0:
+                            buy_condition = True
+                        else:
+                            if buy_percentage < abs(holding['avg_price'] - close_price) / holding['avg_price'] * 100:
+                                buy_condition = True
+                            else:
+                                buy_condition = False
+
+                    # ✅ 매수 실행
+                    if len(buy_logic_reasons) > 0 and min_trade_value <= trade_amount and buy_condition: # 최소 금액 이상일 때, buy_percentage 보다 클 때만 매수
+                        buy_quantity = math.floor(trade_amount / close_price)
+                        cost = buy_quantity * close_price
+                        fee = cost * 0.00014
+                        tax = 0
+                        total_buy_cost = cost + fee
+                    
+                        # 매수 금액이 예수금보다 작거나 같을 때만 매수
+                        if buy_quantity > 0 and total_buy_cost <= global_state['krw_balance']:
+
+                            global_state['krw_balance'] -= total_buy_cost
+                            holding['total_buy_cost'] += total_buy_cost
+                            holding['total_quantity'] += buy_quantity
+                            holding['avg_price'] = holding['total_buy_cost'] / holding['total_quantity']
+
+                            if holding['stop_loss_logic']['max_close_price'] < close_price:
+                                holding['stop_loss_logic']['max_close_price'] = close_price # 최고가 업데이트
+
+                            revenue = 0
+                            realized_pnl = 0
+                            realized_roi = (realized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
+                            unrealized_pnl = (close_price - holding['avg_price']) * holding['total_quantity']
+                            unrealized_roi = (unrealized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
+
+                            trade_quantity = buy_quantity
+
+                            reason = ""
+
+                            trading_history = self._create_trading_history(
+                                symbol=symbol,
+                                stock_name=stock_name,
+                                stock_type = stock_type,
+                                fee=fee,
+                                tax=tax,
+                                revenue=revenue,
+                                timestamp=current_date,
+                                timestamp_str=timestamp_str,
+                                reason=reason,
+                                trade_type='BUY',
+                                trade_quantity=trade_quantity,
+                                avg_price=holding['avg_price'],
+                                buy_logic_reasons=buy_logic_reasons,
+                                sell_logic_reasons=sell_logic_reasons,
+                                take_profit_hit=take_profit_hit,
+                                stop_loss_hit=stop_loss_hit,
+                                realized_pnl=realized_pnl,
+                                realized_roi=realized_roi,
+                                unrealized_pnl=unrealized_pnl,
+                                unrealized_roi=unrealized_roi,
+                                krw_balance=global_state['krw_balance'],
+                                total_quantity=holding['total_quantity'],
+                                total_buy_cost=holding['total_buy_cost'],
+                                close_price=close_price
+                            )
+
+                            holding['trading_histories'].append(trading_history)
+
+                            buy_yn = True
+
+                            simulation_histories.append(trading_history)
+                
+                    # holding['trading_histories'] 를 활용해서 이미 매매가 이루어진 경우를 확인
+                    already_traded_yn = any(
+                        history['timestamp_str'] == timestamp_str and history['trade_type'] in ('BUY', 'SELL')
+                        for history in holding['trading_histories']
                     )
 
-                    simulation_histories.append(simulation_history)
-        
-            # completed_task_cnt 반영
-            completed_task_cnt = completed_task_cnt + 1
-            data_model = SimulationHistory(
-                simulation_id=simulation_settings['simulation_id'],
-                updated_at=updated_at,
-                updated_at_dt=updated_at_dt,
-                completed_task_cnt=completed_task_cnt
-            )
+                    # 매매가 이루어지지 않은 경우
+                    if already_traded_yn is False:
 
-            result = dynamodb_executor.execute_update(data_model, pk_name)
+                        unrealized_pnl = (close_price - holding['avg_price']) * holding['total_quantity']
+                        unrealized_roi = (unrealized_pnl / holding['total_buy_cost']) * 100 if holding['total_buy_cost'] > 0 else 0
+
+                        # 최고가 trailing 하고 있을 경우
+                        if holding['stop_loss_logic']['max_close_price'] > 0 and holding['stop_loss_logic']['max_close_price'] < close_price:
+                            holding['stop_loss_logic']['max_close_price'] = close_price # 최고가 업데이트
+                        
+                        # 아무런 매수 없이 히스토리만 생성 (dict 없이 컬럼 배열에 바로 기록, sparse 모드는 생략)
+                        if output_mode == 'full':
+                            simulation_histories.add(
+                                symbol=symbol,
+                                stock_name=stock_name,
+                                stock_type = stock_type,
+                                fee=0,
+                                tax=0,
+                                revenue=0,
+                                timestamp=current_date,
+                                timestamp_str=timestamp_str,
+                                reason="",
+                                trade_type=None,
+                                trade_quantity=0,
+                                avg_price=holding['avg_price'],
+                                buy_logic_reasons=buy_logic_reasons,
+                                sell_logic_reasons=sell_logic_reasons,
+                                take_profit_hit=take_profit_hit,
+                                stop_loss_hit=stop_loss_hit,
+                                realized_pnl=0,
+                                realized_roi=0,
+                                unrealized_pnl=unrealized_pnl,
+                                unrealized_roi=unrealized_roi,
+                                krw_balance=global_state['krw_balance'],
+                                total_quantity=holding['total_quantity'],
+                                total_buy_cost=holding['total_buy_cost'],
+                                close_price=close_price
+                            )
+
+                    # 종목 평가금액 반영 (매매 여부와 무관하게 당일 종가 기준)
+                    equity_curve.update(symbol, holding['total_quantity'], close_price)
+        
+                # 하루 마감 포트폴리오 평가 기록
+                equity_curve.record(current_date, current_date.date().isoformat(), global_state['krw_balance'])
+
+                # completed_task_cnt 반영 (메모리만 갱신, DynamoDB 기록은 백그라운드 스레드)
+                progress_reporter.advance()
+
+                # 주기적으로 진행 상태 저장 (마지막 날은 결과 저장으로 대신함)
+                if checkpoint_store is not None and idx + 1 < len(date_range) and checkpoint_store.state_due():
+                    started = perf_counter()
+                    size = checkpoint_store.save('state', checkpoint_fingerprint, {
+                        'next_idx': idx + 1,
+                        'date_cnt': len(date_range),
+                        'global_state': global_state,
+                        'simulation_histories': simulation_histories,
+                        'equity_curve': equity_curve,
+                    })
+                    profiler.add('checkpoint_save', perf_counter() - started, bytes=size)
+        finally:
+            # 마지막 진행률은 항상 기록
+            progress_reporter.close()
+
+            # portfolio_loop 에는 체크포인트 저장 시간도 포함, 진행률 기록은 백그라운드 스레드 시간
+            profiler.add('portfolio_loop', perf_counter() - loop_started, count=len(date_range) - resume_idx)
+            profiler.add('progress_dynamodb', progress_reporter.flush_seconds, count=progress_reporter.flush_cnt)
+
+        global_state['output_mode'] = output_mode
+        global_state['equity_curve'] = equity_curve.to_records()
+
+        profiler.print_summary()
     
         return global_state, simulation_histories, failed_stocks
 
@@ -1464,91 +1618,48 @@ class AutoTradingBot:
         return trading_history
 
 
-    def _create_ohlc_df(self, ohlc_data, symbol, start_date, end_date,  indicators=[], rsi_period=25):
+    def _get_short_sale_df(self, symbol, start_date, end_date):
+        """지표 DataFrame에 병합할 공매도 데이터 (실패 시 None)"""
+        if not (symbol and start_date and end_date):
+            return None
+
+        try:
+            short_df = self.get_short_sale_daily_trend_df_multi(
+                symbol=symbol,
+                start_date=start_date,
+                end_date=end_date,
+            )
+
+            if short_df is None or short_df.empty:
+                return None
 
-        # ✅ OHLC → DataFrame 변환
-        timestamps = [c.time for c in ohlc_data]
-        ohlc = [
-            [c.time, float(c.open), float(c.high), float(c.low), float(c.close), float(c.volume)]
-            for c in ohlc_data
-        ]
-        df = pd.DataFrame(ohlc, columns=["Time", "Open", "High", "Low", "Close", "Volume"], index=pd.DatetimeIndex(timestamps))
-        df.index = df.index.tz_localize(None)
+            short_df.index = pd.to_datetime(short_df.index).tz_localize(None)
+            return short_df
 
-        # ✅ 공매도 데이터 병합
-        if symbol and start_date and end_date:
-            try:
+        except Exception as e:
+            logger.warning(f"⚠️ 공매도 데이터 병합 실패: {e}", key="short_sale_merge")
+            return None
 
-                short_df = self.get_short_sale_daily_trend_df_multi(
-                    symbol=symbol,
-                    start_date=start_date,
-                    end_date=end_date,
-                )
 
-                if short_df is not None and not short_df.empty:
-                    short_df.index = pd.to_datetime(short_df.index).tz_localize(None)
+    def _needs_short_sale(self, buy_trading_logic, sell_trading_logic, use_short_sale=None):
+        """공매도 데이터 조회 필요 여부 (use_short_sale 를 지정하면 그 값을 그대로 사용)"""
+        if use_short_sale is not None:
+            return use_short_sale
 
-                    # ✅ 병합: index 기준으로만 병합, '영업일자' 컬럼 제거
-                    df = df.merge(short_df, how="left", left_index=True, right_index=True)
-                    df.drop(columns=[col for col in df.columns if col == "영업일자"], inplace=True, errors="ignore")
+        trading_logics = set(buy_trading_logic or []) | set(sell_trading_logic or [])
+        return not trading_logics.issubset(SHORT_SALE_FREE_LOGICS)
 
-            except Exception as e:
-                print(f"⚠️ 공매도 데이터 병합 실패: {e}")
-                
-        indicator = TechnicalIndicator()
-        
-        lookback_prev = 5
-        lookback_next = 5
-
-        # 차트에 그리기 위한 지표 계산
-        for i in indicators:
-            if i['type'] == 'ema' and i['draw_yn'] is True:
-                df = indicator.cal_ema_df(df, i['period'])
-            elif i['type'] == 'sma' and i['draw_yn'] is True:
-                df = indicator.cal_sma_df(df, i['period'])
-
-        # 지표 계산
-        df = indicator.cal_ema_df(df, 5)
-        df = indicator.cal_ema_df(df, 10)
-        df = indicator.cal_ema_df(df, 13)
-        df = indicator.cal_ema_df(df, 20)
-        df = indicator.cal_ema_df(df, 21)
-        df = indicator.cal_ema_df(df, 55)
-        df = indicator.cal_ema_df(df, 60)
-        df = indicator.cal_ema_df(df, 89)
-        df = indicator.cal_ema_df(df, 120)
-        df = indicator.cal_ema_df(df, 200)
-        
-        df = indicator.cal_sma_df(df, 5)
-        df = indicator.cal_sma_df(df, 10)
-        df = indicator.cal_sma_df(df, 20)
-        df = indicator.cal_sma_df(df, 40)
-        df = indicator.cal_sma_df(df, 60)
-        df = indicator.cal_sma_df(df, 120)
-        df = indicator.cal_sma_df(df, 200)
-
-        df = indicator.cal_rsi_df(df, rsi_period)
-        df = indicator.cal_macd_df(df)
-        df = indicator.cal_stochastic_df(df)
-        df = indicator.cal_mfi_df(df)
-        df = indicator.cal_bollinger_band(df)
-        df = indicator.cal_horizontal_levels_df(df, lookback_prev, lookback_next)
-        
-        df = indicator.cal_wma_df(df, 5)
-        df = indicator.cal_wma_df(df, 10)
-        df = indicator.cal_wma_df(df, 20)
-        df = indicator.cal_wma_df(df, 60)
-        df = indicator.cal_wma_df(df, 120)
-        df = indicator.cal_wma_df(df, 200)        
-                                
-        # 🔧 EMA 기울기 추가 및 이동평균 계산
-        #df['EMA_55_Slope'] = df['EMA_55'] - df['EMA_55'].shift(1)
-        df['EMA_89_Slope'] = df['EMA_89'] - df['EMA_89'].shift(1)
-        df['EMA_55_Slope'] = (df['EMA_55'] - df['EMA_55'].shift(1)) / df['EMA_55'].shift(1) * 100
-        
-        df['EMA_55_Slope_MA'] = df['EMA_55_Slope'].rolling(window=3).mean()
-        df['EMA_89_Slope_MA'] = df['EMA_89_Slope'].rolling(window=3).mean()
-        
+
+    def _create_ohlc_df(self, ohlc_data, symbol, start_date, end_date,  indicators=[], rsi_period=25, use_short_sale=True, required_indicators=None, interval='day'):
+
+        # ✅ 공매도 데이터 조회 후 지표 계산 (계산 자체는 symbol_prep.build_indicator_df)
+        # required_indicators: 계산할 지표 키 집합 (None 이면 전체)
+        short_df = self._get_short_sale_df(symbol, start_date, end_date) if use_short_sale else None
+
+        # ✅ 같은 입력(봉/공매도/파라미터)이면 지표 캐시에서 조회
+        df, _ = get_indicator_df(
+            symbol, interval, ohlc_data, short_df, indicators=indicators, rsi_period=rsi_period, required=required_indicators
+        )
         return df
     
 
@@ -1561,6 +1672,9 @@ class AutoTradingBot:
         
         failed_stocks = set()  # 중복 제거 자동 처리
 
+        # 선택한 매매 로직에 필요한 지표만 계산
+        required_indicators = resolve_indicators(buy_trading_logic, sell_trading_logic)
+
         # 사전에 계산된 OHLC 데이터와 DataFrame을 저장 (api 이슈)
         for s in selected_symbols:
             
@@ -1574,14 +1688,23 @@ class AutoTradingBot:
                 # ✅ OHLC 데이터 가져오기
                 ohlc_data = self._get_ohlc(symbol, start_date_for_ohlc, end_date, interval)
 
-                df = self._create_ohlc_df(ohlc_data=ohlc_data, symbol=symbol, start_date=start_date_for_ohlc, end_date=end_date, rsi_period=rsi_period)
+                df = self._create_ohlc_df(
+                    ohlc_data=ohlc_data, symbol=symbol, start_date=start_date_for_ohlc, end_date=end_date, rsi_period=rsi_period,
+                    use_short_sale=self._needs_short_sale(buy_trading_logic, sell_trading_logic),
+                    required_indicators=required_indicators,
+                    interval=interval
+                )
                 
                 # 유효한 종목만 저장
                 valid_symbol['symbol'] = symbol
                 valid_symbol['stock_name'] = stock_name
                 valid_symbol['stock_type'] = stock_type
                 valid_symbol['ohlc_data'] = ohlc_data
+                valid_symbol['date_index'] = self._build_date_index(ohlc_data)
+                valid_symbol['level_tracker'] = ConfirmedLevelTracker(df, lookback_next=5)
+                valid_symbol['high_trendline'] = indicator.cal_high_trendline_series(df)
                 valid_symbol['df'] = df
+                valid_symbol['signals'] = self._create_trading_signals(valid_symbol, buy_trading_logic, sell_trading_logic)
 
                 valid_symbols.append(valid_symbol)
 
@@ -1626,6 +1749,7 @@ class AutoTradingBot:
         start_date = pd.Timestamp(start_date).normalize()
 
         kis_account = self.kis.account()
+        self._wait_kis_rate_limit('balance', KisPriority.ORDER, account=True)
         kis_balance: KisBalance = kis_account.balance()
 
         non_zero_stocks = [stock for stock in kis_balance.stocks if stock.qty != 0]
@@ -1672,7 +1796,7 @@ class AutoTradingBot:
                 s = next((s for s in symbols if s['symbol'] == symbol), None)
 
                 if s is None:
-                    print(f"❌ 해당 symbol 종목이 없습니다: {symbol}")
+                    logger.warning(f"❌ 해당 symbol 종목이 없습니다: {symbol}", key="symbol_missing")
                     continue  # 해당 symbol 종목이 없으면 건너뜀
 
                 df = s['df']
@@ -1680,31 +1804,25 @@ class AutoTradingBot:
                 stock_name = s['stock_name']
                 stock_type = s['stock_type']
 
-                if not any(pd.Timestamp(c.time).tz_localize(None).normalize() == current_date for c in ohlc_data):
+                # ✅ 날짜 → 봉 위치 인덱스로 O(1) 조회
+                candle_idx = s['date_index'].get(current_date)
+                if candle_idx is None:
                     continue
                                     
-                df = df[df.index <= pd.Timestamp(current_date)]
-    
                 # 🔍 현재 row 위치
-                current_idx = len(df) - 1
+                current_idx = candle_idx
 
-                lookback_next = 5
-                # ✅ 현재 시점까지 확정된 지지선만 사용
-                support = self.get_latest_confirmed_support(df, current_idx=current_idx, lookback_next=lookback_next)
-                resistance = self.get_latest_confirmed_resistance(df, current_idx=current_idx, lookback_next=lookback_next)
-                high_trendline = indicator.get_latest_trendline_from_highs(df, current_idx=current_idx)
-                
                 # ✅ 아무 데이터도 없으면 조용히 빠져나가기
-                if df.empty or len(df) < 2:
+                if current_idx < 1:
                     continue
 
                 # candle_time = df.index[-1]
-                candle = next(c for c in ohlc_data if pd.Timestamp(c.time).tz_localize(None) == current_date)
+                candle = ohlc_data[candle_idx]
                 close_price = float(candle.close)
                 
                 timestamp_str = current_date.date().isoformat()
                 
-                print(f"💰 시뮬 중: {symbol} / 날짜: {timestamp_str} / 사용가능한 예수금: {global_state['krw_balance']:,}")
+                logger.info(f"💰 시뮬 중: {symbol}", key="trade_progress", 날짜=timestamp_str, 사용가능한_예수금=global_state['krw_balance'])
 
                 trade_quantity = 0
                 realized_pnl = None
@@ -1868,16 +1986,7 @@ class AutoTradingBot:
                         simulation_histories.append(trading_history)
 
                 # ✅ 매도 조건 (익절/손절 먼저 처리됨, 이 블럭은 전략 로직 기반 매도)
-                sell_logic_reasons = self._get_trading_logic_reasons(
-                    trading_logics=sell_trading_logic,
-                    symbol=symbol,
-                    candle=candle,
-                    ohlc_df=df,
-                    trade_type='SELL',
-                    support = support,
-                    resistance = resistance,
-                    high_trendline = high_trendline
-                )
+                sell_logic_reasons = s['signals'].get_reasons('SELL', current_idx)
 
                 # ✅ 매도 실행
                 if len(sell_logic_reasons) > 0 and holding['total_quantity'] > 0:
@@ -1975,26 +2084,20 @@ class AutoTradingBot:
 
                     global_state['account_holdings'].append(holding)
 
-                if not any(pd.Timestamp(c.time).tz_localize(None).normalize() == current_date for c in ohlc_data):
+                # ✅ 날짜 → 봉 위치 인덱스로 O(1) 조회
+                candle_idx = s['date_index'].get(current_date)
+                if candle_idx is None:
                     continue
                                     
-                df = df[df.index <= pd.Timestamp(current_date)]
-    
                 # 🔍 현재 row 위치
-                current_idx = len(df) - 1
+                current_idx = candle_idx
 
-                lookback_next = 5
-                # ✅ 현재 시점까지 확정된 지지선만 사용
-                support = self.get_latest_confirmed_support(df, current_idx=current_idx, lookback_next=lookback_next)
-                resistance = self.get_latest_confirmed_resistance(df, current_idx=current_idx, lookback_next=lookback_next)
-                high_trendline = indicator.get_latest_trendline_from_highs(df, current_idx=current_idx)
-                
                 # ✅ 아무 데이터도 없으면 조용히 빠져나가기
-                if df.empty or len(df) < 2:
+                if current_idx < 1:
                     continue
 
                 # candle_time = df.index[-1]
-                candle = next(c for c in ohlc_data if pd.Timestamp(c.time).tz_localize(None) == current_date)
+                candle = ohlc_data[candle_idx]
                 close_price = float(candle.close)
                 
                 timestamp_str = current_date.date().isoformat()
@@ -2002,7 +2105,7 @@ class AutoTradingBot:
                 # 예수금 조회
                 global_state['krw_balance'] = self._get_kis_krw_balance()
 
-                print(f"💰 시뮬 중: {symbol} / 날짜: {timestamp_str} / 사용가능한 예수금: {global_state['krw_balance']:,}")
+                logger.info(f"💰 시뮬 중: {symbol}", key="trade_progress", 날짜=timestamp_str, 사용가능한_예수금=global_state['krw_balance'])
 
                 trade_quantity = 0
                 realized_pnl = None
@@ -2024,16 +2127,7 @@ class AutoTradingBot:
                 holding['close_price'] = close_price
   
                 # ✅ 매수 조건
-                buy_logic_reasons = self._get_trading_logic_reasons(
-                    trading_logics=buy_trading_logic,
-                    symbol=symbol,
-                    candle=candle,
-                    ohlc_df=df,
-                    trade_type='BUY',
-                    support = support,
-                    resistance = resistance,
-                    high_trendline = high_trendline
-                )
+                buy_logic_reasons = s['signals'].get_reasons('BUY', current_idx)
 
                 # ✅ 직접 지정된 target_trade_value_krw가 있으면 사용, 없으면 비율로 계산
                 if target_trade_value_krw and target_trade_value_krw > 0:
@@ -2173,7 +2267,7 @@ class AutoTradingBot:
 
                     simulation_histories.append(simulation_history)
 
-                    print(f"💰 시뮬 중: {symbol} / 날짜: {timestamp_str} / 사용가능한 예수금: {global_state['krw_balance']:,} / 거래 없음")
+                    logger.info(f"💰 시뮬 중: {symbol}", key="trade_progress", 날짜=timestamp_str, 사용가능한_예수금=global_state['krw_balance'], 거래="없음")
 
         return None
 
@@ -2188,6 +2282,7 @@ class AutoTradingBot:
 
         for attempt in range(0, max_retries):
             try:
+                self._wait_kis_rate_limit('orderable-amount', KisPriority.ORDER, account=True)
                 orderable_amount: KisOrderableAmount = kis_account.orderable_amount(
                     market="KRX",
                     price=1,
@@ -2204,7 +2299,44 @@ class AutoTradingBot:
         return kis_krw_balance
                 
 
-    def _get_trading_logic_reasons(self, trading_logics, symbol, candle, ohlc_df, support, resistance, high_trendline, trade_type = 'BUY', rsi_buy_threshold = 30, rsi_sell_threshold = 70):
+    @staticmethod
+    def _create_trading_signals(symbol_data, buy_trading_logic, sell_trading_logic):
+        """
+        종목별 매수/매도 신호 테이블 생성
+        - 벡터화 등록된 로직은 전체 구간을 한 번에 계산
+        - 나머지는 i 번째 봉까지의 데이터로 기존 로직을 호출 (lookahead 없음)
+        """
+        symbol = symbol_data['symbol']
+        df = symbol_data['df']
+        ohlc_data = symbol_data['ohlc_data']
+        level_tracker = symbol_data['level_tracker']
+        high_trendline = symbol_data['high_trendline']
+
+        def evaluate_bar(trade_type, trading_logics, idx):
+            trendline = high_trendline[idx]
+
+            return AutoTradingBot._get_trading_logic_reasons(
+                trading_logics=trading_logics,
+                symbol=symbol,
+                candle=ohlc_data[idx],
+                ohlc_df=df.iloc[:idx + 1],
+                trade_type=trade_type,
+                support=level_tracker.get_support(idx),
+                resistance=level_tracker.get_resistance(idx),
+                high_trendline=None if np.isnan(trendline) else float(trendline)
+            )
+
+        return TradingSignals(
+            df=df,
+            trading_logics={'BUY': buy_trading_logic, 'SELL': sell_trading_logic},
+            evaluate_bar=evaluate_bar,
+            support=level_tracker.support,
+            resistance=level_tracker.resistance,
+            high_trendline=high_trendline
+        )
+
+    @staticmethod
+    def _get_trading_logic_reasons(trading_logics, symbol, candle, ohlc_df, support, resistance, high_trendline, trade_type = 'BUY', rsi_buy_threshold = 30, rsi_sell_threshold = 70):
 
         signal_reasons = []
 
@@ -2540,6 +2672,7 @@ class AutoTradingBot:
             stock = self.kis.stock(symbol)
 
             # 매수/매도 주문 처리
+            self._wait_kis_rate_limit('order', KisPriority.ORDER, account=True)
             if order_type == "buy":
                 if buy_price:
                     order = stock.buy(price=buy_price, qty=qty)  # price 값이 있으면 지정가 매수
@@ -2568,6 +2701,7 @@ class AutoTradingBot:
 
 
     def _get_quote(self, symbol):
+        self._wait_kis_rate_limit('quote', KisPriority.MARKET_DATA)
         quote: KisQuote = self.kis.stock(symbol).quote()
         return quote
 
@@ -2674,6 +2808,7 @@ class AutoTradingBot:
     def _get_holdings_with_details(self):
 
         account = self.kis.account()
+        self._wait_kis_rate_limit('balance', KisPriority.ORDER, account=True)
         balance = account.balance()
 
         holdings = []
@@ -2703,11 +2838,13 @@ class AutoTradingBot:
         account = self.kis.account()
         
         # ✅ 실현 손익 조회
+        self._wait_kis_rate_limit('profits', KisPriority.ORDER, account=True)
         profits: KisOrderProfits = account.profits(start=date(2023, 8, 1), end=date.today())
         realized_pnl = float(profits.profit)                # 실현 손익
         realized_buy_amt = float(profits.buy_amount)        # 실현 매입 금액
 
         # ✅ 미실현 손익 조회
+        self._wait_kis_rate_limit('balance', KisPriority.ORDER, account=True)
         balance: KisBalance = account.balance()
         unrealized_pnl = float(balance.profit)     # 평가손익
         holding_buy_amt = float(balance.purchase_amount)           # 현재 보유 주식 매입 금액
@@ -2758,7 +2895,7 @@ class AutoTradingBot:
         pass
     
     def inquire_psbl_order(self , symbol):
-        domain = "https://openapivts.koreainvestment.com:29443" if self.virtual else "https://openapi.koreainvestment.com:9443"
+        domain = KIS_VIRTUAL_DOMAIN if self.virtual else KIS_REAL_DOMAIN
         url = f"{domain}/uapi/domestic-stock/v1/trading/inquire-psbl-order"
 
         headers = {
@@ -2778,15 +2915,80 @@ class AutoTradingBot:
             "OVRS_ICLD_YN": "N"              # 해외주식 포함 여부
         }
 
-        response = requests.get(url, headers=headers, params=body)
-        
-        try:
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            print("❌ API 호출 실패:", e)
-            return None
+        self._wait_kis_rate_limit('inquire-psbl-order', KisPriority.ORDER, account=True)
+        return KisHttpClient.get_json(url, headers=headers, params=body)
         
+    def _investor_trend_estimate_request(self, symbol):
+        """종목별 외인기관 추정가 집계 요청 정보 (동기/비동기 공용)"""
+        # 실전 투자용 도메인 및 URL
+        url = f"{KIS_REAL_DOMAIN}/uapi/domestic-stock/v1/quotations/investor-trend-estimate"
+
+        # HTTP Headers
+        headers = {
+            "content-type": "application/json; charset=utf-8",
+            "authorization": str(self.kis.token),
+            "appkey": self.app_key,
+            "appsecret": self.secret_key,
+            "tr_id": "HHPTJ04160200",
+            "custtype": "P",  # 개인 고객용
+        }
+
+        # Query Parameters
+        params = {
+            "MKSC_SHRN_ISCD": symbol  # 종목코드
+        }
+
+        return {
+            'url': url,
+            'headers': headers,
+            'params': params,
+            'endpoint': 'investor-trend-estimate',
+            'priority': KisPriority.ANALYTICS,
+        }
+
+    def _get_cached_investor_estimate(self, symbol):
+        with self._investor_estimate_cache_lock:
+            return self._investor_estimate_cache.get((date.today(), symbol))
+
+    def _cache_investor_estimate(self, symbol, response):
+        """당일 최종 입력(bsop_hour_gb = '5')이 포함된 응답만 캐시 (이후 변하지 않음)"""
+        if not response:
+            return
+
+        if not any(item.get("bsop_hour_gb") == "5" for item in response.get("output2", []) or []):
+            return
+
+        with self._investor_estimate_cache_lock:
+            today = date.today()
+            # 지난 날짜 항목 정리
+            for key in [key for key in self._investor_estimate_cache if key[0] != today]:
+                del self._investor_estimate_cache[key]
+            self._investor_estimate_cache[(today, symbol)] = response
+
+    def get_investor_trend_estimates(self, symbols):
+        """
+        여러 종목의 외인기관 추정가 집계를 비동기로 동시에 조회
+        - 이벤트 루프가 없는 스레드(스케줄러 등)에서 호출
+
+        Returns:
+            dict: {symbol: 응답 JSON 또는 None}
+        """
+        results = {symbol: self._get_cached_investor_estimate(symbol) for symbol in symbols}
+        missing_symbols = [symbol for symbol, response in results.items() if response is None]
+
+        if missing_symbols:
+            requests_list = [self._investor_trend_estimate_request(symbol) for symbol in missing_symbols]
+
+            async def fetch_all():
+                async with AsyncKisHttpClient() as client:
+                    return await client.gather_json(requests_list)
+
+            for symbol, response in zip(missing_symbols, asyncio.run(fetch_all())):
+                self._cache_investor_estimate(symbol, response)
+                results[symbol] = response
+
+        return results
+
     def get_investor_trend_estimate(self, symbol):
         """
         한국투자증권 실전투자 API - 종목별 외인기관 추정가 집계 요청
@@ -2806,33 +3008,20 @@ class AutoTradingBot:
             5: 14시 30분 입력
         """
 
-        # 실전 투자용 도메인 및 URL
-        url = "https://openapi.koreainvestment.com:9443/uapi/domestic-stock/v1/quotations/investor-trend-estimate"
-
-        # HTTP Headers
-        headers = {
-            "content-type": "application/json; charset=utf-8",
-            "authorization": str(self.kis.token),
-            "appkey": self.app_key,
-            "appsecret": self.secret_key,
-            "tr_id": "HHPTJ04160200",
-            "custtype": "P",  # 개인 고객용
-        }
+        # 당일 최종 추정치는 다른 봇이 이미 조회했으면 재사용
+        cached = self._get_cached_investor_estimate(symbol)
+        if cached is not None:
+            return cached
 
-        # Query Parameters
-        params = {
-            "MKSC_SHRN_ISCD": symbol  # 종목코드
-        }
+        request = self._investor_trend_estimate_request(symbol)
 
         # API 요청
-        response = requests.get(url, headers=headers, params=params)
+        self._wait_kis_rate_limit(request['endpoint'], request['priority'])
+        result = KisHttpClient.get_json(request['url'], headers=request['headers'], params=request['params'])
 
         # 결과 확인
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print("❌ 요청 실패:", response.status_code, response.text)
-            return None
+        self._cache_investor_estimate(symbol, result)
+        return result
 
     def calculate_trade_value_from_fake_qty(self, api_response: dict, close_price: float, symbol) -> int:
         """
@@ -2845,7 +3034,9 @@ class AutoTradingBot:
         Returns:
             int: 계산된 거래대금 (원 단위)
         """
-        api_response = self.get_investor_trend_estimate(symbol)
+        # 응답을 넘겨받지 않으면 직접 조회
+        if api_response is None:
+            api_response = self.get_investor_trend_estimate(symbol)
         
         if api_response is None:
             print(f"❌ API 응답이 None입니다: symbol={symbol}")
@@ -2912,7 +3103,7 @@ class AutoTradingBot:
         """
 
         # 실전 도메인
-        url = "https://openapi.koreainvestment.com:9443/uapi/domestic-stock/v1/quotations/inquire-investor-time-by-market"
+        url = f"{KIS_REAL_DOMAIN}/uapi/domestic-stock/v1/quotations/inquire-investor-time-by-market"
 
         # 요청 헤더
         headers = {
@@ -2931,13 +3122,11 @@ class AutoTradingBot:
         }
 
         # 요청
-        response = requests.get(url, headers=headers, params=params)
-
-        if response.status_code != 200:
-            print("❌ 요청 실패:", response.status_code, response.text)
+        self._wait_kis_rate_limit('inquire-investor-time-by-market', KisPriority.ANALYTICS)
+        data = KisHttpClient.get_json(url, headers=headers, params=params)
+        if data is None:
             return None
 
-        data = response.json()
         print(f"data: {data}")
         
         output_list = data.get('output', [])
@@ -3015,10 +3204,13 @@ class AutoTradingBot:
             market_code (str): 시장 분류 코드 ("J": 코스피, "Q": 코스닥)
 
         Returns:
-            dict: 일별 공매도 데이터 목록 또는 None
+            pd.DataFrame: 일별 공매도 데이터 (조회 구간에 데이터가 없으면 빈 DataFrame)
+
+        Raises:
+            KisApiError: HTTP 오류 또는 KIS 오류 응답(rt_cd != '0') → 호출 측에서 해당 구간을 조회 실패로 처리
         """
 
-        url = "https://openapi.koreainvestment.com:9443/uapi/domestic-stock/v1/quotations/daily-short-sale"
+        url = f"{KIS_REAL_DOMAIN}/uapi/domestic-stock/v1/quotations/daily-short-sale"
 
         headers = {
             "content-type": "application/json; charset=utf-8",
@@ -3036,18 +3228,15 @@ class AutoTradingBot:
             "FID_COND_MRKT_DIV_CODE": market_code,
         }
 
-        response = requests.get(url, headers=headers, params=params)
+        self._wait_kis_rate_limit('daily-short-sale', KisPriority.ANALYTICS)
+        # ❌ 실패 응답을 "데이터 없음" 으로 처리하면 저장소가 해당 구간을 조회 완료로 기록하므로 예외로 전달
+        data = KisHttpClient.get_json(url, headers=headers, params=params, raise_on_error=True)
 
-        if response.status_code != 200:
-            print("❌ 요청 실패:", response.status_code, response.text)
-            return None
-
-        data = response.json()
         output2 = data.get("output2", [])
 
         if not output2:
             print("⚠️ output2가 비어 있습니다.")
-            return None
+            return pd.DataFrame()
 
         # ✅ 영문 → 한글 필드 매핑
         field_map = {
@@ -3092,42 +3281,75 @@ class AutoTradingBot:
     
 
 
-    def get_short_sale_daily_trend_df_multi(self, symbol, start_date, end_date, market_code="J") -> pd.DataFrame:
+    def _fetch_short_sale_chunk(self, symbol, chunk_start, chunk_end, market_code):
+        return self.get_short_sale_daily_trend(
+            symbol=symbol,
+            start_date=chunk_start.strftime("%Y%m%d"),
+            end_date=chunk_end.strftime("%Y%m%d"),
+            market_code=market_code
+        )
+
+    def _fetch_short_sale_chunks(self, symbol, start_date, end_date, market_code="J"):
         """
-        start_date ~ end_date 전체 구간을 공매도 API 제한을 고려해 여러 번 나눠 호출하여 모두 연결
-        
+        start_date ~ end_date 구간을 API 조회 제한 기간 단위로 나눠 동시에 조회
+
         Returns:
-            pd.DataFrame: 전체 날짜 구간의 공매도 df (index = datetime)
+            (pd.DataFrame, bool): 연결된 공매도 df, 모든 구간 조회 성공 여부
         """
-
-        all_data = []
-
         # 한 번에 조회 가능한 최대 기간 (약 90일, 여유 있게 85일로 제한)
         chunk_days = 85
-        current_start = start_date
 
+        chunks = []
+        current_start = start_date
         while current_start <= end_date:
             current_end = min(current_start + timedelta(days=chunk_days - 1), end_date)
+            chunks.append((current_start, current_end))
+            current_start = current_end + timedelta(days=1)
 
-            try:
-                df = self.get_short_sale_daily_trend(
-                    symbol=symbol,
-                    start_date=current_start.strftime("%Y%m%d"),
-                    end_date=current_end.strftime("%Y%m%d"),
-                    market_code=market_code
-                )
-                if df is not None and not df.empty:
-                    all_data.append(df)
+        all_data = []
+        complete = True
 
-            except Exception as e:
-                print(f"⚠️ 공매도 데이터 요청 실패: {current_start} ~ {current_end}: {e}")
+        with ThreadPoolExecutor(max_workers=max(1, min(self.short_sale_fetch_workers, len(chunks)))) as executor:
+            futures = [
+                (chunk_start, chunk_end, executor.submit(self._fetch_short_sale_chunk, symbol, chunk_start, chunk_end, market_code))
+                for chunk_start, chunk_end in chunks
+            ]
 
-            current_start = current_end + timedelta(days=1)
+            for chunk_start, chunk_end, future in futures:
+                try:
+                    df = future.result()
+                    if df is not None and not df.empty:
+                        all_data.append(df)
+
+                except Exception as e:
+                    print(f"⚠️ 공매도 데이터 요청 실패: {chunk_start} ~ {chunk_end}: {e}")
+                    complete = False
 
         if all_data:
             full_df = pd.concat(all_data).sort_index()
             # 중복 제거 (혹시 API가 중복 포함할 수 있으므로)
             full_df = full_df[~full_df.index.duplicated(keep='last')]
+            return full_df, complete
+
+        return pd.DataFrame(), complete
+
+    def get_short_sale_daily_trend_df_multi(self, symbol, start_date, end_date, market_code="J") -> pd.DataFrame:
+        """
+        start_date ~ end_date 전체 구간을 공매도 API 제한을 고려해 여러 번 나눠 호출하여 모두 연결
+        - 로컬 공매도 저장소에 없는 구간만 조회
+        
+        Returns:
+            pd.DataFrame: 전체 날짜 구간의 공매도 df (index = datetime)
+        """
+        if self.short_sale_store is not None:
+            full_df = self.short_sale_store.get_frame(
+                symbol, start_date, end_date, market_code=market_code,
+                fetch=lambda start, end: self._fetch_short_sale_chunks(symbol, start, end, market_code)
+            )
+        else:
+            full_df, _ = self._fetch_short_sale_chunks(symbol, start_date, end_date, market_code)
+
+        if not full_df.empty:
             return full_df
 
         print(f"❌ 전체 구간에 대해 공매도 데이터 없음: {symbol}")
@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from time import monotonic
+
+import pandas as pd
+from pytz import timezone
+
+from app.utils.file_utils import to_date, write_atomic, write_json
+
+
+# 경량 봉 데이터 (pykis 차트 봉과 같은 속성명, pickle 가능)
+OhlcBar = namedtuple('OhlcBar', ['time', 'open', 'high', 'low', 'close', 'volume'])
+
+BAR_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume']
+
+
+class OhlcBarStore:
+    """
+    종목/주기별 로컬 OHLC 봉 저장소 (Parquet)
+    - {root}/interval={interval}/symbol={symbol}/bars.parquet 에 봉 저장
+    - coverage.json 에 API로 조회 완료된 연속 구간(start~end)을 기록해 휴장일도 재조회하지 않음
+    - 오늘(KST) 이전 봉은 변하지 않으므로 저장하고, 오늘 봉은 저장하지 않고 매번 새로 조회
+    - 일봉만 저장 (주봉/월봉은 진행 중인 봉이 계속 바뀌므로 그대로 조회)
+    - 오늘 봉 조회 결과는 프로세스 전역으로 OHLC_LIVE_BAR_TTL_SEC 동안 공유 (같은 시각에 도는 봇들이 한 번만 조회)
+    - 같은 시각에 도는 봇 스레드들이 같은 종목을 읽고 쓰므로 종목(파티션)별 lock 안에서 로드/병합/저장
+    """
+
+    # (symbol, interval, start, end) → (조회 시각, DataFrame)
+    _live_cache = {}
+    _live_cache_lock = threading.Lock()
+
+    # 파티션 경로 → lock
+    _partition_locks = {}
+    _partition_locks_lock = threading.Lock()
+
+    def __init__(self, root_dir=None):
+        self.root_dir = root_dir or os.getenv("OHLC_BAR_STORE_DIR", "/tmp/sb-fsts/ohlc_bars")
+        self.kst = timezone("Asia/Seoul")
+
+        self.live_ttl = float(os.getenv("OHLC_LIVE_BAR_TTL_SEC", 60))
+
+        self.fetch_count = 0  # 실제 API 조회 횟수
+
+    def supports(self, interval):
+        return interval == 'day'
+
+    def _partition_dir(self, symbol, interval):
+        return os.path.join(self.root_dir, f"interval={interval}", f"symbol={symbol}")
+
+    def _partition_lock(self, symbol, interval):
+        partition_dir = self._partition_dir(symbol, interval)
+        with self._partition_locks_lock:
+            return self._partition_locks.setdefault(partition_dir, threading.Lock())
+
+    def _load(self, symbol, interval):
+        partition_dir = self._partition_dir(symbol, interval)
+        bars_path = os.path.join(partition_dir, "bars.parquet")
+        coverage_path = os.path.join(partition_dir, "coverage.json")
+
+        if not (os.path.exists(bars_path) and os.path.exists(coverage_path)):
+            return None, None
+
+        try:
+            frame = pd.read_parquet(bars_path)
+            with open(coverage_path, "r", encoding="utf-8") as f:
+                coverage = json.load(f)
+
+            return frame, (date.fromisoformat(coverage['start']), date.fromisoformat(coverage['end']))
+
+        except Exception as e:
+            print(f"⚠️ 봉 저장소 로드 실패 ({symbol}, {interval}): {e}")
+            return None, None
+
+    def _save(self, symbol, interval, frame, coverage):
+        partition_dir = self._partition_dir(symbol, interval)
+        os.makedirs(partition_dir, exist_ok=True)
+
+        bars_path = os.path.join(partition_dir, "bars.parquet")
+        coverage_path = os.path.join(partition_dir, "coverage.json")
+
+        # 고유한 임시 파일에 쓴 뒤 교체 (중간에 실패해도 기존 파일 유지, 다른 프로세스와 임시 파일이 겹치지 않음)
+        write_atomic(bars_path, lambda path: frame.to_parquet(path, index=False))
+        write_atomic(coverage_path, lambda path: write_json(path, {'start': coverage[0].isoformat(), 'end': coverage[1].isoformat()}))
+
+    def _to_frame(self, bars):
+        frame = pd.DataFrame(
+            [[c.time, float(c.open), float(c.high), float(c.low), float(c.close), float(c.volume)] for c in bars],
+            columns=BAR_COLUMNS,
+        )
+        frame['time'] = pd.to_datetime(frame['time'])
+        return frame
+
+    def _fetch(self, fetch, start, end):
+        self.fetch_count += 1
+        return self._to_frame(fetch(start, end))
+
+    def _fetch_live(self, symbol, interval, fetch, start, end):
+        """확정 전(오늘) 구간 조회, live_ttl 이내 같은 구간 조회 결과는 재사용"""
+        key = (symbol, interval, start, end)
+
+        with self._live_cache_lock:
+            cached = self._live_cache.get(key)
+            if cached is not None and monotonic() - cached[0] < self.live_ttl:
+                return cached[1]
+
+        frame = self._fetch(fetch, start, end)
+
+        with self._live_cache_lock:
+            # 오래된 항목 정리
+            for cached_key in [k for k, (fetched_at, _) in self._live_cache.items() if monotonic() - fetched_at >= self.live_ttl]:
+                del self._live_cache[cached_key]
+            self._live_cache[key] = (monotonic(), frame)
+
+        return frame
+
+    def get_frame(self, symbol, start_date, end_date, interval, fetch):
+        """
+        start_date ~ end_date 구간 봉 DataFrame (time, open, high, low, close, volume)
+        - 저장된 구간 밖(앞/뒤)만 fetch(start, end)로 조회
+        - 확정 구간(coverage)이 늘어난 경우에만 저장 (오늘 봉만 조회한 경우 파일을 다시 쓰지 않음)
+        """
+        with self._partition_lock(symbol, interval):
+            return self._get_frame(symbol, start_date, end_date, interval, fetch)
+
+    def _get_frame(self, symbol, start_date, end_date, interval, fetch):
+        start = to_date(start_date)
+        end = to_date(end_date)
+
+        # 오늘 봉은 장중에 계속 바뀌므로 어제까지만 확정 구간으로 저장
+        immutable_end = datetime.now(self.kst).date() - timedelta(days=1)
+
+        frame, coverage = self._load(symbol, interval)
+        fetched = []
+
+        if coverage is None:
+            fetched.append(self._fetch(fetch, start, end))
+            coverage_start, coverage_end = start, min(end, immutable_end)
+        else:
+            coverage_start, coverage_end = coverage
+
+            if start < coverage_start:
+                fetched.append(self._fetch(fetch, start, coverage_start - timedelta(days=1)))
+                coverage_start = start
+
+            if end > coverage_end:
+                fetch_start = coverage_end + timedelta(days=1)
+
+                # 확정 구간이 모두 저장돼 있으면 오늘 봉만 남음 → 다른 봇의 최근 조회 결과 재사용
+                if fetch_start > immutable_end:
+                    fetched.append(self._fetch_live(symbol, interval, fetch, fetch_start, end))
+                else:
+                    fetched.append(self._fetch(fetch, fetch_start, end))
+                coverage_end = max(coverage_end, min(end, immutable_end))
+
+        if fetched:
+            # 빈 조회 결과(휴장 구간)는 timezone 정보가 없으므로 병합에서 제외
+            frames = [f for f in [frame] + fetched if f is not None and not f.empty]
+            if frames:
+                frame = pd.concat(frames, ignore_index=True)
+                frame = frame.drop_duplicates(subset='time', keep='last').sort_values('time', ignore_index=True)
+            else:
+                frame = self._to_frame([])
+
+            # 확정 구간이 바뀐 경우에만 저장
+            if coverage_start <= coverage_end and (coverage_start, coverage_end) != coverage:
+                bar_dates = frame['time'].dt.date
+                self._save(symbol, interval, frame[bar_dates <= coverage_end].reset_index(drop=True), (coverage_start, coverage_end))
+
+        bar_dates = frame['time'].dt.date
+        return frame[(bar_dates >= start) & (bar_dates <= end)].reset_index(drop=True)
+
+    def get_bars(self, symbol, start_date, end_date, interval, fetch):
+        """get_frame() 결과를 OhlcBar 목록으로 반환 (기존 차트 봉 목록 대체)"""
+        frame = self.get_frame(symbol, start_date, end_date, interval, fetch)
+
+        return [
+            OhlcBar(t.to_pydatetime(), o, h, l, c, v)
+            for t, o, h, l, c, v in zip(
+                frame['time'], frame['open'].tolist(), frame['high'].tolist(),
+                frame['low'].tolist(), frame['close'].tolist(), frame['volume'].tolist()
+            )
+        ]
@@ -22,4 +22,5 @@ class SimulationHistory(Model):
     total_task_cnt = NumberAttribute(null=True)
     completed_task_cnt = NumberAttribute(null=True)
     initial_capital = NumberAttribute(null=True)
-    simulation_params = UnicodeAttribute(null=True)
\ No newline at end of file
+    simulation_params = UnicodeAttribute(null=True)
+    stage_profile = UnicodeAttribute(null=True)  # 단계별 소요 시간 json (StageProfiler.to_json)
\ No newline at end of file
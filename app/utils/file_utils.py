@@ -0,0 +1,44 @@
+import json
+import os
+import tempfile
+from datetime import date, datetime
+
+import pandas as pd
+
+
+def to_date(value):
+    """datetime / date / 문자열 → date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def write_atomic(path, write):
+    """
+    path 를 원자적으로 교체
+    - 같은 디렉터리의 고유 임시 파일(mkstemp)에 write(임시 경로) 후 os.replace
+    - 여러 프로세스/스레드가 같은 파일을 써도 임시 파일이 겹치지 않고, 실패하면 기존 파일 유지
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        remove_file(tmp_path)
+        raise
+
+
+def remove_file(path):
+    """파일 삭제 (이미 없으면 무시)"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,598 @@
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_EMA_PERIODS = (5, 10, 13, 20, 21, 55, 60, 89, 120, 200)
+DEFAULT_SMA_PERIODS = (5, 10, 20, 40, 60, 120, 200)
+DEFAULT_WMA_PERIODS = (5, 10, 20, 60, 120, 200)
+
+OHLC_COLUMNS = ["Time", "Open", "High", "Low", "Close", "Volume"]
+
+
+def _divide(a, b):
+    """pandas/numpy 나눗셈과 같은 결과 (0으로 나누면 inf/nan)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.float64(a) / np.float64(b))
+
+
+def _round(value, digits):
+    """Series.round() 와 같은 반올림 (np.round)"""
+    return float(np.round(value, digits))
+
+
+class _Ewm:
+    """pandas ewm(span, adjust).mean() 재귀식 (ignore_na=False, min_periods=0)"""
+
+    def __init__(self, span, adjust):
+        alpha = 2.0 / (span + 1.0)
+        self.old_wt_factor = 1.0 - alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+
+        self.weighted = None  # 첫 값 전
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, cur):
+        is_observation = cur == cur
+        self.nobs += int(is_observation)
+
+        if self.weighted is None:
+            self.weighted = cur
+        elif self.weighted == self.weighted:
+            self.old_wt *= self.old_wt_factor
+            if is_observation:
+                # 상수 구간 수치 오차 방지 (pandas와 동일)
+                if self.weighted != cur:
+                    self.weighted = self.old_wt * self.weighted + self.new_wt * cur
+                    self.weighted /= (self.old_wt + self.new_wt)
+                if self.adjust:
+                    self.old_wt += self.new_wt
+                else:
+                    self.old_wt = 1.0
+        elif is_observation:
+            self.weighted = cur
+
+        return self.weighted if self.nobs >= 1 else np.nan
+
+
+class _RollingSum:
+    """
+    pandas rolling(window, min_periods).sum()/mean() 고정 창 누적식 (Kahan 보정 포함)
+    - 창에서 빠지는 값/들어오는 값만 반영하므로 봉 하나당 O(1)
+    """
+
+    def __init__(self, window, min_periods=None, mean=False):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.mean = mean
+
+        self.values = deque()
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.neg_ct = 0
+        self.num_consecutive_same_value = 0
+        self.prev_value = None
+
+    def _add(self, val):
+        if val != val:
+            return
+
+        self.nobs += 1
+        y = val - self.compensation_add
+        t = self.sum_x + y
+        self.compensation_add = t - self.sum_x - y
+        self.sum_x = t
+
+        if math.copysign(1.0, val) < 0:
+            self.neg_ct += 1
+
+        if val == self.prev_value:
+            self.num_consecutive_same_value += 1
+        else:
+            self.num_consecutive_same_value = 1
+        self.prev_value = val
+
+    def _remove(self, val):
+        if val != val:
+            return
+
+        self.nobs -= 1
+        y = -val - self.compensation_remove
+        t = self.sum_x + y
+        self.compensation_remove = t - self.sum_x - y
+        self.sum_x = t
+
+        if math.copysign(1.0, val) < 0:
+            self.neg_ct -= 1
+
+    def update(self, val):
+        if self.prev_value is None:
+            # 첫 창 시작 (pandas 초기화와 동일)
+            self.prev_value = val
+            self.num_consecutive_same_value = 0
+
+        self.values.append(val)
+        if len(self.values) > self.window:
+            self._remove(self.values.popleft())
+        self._add(val)
+
+        if self.mean:
+            if self.nobs >= self.min_periods and self.nobs > 0:
+                result = self.sum_x / self.nobs
+                if self.num_consecutive_same_value >= self.nobs:
+                    result = self.prev_value
+                elif self.neg_ct == 0 and result < 0:
+                    result = 0.0
+                elif self.neg_ct == self.nobs and result > 0:
+                    result = 0.0
+                return result
+            return np.nan
+
+        if self.nobs == 0 == self.min_periods:
+            return 0.0
+        if self.nobs >= self.min_periods:
+            if self.num_consecutive_same_value >= self.nobs:
+                return self.prev_value * self.nobs
+            return self.sum_x
+        return np.nan
+
+
+class _RollingStd:
+    """
+    rolling(window) 모집단 표준편차(ddof=0) 누적식 (pandas rolling var 와 같은 Welford 갱신)
+    - 창에서 빠지는 값/들어오는 값만 반영하므로 봉 하나당 O(1)
+    - 창 값이 모두 같으면 0 (누적 오차로 0 이 아닌 값이 남지 않게 함)
+    - window 봉마다 현재 창으로 평균/제곱합을 다시 계산해 누적 오차가 쌓이지 않게 함 (평균 O(1))
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.updates = 0
+        self.nobs = 0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.compensation = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = None
+
+    def _add(self, val):
+        if val != val:
+            return
+
+        self.nobs += 1
+        prev_mean = self.mean_x - self.compensation
+        y = val - self.compensation
+        t = y - self.mean_x
+        self.compensation = t + self.mean_x - y
+        delta = t
+        if self.nobs:
+            self.mean_x += delta / self.nobs
+        else:
+            self.mean_x = 0.0
+        self.ssqdm_x += (val - prev_mean) * (val - self.mean_x)
+
+        if val == self.prev_value:
+            self.num_consecutive_same_value += 1
+        else:
+            self.num_consecutive_same_value = 1
+        self.prev_value = val
+
+    def _remove(self, val):
+        if val != val:
+            return
+
+        self.nobs -= 1
+        if self.nobs:
+            prev_mean = self.mean_x - self.compensation
+            y = val - self.compensation
+            t = y - self.mean_x
+            self.compensation = t + self.mean_x - y
+            delta = t
+            self.mean_x -= delta / self.nobs
+            self.ssqdm_x -= (val - prev_mean) * (val - self.mean_x)
+        else:
+            self.mean_x = 0.0
+            self.ssqdm_x = 0.0
+
+    def _resync(self):
+        """현재 창 값으로 평균/편차 제곱합 재계산 (np.std 와 같은 2-pass)"""
+        values = np.array([val for val in self.values if val == val], dtype=float)
+        self.nobs = len(values)
+        self.mean_x = float(values.mean()) if self.nobs else 0.0
+        self.ssqdm_x = float(((values - self.mean_x) ** 2).sum()) if self.nobs else 0.0
+        self.compensation = 0.0
+
+    def update(self, val):
+        if self.prev_value is None:
+            self.prev_value = val
+            self.num_consecutive_same_value = 0
+
+        self.values.append(val)
+        if len(self.values) > self.window:
+            self._remove(self.values.popleft())
+        self._add(val)
+
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self._resync()
+
+        if self.nobs < self.window:
+            return np.nan
+        if self.num_consecutive_same_value >= self.nobs:
+            return 0.0
+        return math.sqrt(max(self.ssqdm_x / self.nobs, 0.0))
+
+
+class _RollingExtreme:
+    """rolling(window, min_periods=1).min()/max() 단조 deque"""
+
+    def __init__(self, window, is_max):
+        self.window = window
+        self.is_max = is_max
+        self.items = deque()  # (위치, 값)
+        self.count = 0
+
+    def update(self, val):
+        position = self.count
+        self.count += 1
+
+        while self.items and (self.items[-1][1] <= val if self.is_max else self.items[-1][1] >= val):
+            self.items.pop()
+        self.items.append((position, val))
+
+        while self.items[0][0] <= position - self.window:
+            self.items.popleft()
+
+        return self.items[0][1]
+
+
+class _RollingWma:
+    """
+    rolling(period).apply(가중합 / 가중치합) 의 O(1) 누적식
+    - 가중합 W' = W - S + period * x_new, 합계 S' = S - x_old + x_new
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.weight_sum = period * (period + 1) / 2
+        self.values = deque()
+        self.total = 0.0
+        self.weighted_total = 0.0
+
+    def update(self, val):
+        if len(self.values) < self.period:
+            self.values.append(val)
+            self.weighted_total += len(self.values) * val
+            self.total += val
+        else:
+            self.weighted_total += self.period * val - self.total
+            self.total += val - self.values.popleft()
+            self.values.append(val)
+
+        if len(self.values) < self.period:
+            return np.nan
+        return self.weighted_total / self.weight_sum
+
+
+class IncrementalIndicators:
+    """
+    봉 추가 시 지표를 O(1)로 갱신하는 상태형 지표 계산기
+    - symbol_prep.build_indicator_df 와 같은 컬럼을 생성
+    - EMA 누적값, 이동합, 이동 표준편차, RSI 평균, 최고/최저 단조 deque 등 재귀 상태를 보관
+    - 수평선(horizontal_high/low)은 lookback_next 봉 뒤에 확정되므로 append 시 과거 행 하나가 함께 갱신됨
+    - 오늘처럼 아직 바뀌는 봉은 copy() 한 상태에 append 해서 원래 상태를 유지
+    """
+
+    def __init__(self, rsi_period=25, lookback_prev=5, lookback_next=5,
+                 ema_periods=DEFAULT_EMA_PERIODS, sma_periods=DEFAULT_SMA_PERIODS, wma_periods=DEFAULT_WMA_PERIODS,
+                 extra_columns=()):
+        self.rsi_period = rsi_period
+        self.lookback_prev = lookback_prev
+        self.lookback_next = lookback_next
+        self.mfi_period = 14
+        self.bb_window = 20
+
+        # 같은 주기는 한 번만 계산 (차트용 지표 주기 포함)
+        self.ema_periods = list(dict.fromkeys(ema_periods))
+        self.sma_periods = list(dict.fromkeys(sma_periods))
+        self.wma_periods = list(dict.fromkeys(wma_periods))
+        self.extra_columns = list(extra_columns)
+
+        self.ema = {period: _Ewm(period, adjust=True) for period in self.ema_periods}
+        self.sma = {period: _RollingSum(period, mean=True) for period in self.sma_periods}
+        self.wma = {period: _RollingWma(period) for period in self.wma_periods}
+
+        self.rsi_gain = _RollingSum(rsi_period, min_periods=1, mean=True)
+        self.rsi_loss = _RollingSum(rsi_period, min_periods=1, mean=True)
+
+        self.macd_short = _Ewm(12, adjust=False)
+        self.macd_long = _Ewm(26, adjust=False)
+        self.macd_signal = _Ewm(9, adjust=False)
+
+        self.stochastic_low = _RollingExtreme(14, is_max=False)
+        self.stochastic_high = _RollingExtreme(14, is_max=True)
+        self.stochastic_k = _Ewm(3, adjust=True)
+        self.stochastic_d = _Ewm(3, adjust=True)
+
+        self.mfi_positive = _RollingSum(self.mfi_period)
+        self.mfi_negative = _RollingSum(self.mfi_period)
+
+        self.bb_mean = _RollingSum(self.bb_window, mean=True)
+        self.bb_std = _RollingStd(self.bb_window)
+
+        self.slope_55_ma = _RollingSum(3, mean=True)
+        self.slope_89_ma = _RollingSum(3, mean=True)
+
+        self.prev_close = np.nan
+        self.prev_tp = np.nan
+        self.prev_ema_55 = np.nan
+        self.prev_ema_89 = np.nan
+
+        # 수평선 판정용 상태
+        # - window_*: [중심 - lookback_prev, 중심 + lookback_next] 구간 최고/최저
+        # - past_*: 중심 이전 lookback_prev 봉 최고/최저 (lookback_next + 1 봉 늦게 반영)
+        # - pending_*: 아직 past_* 에 반영하지 않은 최근 고가/저가 (맨 앞이 확정 대상 중심 봉)
+        window = lookback_prev + lookback_next + 1
+        self.window_high = _RollingExtreme(window, is_max=True)
+        self.window_low = _RollingExtreme(window, is_max=False)
+        self.past_high = _RollingExtreme(lookback_prev, is_max=True) if lookback_prev > 0 else None
+        self.past_low = _RollingExtreme(lookback_prev, is_max=False) if lookback_prev > 0 else None
+        self.pending_highs = deque(maxlen=lookback_next + 1)
+        self.pending_lows = deque(maxlen=lookback_next + 1)
+
+        self.index = []
+        self.columns = {name: [] for name in self.column_names()}
+
+    def column_names(self):
+        """build_indicator_df 와 같은 컬럼 순서"""
+        return (
+            OHLC_COLUMNS
+            + self.extra_columns
+            + [f'EMA_{period}' for period in self.ema_periods]
+            + [f'SMA_{period}' for period in self.sma_periods]
+            + ['rsi', 'ema_short', 'ema_long', 'macd', 'macd_signal', 'macd_histogram',
+               'stochastic_k', 'stochastic_d',
+               'TP', 'RMF', 'Prev_TP', 'Positive_MF', 'Negative_MF', 'PMF', 'NMF', 'MFR', 'mfi',
+               'BB_Middle', 'BB_Upper', 'BB_Lower', 'horizontal_high', 'horizontal_low']
+            + [f'WMA_{period}' for period in self.wma_periods]
+            + ['EMA_89_Slope', 'EMA_55_Slope', 'EMA_55_Slope_MA', 'EMA_89_Slope_MA']
+        )
+
+    def __len__(self):
+        return len(self.index)
+
+    def copy(self):
+        """현재 상태 복사 (지표 상태는 깊은 복사, 컬럼 목록은 목록만 복사)"""
+        clone = IncrementalIndicators.__new__(IncrementalIndicators)
+        for name, value in self.__dict__.items():
+            if name == 'columns':
+                clone.columns = {column: values.copy() for column, values in value.items()}
+            elif name == 'index':
+                clone.index = value.copy()
+            else:
+                clone.__dict__[name] = _copy_state(value)
+        return clone
+
+    @classmethod
+    def from_df(cls, df, **kwargs):
+        """
+        OHLC DataFrame(Time/Open/High/Low/Close/Volume + 공매도 등 추가 컬럼)으로 상태 생성
+        - 처음 한 번만 전체 봉을 순서대로 반영 (O(n))
+        """
+        extra_columns = [column for column in df.columns if column not in OHLC_COLUMNS]
+        state = cls(extra_columns=extra_columns, **kwargs)
+
+        for row in df[OHLC_COLUMNS + extra_columns].itertuples(index=False, name=None):
+            state.append(dict(zip(OHLC_COLUMNS + extra_columns, row)))
+
+        return state
+
+    def append(self, bar):
+        """
+        봉 하나 추가 후 새 행 반환
+        bar: Time, Open, High, Low, Close, Volume (+ extra_columns) 값을 가진 dict
+        """
+        row = {}
+        for column in OHLC_COLUMNS:
+            row[column] = bar[column]
+        for column in ('Open', 'High', 'Low', 'Close', 'Volume'):
+            row[column] = float(row[column])
+        for column in self.extra_columns:
+            row[column] = bar.get(column, np.nan)
+
+        high, low, close, volume = row['High'], row['Low'], row['Close'], row['Volume']
+
+        # EMA / SMA
+        for period in self.ema_periods:
+            row[f'EMA_{period}'] = _round(self.ema[period].update(close), 0)
+        for period in self.sma_periods:
+            row[f'SMA_{period}'] = _round(self.sma[period].update(close), 1)
+
+        # RSI (이동평균 방식)
+        position = len(self.index)
+        delta = close - self.prev_close
+        gain = delta if delta > 0 else 0.0
+        loss = -(delta if delta < 0 else 0.0)
+        avg_gain = self.rsi_gain.update(gain)
+        avg_loss = self.rsi_loss.update(loss)
+        rs = avg_gain / (avg_loss + 1e-10)
+        row['rsi'] = np.nan if position < self.rsi_period else _round(100 - (100 / (1 + rs)), 2)
+
+        # MACD
+        ema_short = self.macd_short.update(close)
+        ema_long = self.macd_long.update(close)
+        macd = ema_short - ema_long
+        macd_signal = self.macd_signal.update(macd)
+        row['ema_short'] = _round(ema_short, 2)
+        row['ema_long'] = _round(ema_long, 2)
+        row['macd'] = _round(macd, 2)
+        row['macd_signal'] = _round(macd_signal, 2)
+        row['macd_histogram'] = _round(macd - macd_signal, 2)
+
+        # Stochastic Slow
+        low_min = self.stochastic_low.update(low)
+        high_max = self.stochastic_high.update(high)
+        fast_k = _divide(close - low_min, high_max - low_min) * 100
+        slow_k = self.stochastic_k.update(fast_k)
+        slow_d = self.stochastic_d.update(slow_k)
+        row['stochastic_k'] = _round(slow_k, 2)
+        row['stochastic_d'] = _round(slow_d, 2)
+
+        # MFI
+        tp = (high + low + close) / 3
+        rmf = tp * volume
+        positive_mf = rmf if tp > self.prev_tp else 0.0
+        negative_mf = rmf if tp < self.prev_tp else 0.0
+        pmf = self.mfi_positive.update(positive_mf)
+        nmf = self.mfi_negative.update(negative_mf)
+        mfr = pmf / (nmf + 1e-10)
+        row['TP'] = tp
+        row['RMF'] = rmf
+        row['Prev_TP'] = self.prev_tp
+        row['Positive_MF'] = positive_mf
+        row['Negative_MF'] = negative_mf
+        row['PMF'] = pmf
+        row['NMF'] = nmf
+        row['MFR'] = mfr
+        row['mfi'] = np.nan if position < self.mfi_period else _round(100 - (100 / (1 + mfr)), 2)
+
+        # Bollinger Band
+        bb_middle = self.bb_mean.update(close)
+        bb_std = self.bb_std.update(close)
+        row['BB_Middle'] = bb_middle
+        row['BB_Upper'] = bb_middle + (bb_std * 2)
+        row['BB_Lower'] = bb_middle - (bb_std * 2)
+
+        # 수평선은 lookback_next 봉 뒤에 확정
+        row['horizontal_high'] = None
+        row['horizontal_low'] = None
+
+        # WMA
+        for period in self.wma_periods:
+            row[f'WMA_{period}'] = _round(self.wma[period].update(close), 1)
+
+        # EMA 기울기
+        ema_55 = row.get('EMA_55', np.nan)
+        ema_89 = row.get('EMA_89', np.nan)
+        slope_89 = ema_89 - self.prev_ema_89
+        slope_55 = _divide(ema_55 - self.prev_ema_55, self.prev_ema_55) * 100
+        row['EMA_89_Slope'] = slope_89
+        row['EMA_55_Slope'] = slope_55
+        row['EMA_55_Slope_MA'] = self.slope_55_ma.update(slope_55)
+        row['EMA_89_Slope_MA'] = self.slope_89_ma.update(slope_89)
+
+        self.prev_close = close
+        self.prev_tp = tp
+        self.prev_ema_55 = ema_55
+        self.prev_ema_89 = ema_89
+
+        self.index.append(pd.Timestamp(row['Time']).tz_localize(None) if pd.Timestamp(row['Time']).tzinfo else pd.Timestamp(row['Time']))
+        for column, values in self.columns.items():
+            values.append(row[column])
+
+        self._update_horizontal_levels(high, low)
+
+        return row
+
+    def _update_horizontal_levels(self, high, low):
+        """
+        lookback_next 봉 전 행의 고점/저점 수평선 확정 (cal_horizontal_levels_df 와 같은 조건)
+        - 구간/이전 구간 최고·최저를 단조 deque 로 유지하므로 봉 하나당 O(1)
+        """
+        # 중심 봉 바로 앞 봉이 이전 구간에 들어옴
+        past_high = past_low = np.nan
+        if len(self.pending_highs) == self.pending_highs.maxlen and self.past_high is not None:
+            past_high = self.past_high.update(self.pending_highs[0])
+            past_low = self.past_low.update(self.pending_lows[0])
+
+        self.pending_highs.append(high)
+        self.pending_lows.append(low)
+        window_high = self.window_high.update(high)
+        window_low = self.window_low.update(low)
+
+        center_position = len(self.index) - 1 - self.lookback_next
+        if center_position < self.lookback_prev:
+            return
+
+        center_high = self.pending_highs[0]
+        center_low = self.pending_lows[0]
+
+        # 고점 조건: 중심값이 최고점이고, 이전 구간에 동일 가격이 없어야 함
+        # (중심값이 구간 최고점이면 이전 구간 값은 모두 그 이하이므로, 이전 구간 최고점과 다르면 동일 가격 없음)
+        if center_high == window_high and not past_high == center_high:
+            self.columns['horizontal_high'][center_position] = center_high
+
+        # 저점 조건: 중심값이 최저점이고, 이전 구간에 동일 가격이 없어야 함
+        if center_low == window_low and not past_low == center_low:
+            self.columns['horizontal_low'][center_position] = center_low
+
+    def to_df(self):
+        """현재까지의 지표 DataFrame"""
+        df = pd.DataFrame(self.columns, index=pd.DatetimeIndex(self.index))
+
+        # 수평선은 배치 계산과 같이 값이 없는 행을 None 으로 유지 (float 변환 시 NaN 이 되므로 object 배열로 다시 넣음)
+        for column in ('horizontal_high', 'horizontal_low'):
+            values = np.empty(len(df), dtype=object)
+            values[:] = self.columns[column]
+            df[column] = values
+        return df
+
+    def parity_check(self, batch_df, columns=None):
+        """
+        배치 계산 결과(build_indicator_df)와 비교
+        - 반올림된 컬럼은 반올림 단위 1칸 이내 차이(누적 오차로 인한 경계값)를 허용
+
+        Returns:
+            dict: {컬럼명: 불일치 행 수} (불일치가 없으면 빈 dict)
+        """
+        incremental_df = self.to_df()
+        columns = columns or [column for column in incremental_df.columns if column in batch_df.columns and column != 'Time']
+
+        mismatches = {}
+        for column in columns:
+            left = pd.to_numeric(incremental_df[column], errors='coerce').to_numpy(dtype=float)
+            right = pd.to_numeric(batch_df[column], errors='coerce').to_numpy(dtype=float)
+
+            if len(left) != len(right):
+                mismatches[column] = abs(len(left) - len(right))
+                continue
+
+            tolerance = _column_tolerance(column)
+            both_nan = np.isnan(left) & np.isnan(right)
+            close = np.isclose(left, right, rtol=1e-9, atol=tolerance) | both_nan
+            count = int((~close).sum())
+            if count:
+                mismatches[column] = count
+
+        return mismatches
+
+
+def _column_tolerance(column):
+    if column.startswith('EMA_') and not column.endswith(('Slope', 'Slope_MA')):
+        return 1.0 + 1e-9
+    if column.startswith(('SMA_', 'WMA_')):
+        return 0.1 + 1e-9
+    if column in ('rsi', 'mfi', 'stochastic_k', 'stochastic_d', 'ema_short', 'ema_long', 'macd', 'macd_signal', 'macd_histogram'):
+        return 0.01 + 1e-9
+    return 1e-9
+
+
+def _copy_state(value):
+    if isinstance(value, deque):
+        return deque((_copy_state(item) for item in value), maxlen=value.maxlen)
+    if isinstance(value, dict):
+        return {key: _copy_state(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_state(item) for item in value]
+    if isinstance(value, (_Ewm, _RollingSum, _RollingStd, _RollingExtreme, _RollingWma)):
+        clone = value.__class__.__new__(value.__class__)
+        clone.__dict__ = {name: _copy_state(item) for name, item in value.__dict__.items()}
+        return clone
+    return value
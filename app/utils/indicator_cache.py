@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from time import monotonic, time
+
+import numpy as np
+import pandas as pd
+
+from app.utils.file_utils import remove_file, write_atomic, write_json
+
+
+class IndicatorFrameCache:
+    """
+    지표 DataFrame 캐시 (메모리 LRU + 디스크 Parquet)
+    - 키: 종목, 주기, 봉 데이터 해시, 공매도 데이터 해시, rsi_period, 지표 집합, 차트 지표
+      → 입력 데이터가 같으면 같은 키 (오늘 봉이 바뀌면 해시가 바뀌어 자동으로 새로 계산)
+    - 디스크: {root}/{키 앞 2자리}/{키}.parquet + 컬럼 dtype 정보 {키}.json
+    - 조회 결과는 복사본을 반환하므로 호출 측에서 컬럼을 추가해도 캐시에는 영향 없음
+    - 디스크 정리: INDICATOR_CACHE_MAX_AGE_DAYS 보다 오래 안 쓴 항목 삭제, 전체 크기가 INDICATOR_CACHE_MAX_DISK_MB 를 넘으면 오래된 순 삭제
+      (INDICATOR_CACHE_EVICT_SEC 주기로 저장 시점에 실행)
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, root_dir=None, max_entries=None):
+        self.root_dir = root_dir or os.getenv("INDICATOR_CACHE_DIR", "/tmp/sb-fsts/indicator_frames")
+        self.max_entries = max_entries or int(os.getenv("INDICATOR_CACHE_MAX_ENTRIES", 64))
+        self.max_disk_bytes = float(os.getenv("INDICATOR_CACHE_MAX_DISK_MB", 512)) * 1024 * 1024
+        self.max_age_sec = float(os.getenv("INDICATOR_CACHE_MAX_AGE_DAYS", 7)) * 86400
+        self.evict_interval = float(os.getenv("INDICATOR_CACHE_EVICT_SEC", 300))
+        self.last_evicted_at = None
+
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'disk_evictions': 0}
+
+    @classmethod
+    def default(cls):
+        """프로세스 전역 캐시 (INDICATOR_CACHE_ENABLED=false 이면 None)"""
+        if os.getenv("INDICATOR_CACHE_ENABLED", "true").lower() != "true":
+            return None
+
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def make_key(symbol, interval, ohlc_data, short_df=None, rsi_period=25, required=None, indicators=None):
+        """입력 데이터/파라미터로 캐시 키(sha256) 생성"""
+        digest = hashlib.sha256()
+
+        digest.update(json.dumps({
+            'symbol': symbol,
+            'interval': interval,
+            'rsi_period': rsi_period,
+            'required': sorted(required) if required is not None else None,
+            'indicators': [
+                [i.get('type'), i.get('period'), i.get('draw_yn')] for i in indicators or []
+                if i.get('type') in ('ema', 'sma')
+            ],
+        }, sort_keys=True, default=str).encode())
+
+        # 봉 데이터
+        bars = np.array(
+            [[pd.Timestamp(c.time).value, float(c.open), float(c.high), float(c.low), float(c.close), float(c.volume)] for c in ohlc_data],
+            dtype=float,
+        )
+        digest.update(bars.tobytes())
+
+        # 공매도 데이터
+        if short_df is not None and not short_df.empty:
+            digest.update(pd.util.hash_pandas_object(short_df, index=True).to_numpy().tobytes())
+            digest.update(json.dumps([str(c) for c in short_df.columns]).encode())
+
+        return digest.hexdigest()
+
+    def _paths(self, key):
+        partition_dir = os.path.join(self.root_dir, key[:2])
+        return partition_dir, os.path.join(partition_dir, f"{key}.parquet"), os.path.join(partition_dir, f"{key}.json")
+
+    def _load(self, key):
+        _, data_path, meta_path = self._paths(key)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None
+
+        try:
+            df = pd.read_parquet(data_path)
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+
+            # 디스크 정리 기준 (최근 사용 시각)
+            os.utime(data_path)
+
+            # Parquet 저장 시 바뀌는 dtype 복원 (수평선 object 컬럼, datetime 단위)
+            for column, dtype in meta['dtypes'].items():
+                if dtype == 'object':
+                    values = df[column].to_numpy(dtype=float)
+                    restored = np.full(len(values), None, dtype=object)
+                    for i in np.flatnonzero(~np.isnan(values)):
+                        restored[i] = values[i]
+                    df[column] = restored
+                elif str(df[column].dtype) != dtype:
+                    df[column] = df[column].astype(dtype)
+
+            if str(df.index.dtype) != meta['index_dtype']:
+                df.index = df.index.astype(meta['index_dtype'])
+
+            return df
+
+        except Exception as e:
+            print(f"⚠️ 지표 캐시 로드 실패 ({key[:12]}): {e}")
+            return None
+
+    def _save(self, key, df):
+        partition_dir, data_path, meta_path = self._paths(key)
+
+        try:
+            os.makedirs(partition_dir, exist_ok=True)
+
+            # 고유한 임시 파일에 쓴 뒤 교체 (여러 프로세스/스레드가 같은 키를 써도 안전)
+            meta = {
+                'dtypes': {str(column): str(dtype) for column, dtype in df.dtypes.items()},
+                'index_dtype': str(df.index.dtype),
+            }
+            write_atomic(data_path, lambda path: df.to_parquet(path))
+            write_atomic(meta_path, lambda path: write_json(path, meta))
+
+        except Exception as e:
+            print(f"⚠️ 지표 캐시 저장 실패 ({key[:12]}): {e}")
+
+    def get(self, key):
+        """캐시된 지표 DataFrame 복사본 (없으면 None)"""
+        with self.lock:
+            df = self.entries.get(key)
+            if df is not None:
+                self.entries.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return df.copy()
+
+        df = self._load(key)
+
+        with self.lock:
+            if df is None:
+                self.stats['misses'] += 1
+                return None
+
+            self.stats['disk_hits'] += 1
+            self._remember(key, df)
+
+        return df.copy()
+
+    def put(self, key, df, persist=True):
+        """
+        지표 DataFrame 저장 (메모리 + 디스크)
+        - persist=False: 메모리에만 저장 (오늘 봉이 포함돼 다음 실행에 같은 키가 나올 수 없는 경우)
+        """
+        df = df.copy()
+
+        with self.lock:
+            self._remember(key, df)
+
+        if not persist:
+            return
+
+        self._save(key, df)
+
+        with self.lock:
+            due = self.last_evicted_at is None or monotonic() - self.last_evicted_at >= self.evict_interval
+            if due:
+                self.last_evicted_at = monotonic()
+
+        if due:
+            self.evict_disk()
+
+    def evict_disk(self):
+        """디스크 캐시 정리 (오래 안 쓴 항목 → 용량 초과분 순서로 삭제), 삭제한 항목 수 반환"""
+        now = time()
+        entries = []
+        total_bytes = 0
+
+        for dir_path, _, file_names in os.walk(self.root_dir):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+                # 중단된 저장의 임시 파일
+                if file_name.endswith(".tmp"):
+                    if now - stat.st_mtime >= 3600:
+                        remove_file(path)
+                    continue
+
+                if file_name.endswith(".parquet"):
+                    meta_path = path[:-len(".parquet")] + ".json"
+                    size = stat.st_size + (os.path.getsize(meta_path) if os.path.exists(meta_path) else 0)
+                    entries.append((stat.st_mtime, size, path, meta_path))
+                    total_bytes += size
+
+        evicted = 0
+        for mtime, size, data_path, meta_path in sorted(entries):
+            if now - mtime < self.max_age_sec and total_bytes <= self.max_disk_bytes:
+                break
+
+            remove_file(data_path)
+            remove_file(meta_path)
+            total_bytes -= size
+            evicted += 1
+
+        if evicted:
+            with self.lock:
+                self.stats['disk_evictions'] += evicted
+            print(f"♻️ 지표 캐시 디스크 정리: {evicted:,}개 삭제 (남은 용량 {total_bytes / 1024 / 1024:,.1f} MB)")
+
+        return evicted
+
+    def _remember(self, key, df):
+        self.entries[key] = df
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get_stats(self):
+        """적중/미스 횟수"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self.entries)
+            return stats
@@ -0,0 +1,96 @@
+from app.utils.incremental_indicator import DEFAULT_EMA_PERIODS, DEFAULT_SMA_PERIODS, DEFAULT_WMA_PERIODS
+
+
+# 지표 키
+# - 'EMA_5', 'SMA_20', 'WMA_60' 처럼 컬럼명 그대로 쓰는 이동평균
+# - 'rsi', 'macd', 'stochastic', 'mfi', 'bollinger', 'horizontal_levels', 'ema_slope' 묶음 지표
+ALL_INDICATORS = (
+    [f'EMA_{period}' for period in DEFAULT_EMA_PERIODS]
+    + [f'SMA_{period}' for period in DEFAULT_SMA_PERIODS]
+    + ['rsi', 'macd', 'stochastic', 'mfi', 'bollinger', 'horizontal_levels']
+    + [f'WMA_{period}' for period in DEFAULT_WMA_PERIODS]
+    + ['ema_slope']
+)
+
+# 지표 → 계산에 먼저 필요한 지표
+INDICATOR_DEPENDENCIES = {
+    'ema_slope': {'EMA_55', 'EMA_89'},
+}
+
+# 매매 신호 계산 자체에 항상 필요한 지표 (지지/저항선 ConfirmedLevelTracker, 고점 추세선)
+BASE_INDICATORS = {'horizontal_levels'}
+
+# 매매 로직 → 사용하는 지표
+# - 여기 없는 로직은 어떤 컬럼을 읽는지 알 수 없으므로 전체 지표를 계산
+# - 로직이 ohlc_df 전체를 받는 경우 실제로 읽는 컬럼을 확인한 뒤에만 등록
+LOGIC_INDICATORS = {
+    'rsi_trading': {'rsi'},
+    'rsi_trading2': {'rsi'},
+}
+
+# 시뮬레이션 차트가 항상 그리는 지표 (볼린저 밴드, 보조지표 패널)
+CHART_PANEL_INDICATORS = {'bollinger', 'rsi', 'macd', 'stochastic', 'mfi'}
+
+# 차트 indicators 항목 type → 사용하는 지표 (ema/sma 는 period 로 결정)
+CHART_INDICATORS = {
+    'bollinger_band': {'bollinger'},
+    'horizontal_high': {'horizontal_levels'},
+    'horizontal_low': {'horizontal_levels'},
+    'high_trendline': {'horizontal_levels'},
+    'low_trendline': {'horizontal_levels'},
+}
+
+
+def register_logic_indicators(trading_logic, *indicators):
+    """매매 로직이 사용하는 지표 등록 (모르는 지표 키는 오류)"""
+    unknown = [i for i in indicators if i not in ALL_INDICATORS]
+    if unknown:
+        raise ValueError(f"알 수 없는 지표: {unknown}")
+
+    LOGIC_INDICATORS[trading_logic] = set(indicators)
+
+
+def _chart_indicator_dependencies(indicator):
+    if indicator.get('type') in ('ema', 'sma'):
+        if indicator.get('draw_yn') is not True:
+            return set()
+        return {f"{indicator['type'].upper()}_{indicator['period']}"}
+
+    return CHART_INDICATORS.get(indicator.get('type'))
+
+
+def resolve_indicators(buy_trading_logic=None, sell_trading_logic=None, indicators=None, chart=False):
+    """
+    선택한 매매 로직(+차트 지표)에 필요한 지표 키 집합
+    - 선행 지표까지 포함 (예: ema_slope → EMA_55, EMA_89)
+    - 의존성을 모르는 로직/차트 항목이 하나라도 있으면 None (전체 계산)
+
+    Args:
+        chart: 시뮬레이션 차트용 df 인지 여부 (차트 기본 패널 + indicators 항목 포함)
+    """
+    required = set(BASE_INDICATORS)
+
+    for trading_logic in list(buy_trading_logic or []) + list(sell_trading_logic or []):
+        dependencies = LOGIC_INDICATORS.get(trading_logic)
+        if dependencies is None:
+            return None
+        required |= dependencies
+
+    if chart:
+        required |= CHART_PANEL_INDICATORS
+
+        for indicator in indicators or []:
+            dependencies = _chart_indicator_dependencies(indicator)
+            if dependencies is None:
+                return None
+            required |= dependencies
+
+    # 선행 지표 추가
+    pending = list(required)
+    while pending:
+        for dependency in INDICATOR_DEPENDENCIES.get(pending.pop(), ()):
+            if dependency not in required:
+                required.add(dependency)
+                pending.append(dependency)
+
+    return required
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.utils.incremental_indicator import DEFAULT_EMA_PERIODS, DEFAULT_SMA_PERIODS
+
+
+class IndicatorPanel:
+    """
+    여러 종목 지표를 날짜(행) × 종목(열) 2-D 배열로 한 번에 계산
+    - 입력은 날짜 기준으로 맞춘 Open/High/Low/Close/Volume 배열, 봉이 없는 칸은 NaN
+    - 종목별로 실제 봉만 위로 모아서(compact) 계산한 뒤 원래 날짜 위치로 되돌림
+      → 거래정지/상장 전 구간이 있어도 종목별 계산(build_indicator_df)과 같은 값
+    - frame(symbol) 로 종목별 DataFrame 을 꺼내 기존 매매 로직에 그대로 사용
+    """
+
+    def __init__(self, dates, symbols, open, high, low, close, volume):
+        self.dates = pd.DatetimeIndex(dates)
+        self.symbols = list(symbols)
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        self.values = {
+            'Open': np.asarray(open, dtype=float),
+            'High': np.asarray(high, dtype=float),
+            'Low': np.asarray(low, dtype=float),
+            'Close': np.asarray(close, dtype=float),
+            'Volume': np.asarray(volume, dtype=float),
+        }
+
+        shape = (len(self.dates), len(self.symbols))
+        for name, value in self.values.items():
+            if value.shape != shape:
+                raise ValueError(f"{name} 배열 크기 {value.shape} 가 (날짜 수, 종목 수) {shape} 와 다릅니다.")
+
+        # 봉이 있는 칸 (종가 기준)
+        self.mask = ~np.isnan(self.values['Close'])
+
+        # 종목별로 봉이 있는 행을 위로 모으는 순서
+        self.order = np.argsort(~self.mask, axis=0, kind='stable')
+
+    @classmethod
+    def from_bars(cls, bars_by_symbol):
+        """
+        종목별 봉 목록({symbol: [OhlcBar, ...]})을 날짜 기준 2-D 배열로 정렬해서 생성
+        - 날짜는 tz 제거한 봉 시각 (build_indicator_df 의 index 와 동일)
+        """
+        frames = {}
+        for symbol, bars in bars_by_symbol.items():
+            index = pd.DatetimeIndex([bar.time for bar in bars])
+            if index.tz is not None:
+                index = index.tz_localize(None)
+            frames[symbol] = pd.DataFrame(
+                [[float(bar.open), float(bar.high), float(bar.low), float(bar.close), float(bar.volume)] for bar in bars],
+                columns=['Open', 'High', 'Low', 'Close', 'Volume'],
+                index=index,
+            )
+
+        dates = pd.DatetimeIndex(sorted(set().union(*[frame.index for frame in frames.values()]))) if frames else pd.DatetimeIndex([])
+        symbols = list(frames.keys())
+
+        arrays = {}
+        for column in ['Open', 'High', 'Low', 'Close', 'Volume']:
+            arrays[column] = np.column_stack(
+                [frames[symbol][column].reindex(dates).to_numpy(dtype=float) for symbol in symbols]
+            ) if symbols else np.empty((len(dates), 0))
+
+        return cls(dates, symbols, arrays['Open'], arrays['High'], arrays['Low'], arrays['Close'], arrays['Volume'])
+
+    def _compact(self, name):
+        """종목별 봉을 위로 모은 DataFrame (행 위치 = 종목별 봉 순번, 남는 칸은 NaN)"""
+        return pd.DataFrame(np.take_along_axis(self.values[name], self.order, axis=0))
+
+    def _expand(self, compact):
+        """compact 결과를 원래 날짜 위치로 되돌림 (봉이 없는 칸은 NaN)"""
+        out = np.empty(self.mask.shape)
+        np.put_along_axis(out, self.order, np.asarray(compact, dtype=float), axis=0)
+        out[~self.mask] = np.nan
+        return out
+
+    def compute(self, ema_periods=DEFAULT_EMA_PERIODS, sma_periods=DEFAULT_SMA_PERIODS, rsi_period=25,
+                macd=True, stochastic=True, bollinger=True):
+        """
+        EMA/SMA/RSI/MACD/Stochastic/Bollinger 를 전 종목 한 번에 계산
+        - 컬럼명/반올림은 TechnicalIndicator 의 종목별 함수와 같음
+        """
+        close = self._compact('Close')
+
+        # EMA / SMA
+        for period in ema_periods:
+            self.values[f'EMA_{period}'] = self._expand(close.ewm(span=period, adjust=True).mean().round(0))
+        for period in sma_periods:
+            self.values[f'SMA_{period}'] = self._expand(close.rolling(window=period).mean().round(1))
+
+        # RSI (이동평균 방식, 종목별 처음 rsi_period 봉은 NaN)
+        if rsi_period:
+            delta = close.diff(1)
+            gain = delta.where(delta > 0, 0)
+            loss = -delta.where(delta < 0, 0)
+            avg_gain = gain.rolling(window=rsi_period, min_periods=1).mean()
+            avg_loss = loss.rolling(window=rsi_period, min_periods=1).mean()
+            rs = avg_gain / (avg_loss + 1e-10)
+            rsi = (100 - (100 / (1 + rs))).round(2)
+            rsi.iloc[:rsi_period] = np.nan
+            self.values['rsi'] = self._expand(rsi)
+
+        # MACD
+        if macd:
+            ema_short = close.ewm(span=12, adjust=False).mean()
+            ema_long = close.ewm(span=26, adjust=False).mean()
+            macd_line = ema_short - ema_long
+            macd_signal = macd_line.ewm(span=9, adjust=False).mean()
+
+            self.values['ema_short'] = self._expand(ema_short.round(2))
+            self.values['ema_long'] = self._expand(ema_long.round(2))
+            self.values['macd'] = self._expand(macd_line.round(2))
+            self.values['macd_signal'] = self._expand(macd_signal.round(2))
+            self.values['macd_histogram'] = self._expand((macd_line - macd_signal).round(2))
+
+        # Stochastic Slow (14, 3, 3)
+        if stochastic:
+            low_min = self._compact('Low').rolling(window=14, min_periods=1).min()
+            high_max = self._compact('High').rolling(window=14, min_periods=1).max()
+            fast_k = (close - low_min) / (high_max - low_min) * 100
+            slow_k = fast_k.ewm(span=3, adjust=True).mean()
+            slow_d = slow_k.ewm(span=3, adjust=True).mean()
+
+            self.values['stochastic_k'] = self._expand(slow_k.round(2))
+            self.values['stochastic_d'] = self._expand(slow_d.round(2))
+
+        # Bollinger Band (20, 2σ, 모집단 표준편차)
+        if bollinger:
+            window = 20
+            bb_middle = close.rolling(window=window).mean()
+
+            bb_std = np.full(close.shape, np.nan)
+            if len(close) >= window:
+                # 구간 축을 연속 메모리로 복사해서 종목별 np.std 와 같은 합산 순서 유지
+                windows = np.ascontiguousarray(sliding_window_view(close.to_numpy(), window, axis=0))
+                bb_std[window - 1:] = np.std(windows, axis=-1, ddof=0)
+
+            self.values['BB_Middle'] = self._expand(bb_middle)
+            self.values['BB_Upper'] = self._expand(bb_middle + (bb_std * 2))
+            self.values['BB_Lower'] = self._expand(bb_middle - (bb_std * 2))
+
+        return self
+
+    def frame(self, symbol):
+        """종목 하나의 지표 DataFrame (봉이 있는 날짜만, 컬럼은 build_indicator_df 와 같은 이름)"""
+        column = self.symbol_index[symbol]
+        rows = self.mask[:, column]
+
+        df = pd.DataFrame(
+            {name: value[rows, column] for name, value in self.values.items()},
+            index=self.dates[rows],
+        )
+        df.insert(0, 'Time', df.index)
+        return df
@@ -0,0 +1,166 @@
+import asyncio
+import os
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.utils.kis_rate_limiter import KisPriority, get_kis_rate_limiter
+
+
+KIS_REAL_DOMAIN = "https://openapi.koreainvestment.com:9443"
+KIS_VIRTUAL_DOMAIN = "https://openapivts.koreainvestment.com:29443"
+
+# 재시도 대상 상태 코드 (KIS 초당 거래건수 초과도 5xx 로 응답)
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+
+class KisApiError(Exception):
+    """KIS API 오류 (HTTP 오류, 응답 파싱 실패, rt_cd != '0')"""
+
+
+def _get_timeout():
+    return float(os.getenv("KIS_HTTP_CONNECT_TIMEOUT", 3)), float(os.getenv("KIS_HTTP_READ_TIMEOUT", 10))
+
+
+def _get_retries():
+    return int(os.getenv("KIS_HTTP_RETRIES", 3))
+
+
+class KisHttpClient:
+    """
+    KIS REST API 공용 HTTP 클라이언트 (동기)
+    - 프로세스 전역 requests.Session 으로 keep-alive 연결 재사용
+    - 재시도(backoff)/타임아웃 통일
+    """
+
+    _session = None
+    _session_lock = threading.Lock()
+
+    @classmethod
+    def session(cls):
+        with cls._session_lock:
+            if cls._session is None:
+                pool_size = int(os.getenv("KIS_HTTP_POOL_SIZE", 20))
+                retry = Retry(
+                    total=_get_retries(),
+                    backoff_factor=0.5,
+                    status_forcelist=RETRY_STATUS_CODES,
+                    allowed_methods=["GET"],
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+
+                session = requests.Session()
+                session.mount("https://", adapter)
+                cls._session = session
+
+            return cls._session
+
+    @classmethod
+    def get(cls, url, headers=None, params=None):
+        """GET 요청 (requests.Response 반환, 상태 코드 처리는 호출 측에서)"""
+        return cls.session().get(url, headers=headers, params=params, timeout=_get_timeout())
+
+    @classmethod
+    def get_json(cls, url, headers=None, params=None, raise_on_error=False):
+        """
+        GET 요청 후 JSON 파싱
+        - 실패: HTTP 오류(재시도 소진 후 5xx/429 포함), 응답 파싱 실패, KIS 오류 응답(rt_cd != '0')
+        - 실패 시 None 반환, raise_on_error=True 면 KisApiError
+          (실패를 "데이터 없음" 과 구분해야 하는 호출 측용)
+        """
+        try:
+            try:
+                response = cls.get(url, headers=headers, params=params)
+                data = response.json() if response.status_code == 200 else None
+            except (requests.RequestException, ValueError) as e:
+                raise KisApiError(str(e)) from e
+
+            if data is None:
+                raise KisApiError(f"HTTP {response.status_code} {response.text}")
+            if data.get("rt_cd", "0") != "0":
+                raise KisApiError(f"{data.get('msg_cd')} {data.get('msg1')}")
+
+            return data
+
+        except KisApiError as e:
+            if raise_on_error:
+                raise
+            print(f"❌ API 호출 실패: {url} / {e}")
+            return None
+
+
+class AsyncKisHttpClient:
+    """
+    KIS REST API 비동기 HTTP 클라이언트
+    - 여러 종목 조회를 asyncio 로 동시에 요청 (httpx.AsyncClient 연결 풀 공유)
+    - 요청마다 프로세스 전역 제한기(kis_rate_limiter)를 거침
+    - 사용: async with AsyncKisHttpClient() as client: await client.gather_json(requests)
+    """
+
+    def __init__(self, concurrency=None, virtual=False):
+        self.concurrency = concurrency or int(os.getenv("KIS_HTTP_CONCURRENCY", 10))
+        self.rate_limiter = get_kis_rate_limiter(virtual=virtual)
+        self.client = None
+
+    async def __aenter__(self):
+        connect_timeout, read_timeout = _get_timeout()
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.client.aclose()
+        self.client = None
+
+    async def get_json(self, url, headers=None, params=None, endpoint=None, priority=KisPriority.ANALYTICS):
+        """GET 요청 후 JSON 파싱 (재시도 소진 시 None)"""
+        retries = _get_retries()
+
+        for attempt in range(retries + 1):
+            # 제한기는 스레드 기반이므로 이벤트 루프를 막지 않도록 별도 스레드에서 대기
+            await asyncio.to_thread(self.rate_limiter.acquire, endpoint, priority)
+
+            try:
+                response = await self.client.get(url, headers=headers, params=params)
+
+                if response.status_code in RETRY_STATUS_CODES and attempt < retries:
+                    await asyncio.sleep(0.5 * (2 ** attempt))
+                    continue
+
+                response.raise_for_status()
+                return response.json()
+
+            except (httpx.TransportError, httpx.HTTPStatusError, ValueError) as e:
+                if attempt < retries and isinstance(e, httpx.TransportError):
+                    await asyncio.sleep(0.5 * (2 ** attempt))
+                    continue
+
+                print(f"❌ API 호출 실패: {url} / {e}")
+                return None
+
+        return None
+
+    async def gather_json(self, requests_list):
+        """
+        여러 요청을 동시에 보내고 입력 순서대로 결과 반환
+        requests_list: [{'url', 'headers', 'params', 'endpoint', 'priority'}, ...]
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(request):
+            async with semaphore:
+                return await self.get_json(
+                    request['url'],
+                    headers=request.get('headers'),
+                    params=request.get('params'),
+                    endpoint=request.get('endpoint'),
+                    priority=request.get('priority', KisPriority.ANALYTICS),
+                )
+
+        return await asyncio.gather(*(run(request) for request in requests_list))
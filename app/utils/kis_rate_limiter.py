@@ -0,0 +1,148 @@
+import heapq
+import itertools
+import json
+import os
+import threading
+from time import monotonic, sleep
+
+
+class KisPriority:
+    """KIS API 요청 우선순위 (숫자가 작을수록 먼저 처리)"""
+    ORDER = 0        # 주문, 주문가능금액, 잔고
+    MARKET_DATA = 1  # 차트, 현재가
+    ANALYTICS = 2    # 공매도, 외인/기관 추정, 투자자 동향
+
+
+# 엔드포인트별 초당 허용 횟수 기본값 (KIS_ENDPOINT_QUOTAS 환경변수(JSON)로 덮어쓰기 가능)
+DEFAULT_ENDPOINT_QUOTAS = {
+    'daily-short-sale': 5,
+    'investor-trend-estimate': 5,
+    'inquire-investor-time-by-market': 2,
+    'inquire-psbl-order': 5,
+    'order': 5,
+}
+
+
+class _TokenBucket:
+    """단일 토큰 버킷 (엔드포인트별 제한용, 우선순위 없음)"""
+
+    def __init__(self, rate_per_sec, capacity=None):
+        self.rate = float(rate_per_sec)
+        self.capacity = float(capacity or rate_per_sec)
+        self.tokens = self.capacity
+        self.updated_at = monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, tokens=1):
+        tokens = min(tokens, self.capacity)
+
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+
+            sleep(wait)
+
+
+class KisRateLimiter:
+    """
+    프로세스 전역 KIS API 요청 제한기
+    - 전체 초당 요청 수는 우선순위 대기열이 있는 토큰 버킷으로 제한 (주문 > 시세 > 분석)
+    - 엔드포인트별 초당 요청 수는 별도 토큰 버킷으로 추가 제한
+    - 같은 프로세스의 스케줄러 스레드/스레드 풀이 하나의 제한기를 공유
+    """
+
+    def __init__(self, rate_per_sec, capacity=None, endpoint_quotas=None):
+        self.rate = float(rate_per_sec)
+        self.capacity = float(capacity or rate_per_sec)
+        self.tokens = self.capacity
+        self.updated_at = monotonic()
+
+        self.condition = threading.Condition()
+        self.waiters = []  # (priority, 순번) 힙
+        self.sequence = itertools.count()
+
+        self.endpoint_buckets = {
+            endpoint: _TokenBucket(quota) for endpoint, quota in (endpoint_quotas or {}).items()
+        }
+
+        # 우선순위별 요청 수 / 대기 시간(초)
+        self.request_counts = {}
+        self.wait_seconds = {}
+
+    def _refill(self):
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, endpoint=None, priority=KisPriority.MARKET_DATA, tokens=1):
+        """요청 1건(tokens 만큼) 보낼 수 있을 때까지 대기"""
+        started_at = monotonic()
+
+        bucket = self.endpoint_buckets.get(endpoint)
+        if bucket is not None:
+            bucket.acquire(tokens)
+
+        tokens = min(tokens, self.capacity)
+        ticket = (priority, next(self.sequence))
+
+        with self.condition:
+            heapq.heappush(self.waiters, ticket)
+
+            try:
+                while True:
+                    self._refill()
+
+                    if self.waiters[0] == ticket:
+                        if self.tokens >= tokens:
+                            self.tokens -= tokens
+                            break
+
+                        # 맨 앞 요청만 토큰이 찰 때까지 기다림
+                        self.condition.wait((tokens - self.tokens) / self.rate)
+                    else:
+                        self.condition.wait()
+            finally:
+                self.waiters.remove(ticket)
+                heapq.heapify(self.waiters)
+                self.condition.notify_all()
+
+            self.request_counts[priority] = self.request_counts.get(priority, 0) + 1
+            self.wait_seconds[priority] = self.wait_seconds.get(priority, 0.0) + monotonic() - started_at
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_kis_rate_limiter(virtual=False):
+    """
+    실전/모의 도메인별 프로세스 전역 제한기
+    - KIS_RATE_LIMIT_PER_SEC (실전, 기본 18), KIS_VIRTUAL_RATE_LIMIT_PER_SEC (모의, 기본 2)
+    """
+    key = 'virtual' if virtual else 'real'
+
+    with _limiters_lock:
+        if key not in _limiters:
+            if virtual:
+                rate = float(os.getenv("KIS_VIRTUAL_RATE_LIMIT_PER_SEC", 2))
+            else:
+                rate = float(os.getenv("KIS_RATE_LIMIT_PER_SEC", 18))
+
+            endpoint_quotas = dict(DEFAULT_ENDPOINT_QUOTAS)
+            endpoint_quotas.update(json.loads(os.getenv("KIS_ENDPOINT_QUOTAS", "{}")))
+
+            # 엔드포인트 제한이 전체 제한보다 클 필요는 없음
+            endpoint_quotas = {endpoint: min(quota, rate) for endpoint, quota in endpoint_quotas.items()}
+
+            _limiters[key] = KisRateLimiter(rate, endpoint_quotas=endpoint_quotas)
+
+        return _limiters[key]
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+
+class ConfirmedLevelTracker:
+    """
+    종목별 확정 지지선/저항선 조회기
+    - horizontal_low / horizontal_high 컬럼으로 한 번만 생성
+    - i 시점에는 [0, i - lookback_next) 구간에서 마지막으로 나타난 수평선만 사용 (미래 데이터 차단)
+    - AutoTradingBot.get_latest_confirmed_support/resistance 와 같은 값을 O(1)로 반환
+    """
+
+    def __init__(self, df, lookback_next=5):
+        self.lookback_next = lookback_next
+        self.support = self._build_confirmed_levels(df['horizontal_low'])
+        self.resistance = self._build_confirmed_levels(df['horizontal_high'])
+
+    def _build_confirmed_levels(self, levels):
+        # 마지막으로 나타난 수평선 값을 앞으로 채운 뒤, 확정까지 필요한 봉 수만큼 뒤로 민다
+        filled = pd.to_numeric(levels, errors='coerce').ffill().to_numpy(dtype=float)
+        shift = self.lookback_next + 1
+
+        confirmed = np.full(len(filled), np.nan)
+        if len(filled) > shift:
+            confirmed[shift:] = filled[:-shift]
+
+        return confirmed
+
+    def _get_level(self, confirmed, current_idx):
+        if current_idx < 0 or current_idx >= len(confirmed):
+            return None
+
+        value = confirmed[current_idx]
+        if np.isnan(value):
+            return None
+
+        return float(value)
+
+    def get_support(self, current_idx):
+        """현재 봉 위치(current_idx) 기준 확정된 지지선, 없으면 None"""
+        return self._get_level(self.support, current_idx)
+
+    def get_resistance(self, current_idx):
+        """현재 봉 위치(current_idx) 기준 확정된 저항선, 없으면 None"""
+        return self._get_level(self.resistance, current_idx)
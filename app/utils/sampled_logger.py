@@ -0,0 +1,137 @@
+import json
+import os
+import sys
+import threading
+from time import monotonic
+
+
+# 로그 레벨 (logging 모듈과 같은 값)
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+
+class SampledLogger:
+    """
+    레벨 + 메시지 키별 샘플링/초당 제한이 있는 로거 (시뮬레이션/매매 루프처럼 같은 로그가 반복되는 구간용)
+    - SIM_LOG_LEVEL 미만 레벨은 메시지를 만들지 않고 바로 반환 (필드는 출력할 때만 포맷)
+    - key 를 지정한 로그는 SIM_LOG_SAMPLE_EVERY 번 중 1번, 키별 초당 SIM_LOG_RATE_PER_SEC 건까지만 출력
+      → 건너뛴 건수는 다음 출력에 (+N건 생략) 으로 표시
+    - SIM_LOG_FORMAT=json 이면 한 줄 json (CloudWatch Logs Insights 조회용), 기본은 기존 print 와 같은 텍스트
+    """
+
+    _loggers = {}
+    _loggers_lock = threading.Lock()
+
+    def __init__(self, name, level=None, sample_every=None, rate_per_sec=None, json_format=None, stream=None):
+        self.name = name
+        self.level = level if level is not None else LEVELS.get(os.getenv("SIM_LOG_LEVEL", "INFO").upper(), INFO)
+        self.sample_every = max(int(sample_every if sample_every is not None else os.getenv("SIM_LOG_SAMPLE_EVERY", 1)), 1)
+        self.rate_per_sec = float(rate_per_sec if rate_per_sec is not None else os.getenv("SIM_LOG_RATE_PER_SEC", 10))
+        self.json_format = json_format if json_format is not None else os.getenv("SIM_LOG_FORMAT", "text").lower() == "json"
+        self.stream = stream
+
+        # key → [본 횟수, 초당 구간 시작 시각, 구간 내 출력 수, 생략 수]
+        self.keys = {}
+        self.lock = threading.Lock()
+
+        self.emitted_cnt = 0
+        self.suppressed_cnt = 0
+
+    @classmethod
+    def get(cls, name):
+        """이름별 프로세스 전역 로거"""
+        with cls._loggers_lock:
+            if name not in cls._loggers:
+                cls._loggers[name] = cls(name)
+            return cls._loggers[name]
+
+    def is_enabled(self, level):
+        return level >= self.level
+
+    def _allow(self, key):
+        """출력 여부 판단, 출력하면 그동안 생략된 건수 반환 (생략하면 None)"""
+        now = monotonic()
+
+        with self.lock:
+            state = self.keys.get(key)
+            if state is None:
+                state = self.keys[key] = [0, now, 0, 0]
+
+            state[0] += 1
+
+            # 샘플링 (N 번 중 첫 번째만)
+            if (state[0] - 1) % self.sample_every:
+                state[3] += 1
+                self.suppressed_cnt += 1
+                return None
+
+            # 키별 초당 제한
+            if now - state[1] >= 1:
+                state[1] = now
+                state[2] = 0
+            if self.rate_per_sec > 0 and state[2] >= self.rate_per_sec:
+                state[3] += 1
+                self.suppressed_cnt += 1
+                return None
+
+            state[2] += 1
+            suppressed, state[3] = state[3], 0
+            return suppressed
+
+    def log(self, level, message, key=None, **fields):
+        """
+        로그 출력 (출력했으면 True)
+        - key: 샘플링/초당 제한 단위 (None 이면 제한 없음, 경고/오류 단발 로그용)
+        - fields: 출력할 값 (텍스트 형식은 ' / 이름: 값' 으로 이어 붙임)
+        """
+        if level < self.level:
+            return False
+
+        suppressed = 0
+        if key is not None:
+            suppressed = self._allow(key)
+            if suppressed is None:
+                return False
+
+        if self.json_format:
+            line = json.dumps({
+                'level': LEVEL_NAMES.get(level, level),
+                'logger': self.name,
+                'key': key,
+                'message': message,
+                **fields,
+                **({'suppressed': suppressed} if suppressed else {}),
+            }, ensure_ascii=False, default=str)
+        else:
+            line = message + "".join(
+                f" / {name}: {value:,}" if isinstance(value, (int, float)) and not isinstance(value, bool) else f" / {name}: {value}"
+                for name, value in fields.items()
+            )
+            if suppressed:
+                line += f" (+{suppressed:,}건 생략)"
+
+        print(line, file=self.stream or sys.stdout)
+        self.emitted_cnt += 1
+        return True
+
+    def debug(self, message, key=None, **fields):
+        return self.log(DEBUG, message, key, **fields)
+
+    def info(self, message, key=None, **fields):
+        return self.log(INFO, message, key, **fields)
+
+    def warning(self, message, key=None, **fields):
+        return self.log(WARNING, message, key, **fields)
+
+    def error(self, message, key=None, **fields):
+        return self.log(ERROR, message, key, **fields)
+
+
+def get_logger(name):
+    """SampledLogger.get 단축 함수"""
+    return SampledLogger.get(name)
@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+from pytz import timezone
+
+from app.utils.file_utils import to_date, write_atomic, write_json
+
+
+class ShortSaleStore:
+    """
+    종목별 로컬 공매도 일별추이 저장소 (Parquet)
+    - {root}/market={market_code}/symbol={symbol}/short_sale.parquet 에 영업일자 index 그대로 저장
+    - coverage.json 에 조회 완료된 연속 구간(start~end)을 기록해 빈 구간만 추가 조회
+    - 오늘(KST) 데이터는 장중에 바뀌므로 어제까지만 저장
+    - 일부 구간 조회가 실패하면 해당 구간은 저장 구간으로 기록하지 않음 (다음 실행 때 다시 조회)
+    - 같은 시각에 도는 봇 스레드들이 같은 종목을 읽고 쓰므로 종목(파티션)별 lock 안에서 로드/병합/저장
+    """
+
+    # 파티션 경로 → lock
+    _partition_locks = {}
+    _partition_locks_lock = threading.Lock()
+
+    def __init__(self, root_dir=None):
+        self.root_dir = root_dir or os.getenv("SHORT_SALE_STORE_DIR", "/tmp/sb-fsts/short_sale")
+        self.kst = timezone("Asia/Seoul")
+
+    def _partition_dir(self, symbol, market_code):
+        return os.path.join(self.root_dir, f"market={market_code}", f"symbol={symbol}")
+
+    def _partition_lock(self, symbol, market_code):
+        partition_dir = self._partition_dir(symbol, market_code)
+        with self._partition_locks_lock:
+            return self._partition_locks.setdefault(partition_dir, threading.Lock())
+
+    def _load(self, symbol, market_code):
+        partition_dir = self._partition_dir(symbol, market_code)
+        data_path = os.path.join(partition_dir, "short_sale.parquet")
+        coverage_path = os.path.join(partition_dir, "coverage.json")
+
+        if not (os.path.exists(data_path) and os.path.exists(coverage_path)):
+            return None, None
+
+        try:
+            df = pd.read_parquet(data_path)
+            with open(coverage_path, "r", encoding="utf-8") as f:
+                coverage = json.load(f)
+
+            return df, (date.fromisoformat(coverage['start']), date.fromisoformat(coverage['end']))
+
+        except Exception as e:
+            print(f"⚠️ 공매도 저장소 로드 실패 ({symbol}): {e}")
+            return None, None
+
+    def _save(self, symbol, market_code, df, coverage):
+        partition_dir = self._partition_dir(symbol, market_code)
+        os.makedirs(partition_dir, exist_ok=True)
+
+        data_path = os.path.join(partition_dir, "short_sale.parquet")
+        coverage_path = os.path.join(partition_dir, "coverage.json")
+
+        # 고유한 임시 파일에 쓴 뒤 교체 (중간에 실패해도 기존 파일 유지, 다른 프로세스와 임시 파일이 겹치지 않음)
+        write_atomic(data_path, lambda path: df.to_parquet(path))
+        write_atomic(coverage_path, lambda path: write_json(path, {'start': coverage[0].isoformat(), 'end': coverage[1].isoformat()}))
+
+    def get_frame(self, symbol, start_date, end_date, fetch, market_code="J"):
+        """
+        start_date ~ end_date 구간 공매도 DataFrame (index = 영업일자)
+        - fetch(start, end) -> (DataFrame, 전체 구간 조회 성공 여부)
+        - 저장된 구간 밖(앞/뒤)만 조회
+        - 확정 구간(coverage)이 늘어난 경우에만 저장 (오늘 데이터만 조회한 경우 파일을 다시 쓰지 않음)
+        """
+        with self._partition_lock(symbol, market_code):
+            return self._get_frame(symbol, start_date, end_date, fetch, market_code)
+
+    def _get_frame(self, symbol, start_date, end_date, fetch, market_code):
+        start = to_date(start_date)
+        end = to_date(end_date)
+
+        # 오늘 데이터는 확정 전이므로 어제까지만 저장 구간으로 기록
+        immutable_end = datetime.now(self.kst).date() - timedelta(days=1)
+
+        df, coverage = self._load(symbol, market_code)
+        fetched = []
+
+        if coverage is None:
+            fetched_df, complete = fetch(start, end)
+            fetched.append(fetched_df)
+            # 실패 구간이 있으면 저장 구간으로 기록하지 않음
+            coverage_start, coverage_end = (start, min(end, immutable_end)) if complete else (None, None)
+        else:
+            coverage_start, coverage_end = coverage
+
+            if start < coverage_start:
+                fetched_df, complete = fetch(start, coverage_start - timedelta(days=1))
+                fetched.append(fetched_df)
+                if complete:
+                    coverage_start = start
+
+            if end > coverage_end:
+                fetched_df, complete = fetch(coverage_end + timedelta(days=1), end)
+                fetched.append(fetched_df)
+                if complete:
+                    coverage_end = max(coverage_end, min(end, immutable_end))
+
+        frames = [f for f in [df] + fetched if f is not None and not f.empty]
+        if not frames:
+            return pd.DataFrame()
+
+        df = pd.concat(frames).sort_index()
+        # 중복 제거 (새로 조회한 값 우선)
+        df = df[~df.index.duplicated(keep='last')]
+
+        # 확정 구간이 바뀐 경우에만 저장
+        if coverage_start is not None and coverage_start <= coverage_end and (coverage_start, coverage_end) != coverage:
+            stored_df = df[(df.index.date >= coverage_start) & (df.index.date <= coverage_end)]
+            self._save(symbol, market_code, stored_df, (coverage_start, coverage_end))
+
+        return df[(df.index.date >= start) & (df.index.date <= end)]
@@ -0,0 +1,174 @@
+import hashlib
+import hmac
+import json
+import os
+import pickle
+import secrets
+from io import BytesIO
+from time import monotonic
+
+import boto3
+from botocore.exceptions import ClientError
+
+from app.utils.file_utils import remove_file, write_atomic
+
+
+# 체크포인트 파일 형식: 헤더 + HMAC-SHA256(서명 키, pickle 바이트) + pickle 바이트
+CHECKPOINT_HEADER = b"SBCK1\n"
+SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+
+class SimulationCheckpointStore:
+    """
+    일괄 시뮬레이션 체크포인트 저장소 (로컬 디스크 + 선택적으로 S3)
+    - prepared: 조회/지표/신호 계산이 끝난 종목 데이터 (한 번만 저장, 재개 시 KIS 조회와 지표 계산 생략)
+    - state: 다음에 진행할 날짜 위치, global_state(예수금/보유 종목), 기록된 히스토리, 일별 평가
+    - 로컬: {root}/{simulation_id}/{name}.pkl, S3: {prefix}/{name}.pkl (ECS 태스크가 죽어도 남도록)
+    - 설정 fingerprint 가 다른 체크포인트는 사용하지 않음
+    - pickle 앞에 HMAC 서명을 붙이고, 서명이 맞는 경우에만 unpickle (S3 경로에 쓸 수 있는 누구나 코드를 실행할 수 없도록)
+      · 서명 키: SIMULATION_CHECKPOINT_HMAC_KEY (태스크 간 공유, S3 저장/조회는 이 키가 있을 때만 사용)
+      · 키가 없으면 로컬 전용 키 파일({root}/.checkpoint_key, 0600)로 로컬 체크포인트만 사용
+    """
+
+    def __init__(self, simulation_id, root_dir=None, bucket_name=None, prefix=None, interval_sec=None):
+        self.simulation_id = simulation_id
+        self.root_dir = os.path.join(root_dir or os.getenv("SIMULATION_CHECKPOINT_DIR", "/tmp/sb-fsts/simulation_checkpoints"), simulation_id)
+        self.bucket_name = bucket_name or os.getenv("SIMULATION_CHECKPOINT_S3_BUCKET")
+
+        self.signing_key = os.getenv("SIMULATION_CHECKPOINT_HMAC_KEY", "").encode() or None
+        if self.bucket_name and self.signing_key is None:
+            print("⚠️ SIMULATION_CHECKPOINT_HMAC_KEY 가 없어 S3 체크포인트를 사용하지 않습니다 (로컬 체크포인트만 사용)")
+            self.bucket_name = None
+        self.prefix = prefix or f"simulation-results/{simulation_id}/checkpoint"
+        self.interval_sec = interval_sec if interval_sec is not None else float(os.getenv("SIMULATION_CHECKPOINT_SEC", 300))
+
+        self.last_saved_at = monotonic()
+        self.s3_client = None
+
+    @classmethod
+    def from_env(cls, simulation_id, bucket_name=None):
+        """SIMULATION_CHECKPOINT_ENABLED=false 이면 None"""
+        if os.getenv("SIMULATION_CHECKPOINT_ENABLED", "true").lower() != "true":
+            return None
+        return cls(simulation_id, bucket_name=bucket_name)
+
+    @staticmethod
+    def fingerprint(simulation_settings):
+        """시뮬레이션 설정 해시 (같은 설정의 체크포인트인지 확인용)"""
+        settings = {k: v for k, v in simulation_settings.items() if k != 'simulation_id'}
+        return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _s3(self):
+        if self.s3_client is None:
+            self.s3_client = boto3.client('s3', region_name='ap-northeast-2', endpoint_url='https://s3.ap-northeast-2.amazonaws.com', config=boto3.session.Config(signature_version='s3v4'))
+        return self.s3_client
+
+    def _signing_key(self):
+        """서명 키 (환경 변수가 없으면 로컬 키 파일, 처음 한 번 생성)"""
+        if self.signing_key is None:
+            key_path = os.path.join(os.path.dirname(self.root_dir), ".checkpoint_key")
+            os.makedirs(os.path.dirname(key_path), exist_ok=True)
+            try:
+                # 다른 태스크와 동시에 만들어도 하나만 생성 (O_EXCL), 소유자만 읽기/쓰기
+                fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(secrets.token_bytes(32))
+            except FileExistsError:
+                pass
+            with open(key_path, "rb") as f:
+                self.signing_key = f.read()
+        return self.signing_key
+
+    def _sign(self, data):
+        return CHECKPOINT_HEADER + hmac.new(self._signing_key(), data, hashlib.sha256).digest() + data
+
+    def _verify(self, signed):
+        """서명이 맞으면 pickle 바이트, 아니면 None"""
+        if not signed.startswith(CHECKPOINT_HEADER):
+            return None
+        signature = signed[len(CHECKPOINT_HEADER):len(CHECKPOINT_HEADER) + SIGNATURE_SIZE]
+        data = signed[len(CHECKPOINT_HEADER) + SIGNATURE_SIZE:]
+        if not hmac.compare_digest(signature, hmac.new(self._signing_key(), data, hashlib.sha256).digest()):
+            return None
+        return data
+
+    def _local_path(self, name):
+        return os.path.join(self.root_dir, f"{name}.pkl")
+
+    def _s3_key(self, name):
+        return f"{self.prefix}/{name}.pkl"
+
+    def save(self, name, fingerprint, payload):
+        """체크포인트 저장 (로컬은 고유 임시 파일에 쓴 뒤 교체), 저장한 바이트 수 반환"""
+        data = self._sign(pickle.dumps({'fingerprint': fingerprint, 'payload': payload}, protocol=pickle.HIGHEST_PROTOCOL))
+
+        os.makedirs(self.root_dir, exist_ok=True)
+        write_atomic(self._local_path(name), lambda path: _write_bytes(path, data))
+
+        if self.bucket_name:
+            try:
+                self._s3().put_object(Bucket=self.bucket_name, Key=self._s3_key(name), Body=BytesIO(data))
+            except Exception as e:
+                print(f"⚠️ 체크포인트 S3 저장 실패 ({name}): {e}")
+
+        if name == 'state':
+            self.last_saved_at = monotonic()
+
+        print(f"💾 체크포인트 저장: {self.simulation_id}/{name} ({len(data) / 1024:,.0f} KB)")
+        return len(data)
+
+    def load(self, name, fingerprint):
+        """체크포인트 payload (없거나 설정이 다르면 None)"""
+        data = None
+
+        path = self._local_path(name)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+        elif self.bucket_name:
+            try:
+                data = self._s3().get_object(Bucket=self.bucket_name, Key=self._s3_key(name))['Body'].read()
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in ("NoSuchKey", "404"):
+                    print(f"⚠️ 체크포인트 S3 조회 실패 ({name}): {e}")
+
+        if data is None:
+            return None
+
+        # 서명이 맞지 않는 체크포인트는 unpickle 하지 않음
+        data = self._verify(data)
+        if data is None:
+            print(f"⚠️ 체크포인트 서명이 맞지 않아 사용하지 않습니다: {self.simulation_id}/{name}")
+            return None
+
+        try:
+            checkpoint = pickle.loads(data)
+        except Exception as e:
+            print(f"⚠️ 체크포인트 로드 실패 ({name}): {e}")
+            return None
+
+        if checkpoint.get('fingerprint') != fingerprint:
+            print(f"⚠️ 시뮬레이션 설정이 달라 체크포인트를 사용하지 않습니다: {self.simulation_id}/{name}")
+            return None
+
+        return checkpoint['payload']
+
+    def state_due(self):
+        """state 체크포인트 저장 주기가 지났는지"""
+        return monotonic() - self.last_saved_at >= self.interval_sec
+
+    def clear(self):
+        """완료된 시뮬레이션의 체크포인트 삭제"""
+        for name in ('prepared', 'state'):
+            remove_file(self._local_path(name))
+
+            if self.bucket_name:
+                try:
+                    self._s3().delete_object(Bucket=self.bucket_name, Key=self._s3_key(name))
+                except Exception as e:
+                    print(f"⚠️ 체크포인트 S3 삭제 실패 ({name}): {e}")
+
+
+def _write_bytes(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
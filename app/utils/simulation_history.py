@@ -0,0 +1,211 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+
+# _create_trading_history 와 같은 키 순서
+HISTORY_COLUMNS = [
+    'symbol', 'stock_name', 'stock_type', 'fee', 'tax', 'revenue', 'timestamp', 'timestamp_str', 'reason', 'trade_type',
+    'trade_quantity', 'avg_price', 'buy_logic_reasons', 'sell_logic_reasons', 'take_profit_hit', 'stop_loss_hit',
+    'realized_pnl', 'realized_roi', 'unrealized_pnl', 'unrealized_roi', 'krw_balance', 'total_quantity', 'total_buy_cost',
+    'close_price',
+]
+
+# 컬럼별 배열 dtype (나머지는 object)
+HISTORY_DTYPES = {
+    'fee': np.float64,
+    'tax': np.float64,
+    'revenue': np.float64,
+    'timestamp': 'datetime64[ns]',
+    'trade_quantity': np.int64,
+    'avg_price': np.float64,
+    'take_profit_hit': np.bool_,
+    'stop_loss_hit': np.bool_,
+    'realized_pnl': np.float64,
+    'realized_roi': np.float64,
+    'unrealized_pnl': np.float64,
+    'unrealized_roi': np.float64,
+    'krw_balance': np.float64,
+    'total_quantity': np.int64,
+    'total_buy_cost': np.float64,
+    'close_price': np.float64,
+}
+
+LIST_COLUMNS = ['buy_logic_reasons', 'sell_logic_reasons']
+
+
+class SimulationHistoryColumns:
+    """
+    시뮬레이션 히스토리 컬럼형 저장소
+    - 행마다 dict 를 쌓지 않고 컬럼별 배열(미리 할당, 부족하면 2배로 확장)에 기록
+    - to_parquet_bytes() 로 zstd 압축 Parquet 결과 파일 생성, to_records() 는 기존 dict 목록 형식
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = max(int(capacity), 1)
+        self.size = 0
+        self.columns = {column: self._allocate(column, self.capacity) for column in HISTORY_COLUMNS}
+
+    @staticmethod
+    def _allocate(column, capacity):
+        dtype = HISTORY_DTYPES.get(column, object)
+        if dtype == 'datetime64[ns]':
+            return np.full(capacity, np.datetime64('NaT'), dtype=dtype)
+        return np.zeros(capacity, dtype=dtype) if dtype is not object else np.full(capacity, None, dtype=object)
+
+    def _grow(self):
+        capacity = self.capacity * 2
+        for column, values in self.columns.items():
+            grown = self._allocate(column, capacity)
+            grown[:self.size] = values[:self.size]
+            self.columns[column] = grown
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.size
+
+    def add(self, **fields):
+        """히스토리 한 행 기록 (키는 _create_trading_history 인자와 동일)"""
+        if self.size == self.capacity:
+            self._grow()
+
+        i = self.size
+        for column in HISTORY_COLUMNS:
+            value = fields.get(column)
+            if value is None and HISTORY_DTYPES.get(column) is np.float64:
+                value = np.nan
+            elif value is not None and column == 'timestamp':
+                value = pd.Timestamp(value)
+                value = (value.tz_localize(None) if value.tzinfo else value).to_datetime64()
+            self.columns[column][i] = value
+        self.size += 1
+
+    def append(self, history):
+        """_create_trading_history 결과(dict) 기록"""
+        self.add(**history)
+
+    def to_frame(self):
+        """기록된 행 DataFrame (문자열/목록 컬럼은 object dtype 유지)"""
+        return pd.DataFrame({
+            column: pd.Series(values[:self.size], dtype=values.dtype)
+            for column, values in self.columns.items()
+        })
+
+    def to_records(self):
+        """기존 simulation_histories 형식 (dict 목록)"""
+        columns = []
+        for column in HISTORY_COLUMNS:
+            values = self.columns[column][:self.size]
+            if column == 'timestamp':
+                columns.append([None if pd.isna(value) else pd.Timestamp(value) for value in values])
+            elif HISTORY_DTYPES.get(column) is np.float64:
+                columns.append([None if value != value else value for value in values.tolist()])
+            else:
+                columns.append(values.tolist())
+
+        return [dict(zip(HISTORY_COLUMNS, row)) for row in zip(*columns)]
+
+    def to_parquet_bytes(self, compression='zstd'):
+        """결과 파일용 Parquet (기본 zstd 압축)"""
+        buffer = io.BytesIO()
+        self.to_frame().to_parquet(buffer, index=False, compression=compression)
+        return buffer.getvalue()
+
+
+def read_history_parquet(source):
+    """
+    Parquet 시뮬레이션 히스토리 → DataFrame
+    source: 파일 경로 또는 bytes
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    df = pd.read_parquet(source)
+
+    # 사유 목록 컬럼은 numpy 배열로 읽히므로 list 로 변환
+    for column in LIST_COLUMNS:
+        if column in df.columns:
+            df[column] = [list(values) if values is not None else [] for values in df[column]]
+
+    return df
+
+
+# 일별 포트폴리오 평가 컬럼
+EQUITY_COLUMNS = ['timestamp', 'timestamp_str', 'krw_balance', 'market_value', 'portfolio_value', 'roi']
+
+# 결과 기록 방식
+# - full: 종목 × 날짜 전체 히스토리 (매매 없는 날 포함)
+# - sparse: 매수/매도 행 + 일별 포트폴리오 평가(equity curve)만 기록
+OUTPUT_MODES = ('full', 'sparse')
+
+
+class PortfolioEquityCurve:
+    """
+    일별 포트폴리오 평가금액(예수금 + 보유 종목 평가금액) 누적 계산
+    - update(symbol, 수량, 종가) 로 종목 평가금액이 바뀐 만큼만 합계에 반영 (하루 전체 종목 재합산 없음)
+    - 봉이 없는 날(거래정지 등)은 마지막 평가금액 유지
+    """
+
+    def __init__(self, initial_capital, capacity=256):
+        self.initial_capital = initial_capital
+        self.market_values = {}
+        self.market_value = 0.0
+        self.holding_cnt = 0
+
+        self.capacity = max(int(capacity), 1)
+        self.size = 0
+        self.timestamps = np.full(self.capacity, np.datetime64('NaT'), dtype='datetime64[ns]')
+        self.timestamp_strs = np.full(self.capacity, None, dtype=object)
+        self.values = {column: np.zeros(self.capacity) for column in EQUITY_COLUMNS[2:]}
+
+    def __len__(self):
+        return self.size
+
+    def update(self, symbol, total_quantity, close_price):
+        """종목 평가금액 갱신"""
+        market_value = float(total_quantity * close_price)
+        previous = self.market_values.get(symbol, 0.0)
+
+        self.holding_cnt += (market_value != 0) - (previous != 0)
+        self.market_value += market_value - previous
+        self.market_values[symbol] = market_value
+
+    def record(self, timestamp, timestamp_str, krw_balance):
+        """하루 마감 평가 한 행 기록"""
+        if self.size == self.capacity:
+            self.capacity *= 2
+            self.timestamps = np.resize(self.timestamps, self.capacity)
+            self.timestamp_strs = np.resize(self.timestamp_strs, self.capacity)
+            self.values = {column: np.resize(values, self.capacity) for column, values in self.values.items()}
+
+        # 부동소수 누적 오차가 쌓이지 않도록 보유 종목이 없으면 0 으로 맞춤
+        if self.holding_cnt == 0:
+            self.market_value = 0.0
+
+        timestamp = pd.Timestamp(timestamp)
+        portfolio_value = krw_balance + self.market_value
+
+        i = self.size
+        self.timestamps[i] = (timestamp.tz_localize(None) if timestamp.tzinfo else timestamp).to_datetime64()
+        self.timestamp_strs[i] = timestamp_str
+        self.values['krw_balance'][i] = krw_balance
+        self.values['market_value'][i] = self.market_value
+        self.values['portfolio_value'][i] = portfolio_value
+        self.values['roi'][i] = (portfolio_value / self.initial_capital - 1) * 100 if self.initial_capital else 0.0
+        self.size += 1
+
+    def to_frame(self):
+        """일별 평가 DataFrame"""
+        df = pd.DataFrame({
+            'timestamp': self.timestamps[:self.size],
+            'timestamp_str': pd.Series(self.timestamp_strs[:self.size], dtype=object),
+        })
+        for column, values in self.values.items():
+            df[column] = values[:self.size]
+        return df
+
+    def to_records(self):
+        """결과 json 용 dict 목록 (timestamp 는 문자열만 사용)"""
+        columns = [self.timestamp_strs[:self.size].tolist()] + [self.values[column][:self.size].tolist() for column in EQUITY_COLUMNS[2:]]
+        return [dict(zip(EQUITY_COLUMNS[1:], row)) for row in zip(*columns)]
@@ -0,0 +1,115 @@
+import os
+import threading
+from datetime import datetime
+from time import perf_counter
+
+from pytz import timezone
+
+from app.utils.dynamodb.crud import DynamoDBExecutor
+from app.utils.dynamodb.model.simulation_history_model import SimulationHistory
+
+
+class SimulationProgressReporter:
+    """
+    시뮬레이션 진행률 보고 (메모리 기록 + 백그라운드 스레드 flush)
+    - advance() 는 메모리 카운터만 올리고 바로 반환 → 시뮬레이션 루프가 DynamoDB 응답을 기다리지 않음
+    - flush 조건: flush_interval 초 경과 또는 진행률이 flush_percent 단위를 넘을 때 (중간 값은 합쳐서 한 번만 기록)
+    - close() 에서 마지막 상태는 항상 기록
+    """
+
+    def __init__(self, simulation_id, total_task_cnt, flush_interval=None, flush_percent=None, writer=None):
+        self.simulation_id = simulation_id
+        self.total_task_cnt = total_task_cnt
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv("SIMULATION_PROGRESS_FLUSH_SEC", 5))
+        self.flush_percent = flush_percent if flush_percent is not None else float(os.getenv("SIMULATION_PROGRESS_FLUSH_PERCENT", 5))
+        self.writer = writer or self._write_dynamodb
+
+        self.completed_task_cnt = 0
+        self.flushed_task_cnt = None
+        self.flush_cnt = 0
+        self.flush_seconds = 0.0
+
+        self.condition = threading.Condition()
+        self.closed = False
+        self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        """백그라운드 flush 스레드 시작 (total_task_cnt 는 첫 flush 에 기록)"""
+        self.thread = threading.Thread(target=self._run, name=f"simulation-progress-{self.simulation_id}", daemon=True)
+        self.thread.start()
+        return self
+
+    def advance(self, cnt=1):
+        """완료 작업 수 증가 (I/O 없음)"""
+        with self.condition:
+            previous = self.completed_task_cnt
+            self.completed_task_cnt += cnt
+
+            # 진행률 단위를 넘으면 주기를 기다리지 않고 flush
+            if self.total_task_cnt and self.flush_percent > 0:
+                step = self.total_task_cnt * self.flush_percent / 100
+                if int(previous // step) != int(self.completed_task_cnt // step):
+                    self.condition.notify()
+
+    def close(self):
+        """스레드 종료 후 마지막 상태 flush"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+        if self.thread is not None:
+            self.thread.join()
+        else:
+            self._flush()
+
+    def _run(self):
+        self._flush()
+
+        while True:
+            with self.condition:
+                if not self.closed:
+                    self.condition.wait(timeout=self.flush_interval)
+                closed = self.closed
+
+            self._flush()
+
+            if closed:
+                return
+
+    def _flush(self):
+        with self.condition:
+            completed_task_cnt = self.completed_task_cnt
+
+        if completed_task_cnt == self.flushed_task_cnt:
+            return
+
+        started = perf_counter()
+        try:
+            self.writer(total_task_cnt=self.total_task_cnt, completed_task_cnt=completed_task_cnt)
+            self.flushed_task_cnt = completed_task_cnt
+            self.flush_cnt += 1
+        except Exception as e:
+            # 진행률 기록 실패는 시뮬레이션을 멈추지 않음 (다음 flush 에서 최신 값으로 재시도)
+            print(f"⚠️ 시뮬레이션 진행률 기록 실패 ({self.simulation_id}): {e}")
+        finally:
+            self.flush_seconds += perf_counter() - started
+
+    def _write_dynamodb(self, total_task_cnt, completed_task_cnt):
+        # 한국 시간대
+        current_time = datetime.now(timezone("Asia/Seoul"))
+
+        data_model = SimulationHistory(
+            simulation_id=self.simulation_id,
+            updated_at=int(current_time.timestamp() * 1000),  # ✅ 밀리세컨드 단위
+            updated_at_dt=current_time.strftime("%Y-%m-%d %H:%M:%S"),
+            total_task_cnt=total_task_cnt,
+            completed_task_cnt=completed_task_cnt
+        )
+
+        DynamoDBExecutor().execute_update(data_model, 'simulation_id')
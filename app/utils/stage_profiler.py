@@ -0,0 +1,64 @@
+import json
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class StageProfiler:
+    """
+    시뮬레이션 단계별 소요 시간 / 호출 횟수 / 바이트 수 기록
+    - with profiler.stage('kis_fetch'): ... 형태로 감싸면 wall time 과 호출 횟수 누적
+    - 워커 프로세스에서 잰 시간은 merge() 로 합산 (병렬 구간이면 wall time 보다 클 수 있음)
+    - to_dict() 결과를 결과 json / SimulationHistory.stage_profile 에 저장
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.lock = threading.Lock()
+        self.started_at = perf_counter()
+
+    def add(self, name, seconds=0.0, count=1, bytes=0):
+        """단계 측정값 누적"""
+        with self.lock:
+            stage = self.stages.setdefault(name, {'seconds': 0.0, 'count': 0, 'bytes': 0})
+            stage['seconds'] += seconds
+            stage['count'] += count
+            stage['bytes'] += bytes
+
+    @contextmanager
+    def stage(self, name, bytes=0):
+        """구간 wall time 측정 (예외가 나도 기록)"""
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter() - started, bytes=bytes)
+
+    def merge(self, stages):
+        """다른 프로세스에서 측정한 {name: {'seconds', 'count', 'bytes'}} 합산"""
+        for name, stage in (stages or {}).items():
+            self.add(name, stage.get('seconds', 0.0), stage.get('count', 0), stage.get('bytes', 0))
+
+    def to_dict(self):
+        """단계별 측정값 + 전체 경과 시간"""
+        with self.lock:
+            stages = {
+                name: {'seconds': round(stage['seconds'], 4), 'count': stage['count'], 'bytes': stage['bytes']}
+                for name, stage in self.stages.items()
+            }
+
+        return {
+            'total_seconds': round(perf_counter() - self.started_at, 4),
+            'stages': stages,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def print_summary(self):
+        """단계별 소요 시간 출력 (오래 걸린 순)"""
+        profile = self.to_dict()
+        print(f"⏱️ 단계별 소요 시간 (전체 {profile['total_seconds']:,.2f}s)")
+        for name, stage in sorted(profile['stages'].items(), key=lambda item: -item[1]['seconds']):
+            size = f" / {stage['bytes'] / 1024:,.0f} KB" if stage['bytes'] else ""
+            print(f"   - {name}: {stage['seconds']:,.3f}s / {stage['count']:,}회{size}")
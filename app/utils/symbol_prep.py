@@ -0,0 +1,314 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+from pytz import timezone
+
+from app.utils.technical_indicator import TechnicalIndicator
+from app.utils.level_tracker import ConfirmedLevelTracker
+from app.utils.bar_store import OhlcBar
+from app.utils.indicator_cache import IndicatorFrameCache
+from app.utils.stage_profiler import StageProfiler
+from app.utils.incremental_indicator import (
+    DEFAULT_EMA_PERIODS, DEFAULT_SMA_PERIODS, DEFAULT_WMA_PERIODS, OHLC_COLUMNS, IncrementalIndicators,
+)
+
+
+# 패널 모드(IndicatorPanel) 묶음 지표 → 컬럼
+PANEL_COLUMNS = {
+    'macd': ['ema_short', 'ema_long', 'macd', 'macd_signal', 'macd_histogram'],
+    'stochastic': ['stochastic_k', 'stochastic_d'],
+    'bollinger': ['BB_Middle', 'BB_Upper', 'BB_Lower'],
+}
+
+# 장중 증분 지표 상태 {(symbol, interval, rsi_period): (어제까지 입력 키, IncrementalIndicators)}
+# - 어제까지 봉으로 한 번 만든 상태를 복사해 오늘 봉만 append (스케줄러가 장중에 같은 종목을 반복 계산할 때 O(1) 갱신)
+_intraday_states = {}
+_intraday_states_lock = threading.Lock()
+
+
+def to_ohlc_bars(ohlc_data):
+    """pykis 차트 봉 목록 → pickle 가능한 OhlcBar 목록"""
+    return [OhlcBar(c.time, c.open, c.high, c.low, c.close, c.volume) for c in ohlc_data]
+
+
+def _bar_date(value):
+    """봉 시각의 날짜 (tz-aware 면 해당 시간대 기준)"""
+    return pd.Timestamp(value).date()
+
+
+def _create_ohlc_df(ohlc_data, short_df=None):
+    """봉 데이터 → OHLC DataFrame (+공매도 데이터 병합)"""
+    # ✅ OHLC → DataFrame 변환
+    timestamps = [c.time for c in ohlc_data]
+    ohlc = [
+        [c.time, float(c.open), float(c.high), float(c.low), float(c.close), float(c.volume)]
+        for c in ohlc_data
+    ]
+    df = pd.DataFrame(ohlc, columns=OHLC_COLUMNS, index=pd.DatetimeIndex(timestamps))
+    df.index = df.index.tz_localize(None)
+
+    # ✅ 공매도 데이터 병합
+    if short_df is not None and not short_df.empty:
+        # ✅ 병합: index 기준으로만 병합, '영업일자' 컬럼 제거
+        df = df.merge(short_df, how="left", left_index=True, right_index=True)
+        df.drop(columns=[col for col in df.columns if col == "영업일자"], inplace=True, errors="ignore")
+
+    return df
+
+
+def build_intraday_indicator_df(symbol, interval, ohlc_data, short_df=None, rsi_period=25):
+    """
+    오늘 봉(장중 확정 전)이 마지막인 봉 데이터의 지표 DataFrame 을 증분 계산으로 생성
+    - 어제까지 봉 상태(IncrementalIndicators)는 입력이 같으면 재사용하고, 복사본에 오늘 봉만 append
+    - build_indicator_df(required=None) 와 같은 컬럼 (parity_check 허용 오차 이내)
+    """
+    df = _create_ohlc_df(ohlc_data, short_df)
+    closed_df = df.iloc[:-1]
+
+    key = IndicatorFrameCache.make_key(symbol, interval, ohlc_data[:-1], short_df, rsi_period)
+    state_key = (symbol, interval, rsi_period)
+
+    with _intraday_states_lock:
+        cached = _intraday_states.get(state_key)
+    if cached is None or cached[0] != key:
+        cached = (key, IncrementalIndicators.from_df(closed_df, rsi_period=rsi_period))
+        with _intraday_states_lock:
+            _intraday_states[state_key] = cached
+
+    state = cached[1].copy()
+    state.append(df.iloc[-1].to_dict())
+    return state.to_df()
+
+
+def _use_intraday_state(ohlc_data, indicators):
+    """장중 증분 계산 대상 여부 (마지막 봉이 오늘이고 차트 지표가 없을 때, INCREMENTAL_INDICATOR_ENABLED=false 이면 사용 안 함)"""
+    if os.getenv("INCREMENTAL_INDICATOR_ENABLED", "true").lower() != "true":
+        return False
+    if len(ohlc_data) < 2 or indicators:
+        return False
+
+    today = datetime.now(timezone("Asia/Seoul")).date()
+    return _bar_date(ohlc_data[-1].time) >= today
+
+
+def build_indicator_df(ohlc_data, short_df=None, indicators=None, rsi_period=25, required=None, panel_df=None):
+    """
+    봉 데이터(+공매도 데이터)로 지표 DataFrame 생성
+    - API 호출 없이 계산만 수행하므로 워커 프로세스에서도 사용 가능
+    - required: 계산할 지표 키 집합 (indicator_dependency.resolve_indicators 결과, None 이면 전체)
+    - panel_df: 패널 모드로 미리 계산한 지표 (attach_panel_indicators, 같은 rsi_period / required)
+      → 봉 시각이 같으면 있는 컬럼은 다시 계산하지 않고 그대로 사용
+    """
+    df = _create_ohlc_df(ohlc_data, short_df)
+
+    indicator = TechnicalIndicator()
+
+    def needs(key):
+        return required is None or key in required
+
+    if panel_df is not None and not panel_df.index.equals(df.index):
+        panel_df = None
+
+    def from_panel(*columns):
+        """패널 결과에 columns 가 모두 있으면 복사 후 True"""
+        if panel_df is None or any(column not in panel_df.columns for column in columns):
+            return False
+        for column in columns:
+            df[column] = panel_df[column].to_numpy()
+        return True
+
+    lookback_prev = 5
+    lookback_next = 5
+
+    # 차트에 그리기 위한 지표 계산
+    for i in indicators or []:
+        if i['type'] == 'ema' and i['draw_yn'] is True:
+            df = indicator.cal_ema_df(df, i['period'])
+        elif i['type'] == 'sma' and i['draw_yn'] is True:
+            df = indicator.cal_sma_df(df, i['period'])
+
+    # 지표 계산
+    for period in DEFAULT_EMA_PERIODS:
+        if needs(f'EMA_{period}') and not from_panel(f'EMA_{period}'):
+            df = indicator.cal_ema_df(df, period)
+
+    for period in DEFAULT_SMA_PERIODS:
+        if needs(f'SMA_{period}') and not from_panel(f'SMA_{period}'):
+            df = indicator.cal_sma_df(df, period)
+
+    if needs('rsi') and not from_panel('rsi'):
+        df = indicator.cal_rsi_df(df, rsi_period)
+    if needs('macd') and not from_panel(*PANEL_COLUMNS['macd']):
+        df = indicator.cal_macd_df(df)
+    if needs('stochastic') and not from_panel(*PANEL_COLUMNS['stochastic']):
+        df = indicator.cal_stochastic_df(df)
+    if needs('mfi'):
+        df = indicator.cal_mfi_df(df)
+    if needs('bollinger') and not from_panel(*PANEL_COLUMNS['bollinger']):
+        df = indicator.cal_bollinger_band(df)
+    if needs('horizontal_levels'):
+        df = indicator.cal_horizontal_levels_df(df, lookback_prev, lookback_next)
+
+    for period in DEFAULT_WMA_PERIODS:
+        if needs(f'WMA_{period}'):
+            df = indicator.cal_wma_df(df, period)
+
+    # 🔧 EMA 기울기 추가 및 이동평균 계산
+    if needs('ema_slope'):
+        #df['EMA_55_Slope'] = df['EMA_55'] - df['EMA_55'].shift(1)
+        df['EMA_89_Slope'] = df['EMA_89'] - df['EMA_89'].shift(1)
+        df['EMA_55_Slope'] = (df['EMA_55'] - df['EMA_55'].shift(1)) / df['EMA_55'].shift(1) * 100
+
+        df['EMA_55_Slope_MA'] = df['EMA_55_Slope'].rolling(window=3).mean()
+        df['EMA_89_Slope_MA'] = df['EMA_89_Slope'].rolling(window=3).mean()
+
+    return df
+
+
+def get_indicator_df(symbol, interval, ohlc_data, short_df=None, indicators=None, rsi_period=25, required=None, panel_df=None):
+    """
+    지표 캐시(IndicatorFrameCache)에서 조회하고 없으면 build_indicator_df 로 계산 후 저장
+    - 마지막 봉이 오늘(장중)이면 어제까지 증분 상태에 오늘 봉만 반영 (build_intraday_indicator_df)
+    - panel_df: attach_panel_indicators 로 미리 계산한 패널 지표 (build_indicator_df 참고)
+
+    Returns:
+        (DataFrame, 캐시 적중 여부)
+    """
+    intraday = _use_intraday_state(ohlc_data, indicators)
+
+    def build():
+        if intraday:
+            return build_intraday_indicator_df(symbol, interval, ohlc_data, short_df, rsi_period=rsi_period)
+        return build_indicator_df(
+            ohlc_data, short_df, indicators=indicators, rsi_period=rsi_period, required=required, panel_df=panel_df
+        )
+
+    cache = IndicatorFrameCache.default()
+    if cache is None:
+        return build(), False
+
+    key = cache.make_key(symbol, interval, ohlc_data, short_df, rsi_period, required, indicators)
+
+    df = cache.get(key)
+    if df is not None:
+        return df, True
+
+    df = build()
+
+    # 오늘 봉(장중 확정 전)이 포함된 결과는 다음 실행에 같은 키가 나올 수 없으므로 디스크에 저장하지 않음
+    today = datetime.now(timezone("Asia/Seoul")).date()
+    persist = not ohlc_data or _bar_date(ohlc_data[-1].time) < today
+    cache.put(key, df, persist=persist)
+    return df, False
+
+
+def prepare_symbol(task):
+    """
+    종목 하나의 지표/지지·저항선/추세선/매매 신호 계산 (워커 프로세스 진입점)
+
+    task:
+        symbol, interval, ohlc_data (OhlcBar 목록), short_df, rsi_period,
+        buy_trading_logic, sell_trading_logic, start_idx (신호 계산 시작 봉 위치),
+        required_indicators (계산할 지표 키 집합, 없으면 전체), panel_df (attach_panel_indicators 결과, 없으면 종목별 계산)
+
+    Returns:
+        dict: symbol, signals ({'BUY': (봉 수, 로직 수) bool 배열, 'SELL': ...}), cache_hit (지표 캐시 적중 여부),
+              stage_profile (단계별 소요 시간, StageProfiler.merge 용)
+    """
+    # 순환 import 방지 (auto_trading_bot → symbol_prep)
+    from app.utils.auto_trading_bot import AutoTradingBot
+
+    profiler = StageProfiler()
+
+    # 공매도 병합 + 지표 계산 (캐시 적중 시 조회만)
+    with profiler.stage('indicator_build'):
+        df, cache_hit = get_indicator_df(
+            task['symbol'], task.get('interval', 'day'), task['ohlc_data'], task['short_df'],
+            rsi_period=task['rsi_period'], required=task.get('required_indicators'), panel_df=task.get('panel_df')
+        )
+
+    with profiler.stage('level_trendline'):
+        symbol_data = {
+            'symbol': task['symbol'],
+            'ohlc_data': task['ohlc_data'],
+            'df': df,
+            'level_tracker': ConfirmedLevelTracker(df, lookback_next=5),
+            'high_trendline': TechnicalIndicator().cal_high_trendline_series(df),
+        }
+
+    with profiler.stage('signal_eval'):
+        signals = AutoTradingBot._create_trading_signals(
+            symbol_data, task['buy_trading_logic'], task['sell_trading_logic']
+        )
+        signals.precompute(start_idx=max(task['start_idx'], 1))
+
+    return {
+        'symbol': task['symbol'],
+        'signals': signals.to_arrays(),
+        'cache_hit': cache_hit,
+        'stage_profile': profiler.to_dict()['stages'],
+    }
+
+
+def attach_panel_indicators(tasks):
+    """
+    일괄 계산 전에 전 종목 EMA/SMA/RSI/MACD/Stochastic/Bollinger 를 패널 모드로 한 번에 계산해 task['panel_df'] 에 저장
+    - rsi_period / required_indicators 가 같은 task 끼리 묶어서 계산
+    - 나머지 지표(MFI, 수평선, WMA, EMA 기울기)는 prepare_symbol 에서 종목별로 계산
+    """
+    groups = {}
+    for i, task in enumerate(tasks):
+        required = task.get('required_indicators')
+        group_key = (task['rsi_period'], frozenset(required) if required is not None else None)
+        groups.setdefault(group_key, []).append(i)
+
+    for (rsi_period, required), positions in groups.items():
+        def needs(key):
+            return required is None or key in required
+
+        panel = TechnicalIndicator().cal_panel_indicators(
+            {i: tasks[i]['ohlc_data'] for i in positions},
+            ema_periods=[period for period in DEFAULT_EMA_PERIODS if needs(f'EMA_{period}')],
+            sma_periods=[period for period in DEFAULT_SMA_PERIODS if needs(f'SMA_{period}')],
+            rsi_period=rsi_period if needs('rsi') else None,
+            macd=needs('macd'),
+            stochastic=needs('stochastic'),
+            bollinger=needs('bollinger'),
+        )
+        for i in positions:
+            tasks[i]['panel_df'] = panel.frame(i)
+
+    return tasks
+
+
+def prepare_symbols(tasks, max_workers=1):
+    """
+    여러 종목을 프로세스 풀로 나눠 계산
+    - tasks 순서대로 (결과 dict, 예외) 목록 반환 → 이후 직렬 루프의 종목 순서가 그대로 유지됨
+    - max_workers <= 1 이면 현재 프로세스에서 순차 계산
+    - 워커는 spawn 으로 생성 (ENV=local 에서는 스케줄러 스레드/lock 이 있는 FastAPI 프로세스에서 실행되므로 fork 하면 교착 가능)
+    """
+    if max_workers <= 1 or len(tasks) <= 1:
+        results = []
+        for task in tasks:
+            try:
+                results.append((prepare_symbol(task), None))
+            except Exception as e:
+                results.append((None, e))
+        return results
+
+    results = []
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks)), mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(prepare_symbol, task) for task in tasks]
+
+        for future in futures:
+            try:
+                results.append((future.result(), None))
+            except Exception as e:
+                results.append((None, e))
+
+    return results
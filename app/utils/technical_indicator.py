@@ -1,5 +1,14 @@
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.utils.incremental_indicator import IncrementalIndicators
+from app.utils.indicator_panel import IndicatorPanel
+from app.utils.sampled_logger import get_logger
+
+
+# 추세선 계산 실패는 종목×일마다 반복되므로 디버그 로그 (SIM_LOG_LEVEL=DEBUG 일 때만 출력)
+logger = get_logger("technical_indicator")
 
 
 class TechnicalIndicator:
@@ -31,11 +40,15 @@ class TechnicalIndicator:
             # 볼린저 밴드 계산
 
         df['BB_Middle'] = df['Close'].rolling(window=window).mean()
-        df['BB_Std'] = df['Close'].rolling(window=window).apply(lambda x: np.std(x, ddof=0), raw=True)
-        df['BB_Upper'] = df['BB_Middle'] + (df['BB_Std'] * 2)
-        df['BB_Lower'] = df['BB_Middle'] - (df['BB_Std'] * 2)
 
-        df.drop(columns=['BB_Std'], inplace=True)  # 표준편차 임시 컬럼 제거
+        # 구간별 np.std 를 한 번에 계산 (rolling().apply 와 같은 값, 구간이 다 차지 않은 앞부분은 NaN)
+        bb_std = np.full(len(df), np.nan)
+        if len(df) >= window:
+            windows = sliding_window_view(df['Close'].to_numpy(dtype=float), window)
+            bb_std[window - 1:] = np.std(windows, axis=1, ddof=0)
+
+        df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
+        df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
 
         return df
 
@@ -66,8 +79,8 @@ class TechnicalIndicator:
         df['Prev_TP'] = df['TP'].shift(1)
         
         # ✅ Money Flow 비교 (TP가 상승/하락한 경우)
-        df['Positive_MF'] = df.apply(lambda x: x['RMF'] if x['TP'] > x['Prev_TP'] else 0, axis=1)
-        df['Negative_MF'] = df.apply(lambda x: x['RMF'] if x['TP'] < x['Prev_TP'] else 0, axis=1)
+        df['Positive_MF'] = np.where(df['TP'] > df['Prev_TP'], df['RMF'], 0.0)
+        df['Negative_MF'] = np.where(df['TP'] < df['Prev_TP'], df['RMF'], 0.0)
 
         # ✅ MFR (Money Flow Ratio) 계산
         df['PMF'] = df['Positive_MF'].rolling(window=period).sum()
@@ -224,12 +237,18 @@ class TechnicalIndicator:
         wma_column_name = f'WMA_{period}'
 
         weights = list(range(1, period + 1))  # [1, 2, ..., period]
-        
-        df[wma_column_name] = (
-            df['Close']
-            .rolling(window=period)
-            .apply(lambda prices: sum(prices * weights) / sum(weights), raw=True)
-        )
+
+        # 모든 구간의 가중합을 한 번에 계산
+        # - 가중치 순서대로 더해서 구간별 sum(prices * weights) 와 같은 값을 유지
+        wma = np.full(len(df), np.nan)
+        if len(df) >= period:
+            windows = sliding_window_view(df['Close'].to_numpy(dtype=float), period)
+            weighted_sum = 0
+            for j, weight in enumerate(weights):
+                weighted_sum = weighted_sum + windows[:, j] * weight
+            wma[period - 1:] = weighted_sum / sum(weights)
+
+        df[wma_column_name] = wma
 
         df[wma_column_name] = df[wma_column_name].round(round_digits)
 
@@ -240,28 +259,67 @@ class TechnicalIndicator:
         df에 고점/저점 수평선 컬럼을 추가
         - 'horizontal_high': 해당 행이 고점 수평선이면 값
         - 'horizontal_low': 해당 행이 저점 수평선이면 값
+        - 구간 최고/최저는 이동 최대/최소값으로 한 번에 계산 (O(n))
         """
+        n = len(df)
+        window = lookback_prev + lookback_next + 1
 
-        df = df.copy()
-        df['horizontal_high'] = None
-        df['horizontal_low'] = None
+        highs = df['High'].to_numpy(dtype=float)
+        lows = df['Low'].to_numpy(dtype=float)
+
+        # i 위치 기준 [i - lookback_prev, i + lookback_next] 구간 최고/최저
+        window_high = pd.Series(highs).rolling(window, min_periods=1).max().shift(-lookback_next).to_numpy()
+        window_low = pd.Series(lows).rolling(window, min_periods=1).min().shift(-lookback_next).to_numpy()
+
+        # i 위치 기준 이전 구간 [i - lookback_prev, i) 최고/최저
+        past_high = np.full(n, np.nan)
+        past_low = np.full(n, np.nan)
+        if lookback_prev > 0:
+            past_high = pd.Series(highs).rolling(lookback_prev, min_periods=1).max().shift(1).to_numpy()
+            past_low = pd.Series(lows).rolling(lookback_prev, min_periods=1).min().shift(1).to_numpy()
 
-        for i in range(lookback_prev, len(df) - lookback_next):
-            window = df.iloc[i - lookback_prev : i + lookback_next + 1]
-            center = df.iloc[i]
+        # 전체 구간이 있는 위치만 판정
+        in_range = np.zeros(n, dtype=bool)
+        in_range[lookback_prev:max(lookback_prev, n - lookback_next)] = True
 
-            past_window = df.iloc[i - lookback_prev : i]  # 이전 구간만
+        # 고점 조건: 중심값이 최고점이고, 이전 구간에 동일 가격이 없어야 함
+        # (중심값이 구간 최고점이면 이전 구간 값은 모두 그 이하이므로, 이전 구간 최고점과 다르면 동일 가격 없음)
+        is_high = in_range & (highs == window_high) & ~(past_high == highs)
 
-            # 고점 조건: 중심값이 최고점이고, 이전 구간에 동일 가격이 없어야 함
-            if center['High'] == window['High'].max() and center['High'] not in past_window['High'].values:
-                df.at[df.index[i], 'horizontal_high'] = center['High']
+        # 저점 조건: 중심값이 최저점이고, 이전 구간에 동일 가격이 없어야 함
+        is_low = in_range & (lows == window_low) & ~(past_low == lows)
 
-            # 저점 조건: 중심값이 최저점이고, 이전 구간에 동일 가격이 없어야 함
-            if center['Low'] == window['Low'].min() and center['Low'] not in past_window['Low'].values:
-                df.at[df.index[i], 'horizontal_low'] = center['Low']
+        horizontal_high = np.full(n, None, dtype=object)
+        horizontal_low = np.full(n, None, dtype=object)
+        for i in np.flatnonzero(is_high):
+            horizontal_high[i] = highs[i]
+        for i in np.flatnonzero(is_low):
+            horizontal_low[i] = lows[i]
+
+        df['horizontal_high'] = horizontal_high
+        df['horizontal_low'] = horizontal_low
 
         return df
-    
+
+    def create_incremental_state(self, df, rsi_period=25, lookback_prev=5, lookback_next=5):
+        """
+        증분 계산 모드: 기존 OHLC df로 지표 상태를 만든 뒤 새 봉은 append 로 O(1) 갱신
+        - df: Time/Open/High/Low/Close/Volume (+ 공매도 등 추가 컬럼)
+        - 반환된 상태의 to_df() 는 배치 계산(build_indicator_df)과 같은 컬럼을 가짐
+        """
+        return IncrementalIndicators.from_df(
+            df, rsi_period=rsi_period, lookback_prev=lookback_prev, lookback_next=lookback_next
+        )
+
+    def cal_panel_indicators(self, bars_by_symbol, **kwargs):
+        """
+        패널 모드: 종목별 봉 목록({symbol: [OhlcBar, ...]})을 날짜 × 종목 2-D 배열로 맞춰 여러 종목 지표를 한 번에 계산
+        - 반환된 IndicatorPanel 의 frame(symbol) 로 종목별 DataFrame 조회
+        - kwargs: IndicatorPanel.compute 인자 (ema_periods, sma_periods, rsi_period, macd, stochastic, bollinger)
+        - 일괄 시뮬레이션 종목 준비에서 사용 (symbol_prep.attach_panel_indicators)
+        """
+        return IndicatorPanel.from_bars(bars_by_symbol).compute(**kwargs)
+
     def extend_trendline_from_points(self, x_vals, y_vals, target_x):
         try:
             # 💡 명시적 float 변환으로 numpy가 에러 없이 처리할 수 있게 함
@@ -290,7 +348,7 @@ class TechnicalIndicator:
         """
         max_idx = current_idx - lookback_next
         if max_idx <= 0:
-            print(f"[❌ 중단] current_idx={current_idx}, lookback_next={lookback_next} → max_idx <= 0")
+            logger.debug("[❌ 중단] max_idx <= 0", key="trendline_short", current_idx=current_idx, lookback_next=lookback_next)
             return None
 
         sub_df = df.iloc[:max_idx]
@@ -298,28 +356,44 @@ class TechnicalIndicator:
         confirmed_highs = df.loc[confirmed_idx]
         
         if confirmed_highs.empty:
-            print("[⚠️ 고점 없음] 확정 고점 기반 추세선 계산 불가")
+            logger.debug("[⚠️ 고점 없음] 확정 고점 기반 추세선 계산 불가", key="trendline_no_high")
             return None
 
         indices = confirmed_highs.index.tolist()
         if len(indices) < 2:
-            print("[⚠️ 고점 1개 이하] 추세선 연결 불가")
+            logger.debug("[⚠️ 고점 1개 이하] 추세선 연결 불가", key="trendline_one_high")
             return None
 
-        latest_idx = indices[-1]
-        latest_x = df.index.get_loc(latest_idx)
-        latest_y = float(df.at[latest_idx, 'horizontal_high'])
+        x_positions = [df.index.get_loc(idx) for idx in indices]
+        y_values = [float(df.at[idx, 'horizontal_high']) for idx in indices]
 
-        past_highs = indices[:-1][-max_pair_candidates:]
+        best_line = self._find_best_high_trendline(x_positions, y_values, current_idx, max_pair_candidates)
 
-        best_info = None
-        min_avg_deviation = float('inf')
+        if best_line:
+            slope, intercept = best_line
+            return slope * current_idx + intercept
+        else:
+            # print("⚠️ 의미 있는 하락 추세선 없음")
+            return None
 
-        for prev_idx in past_highs:
-            prev_x = df.index.get_loc(prev_idx) 
-            prev_y = float(df.at[prev_idx, 'horizontal_high'])
+    def _find_best_high_trendline(self, x_positions, y_values, target_x, max_pair_candidates=5):
+        """
+        확정 고점 위치/가격 목록에서 가장 최근 고점과 이전 고점 후보들을 이어,
+        중간 고점이 선 아래에 있고 평균 편차가 가장 작은 하락 추세선을 선택.
+        Returns:
+            (slope, intercept) 또는 None
+        """
+        latest_x = x_positions[-1]
+        latest_y = y_values[-1]
 
+        past_highs = list(range(len(x_positions) - 1))[-max_pair_candidates:]
 
+        best_line = None
+        min_avg_deviation = float('inf')
+
+        for prev in past_highs:
+            prev_x = x_positions[prev]
+            prev_y = y_values[prev]
 
             if latest_x <= prev_x:
                 continue
@@ -332,12 +406,12 @@ class TechnicalIndicator:
             y_vals = [prev_y, latest_y]
             
                     # ✅ 하락 고점 흐름 검사
-            y_vals_list = [float(df.at[i, 'horizontal_high']) for i in past_highs if df.index.get_loc(i) >= prev_x] + [latest_y]
+            y_vals_list = [y_values[i] for i in past_highs if x_positions[i] >= prev_x] + [latest_y]
             is_strictly_decreasing = all(y_vals_list[i] > y_vals_list[i + 1] for i in range(len(y_vals_list) - 1))
             if not is_strictly_decreasing:
                 continue  # ❌ 고점 흐름이 하락하지 않음
 
-            trend_y = self.extend_trendline_from_points(x_vals, y_vals, current_idx)
+            trend_y = self.extend_trendline_from_points(x_vals, y_vals, target_x)
             if trend_y is None:
                 continue
 
@@ -347,9 +421,7 @@ class TechnicalIndicator:
             # ✅ 중간 고점이 선 위에 있으면 제외
             violated = False
             deviations = []
-            for idx in indices:
-                x = df.index.get_loc(idx)
-                y = float(df.at[idx, 'horizontal_high'])
+            for x, y in zip(x_positions, y_values):
                 if x <= prev_x or x >= latest_x:
                     continue
                 expected_y = slope * x + intercept
@@ -364,30 +436,60 @@ class TechnicalIndicator:
             avg_deviation = np.mean(deviations)
             if avg_deviation < min_avg_deviation:
                 min_avg_deviation = avg_deviation
-                best_info = {
-                    "prev_idx": prev_idx,
-                    "latest_idx": latest_idx,
-                    "slope": slope,
-                    "intercept": intercept,
-                    "trend_y": slope * current_idx + intercept,
-                    "avg_deviation": avg_deviation,
-                    "x1": x_vals[0],
-                    "x2": x_vals[1],
-                    "y1": y_vals[0],
-                    "y2": y_vals[1],
-                }
-
-        if best_info:
-            # print("📌 [최종 의미 있는 추세선]")
-            # print(f"   • 시작점: {best_info['prev_idx'].date()} (x={best_info['x1']}, y={best_info['y1']})")
-            # print(f"   • 끝점  : {best_info['latest_idx'].date()} (x={best_info['x2']}, y={best_info['y2']})")
-            # print(f"   • 기울기: {best_info['slope']:.4f}")
-            # print(f"   • 평균 편차: {best_info['avg_deviation']:.2f}")
-            # print(f"   • 연장된 y({current_idx})값: {best_info['trend_y']:.2f}")
-            return best_info['trend_y']
-        else:
-            # print("⚠️ 의미 있는 하락 추세선 없음")
-            return None
+                best_line = (slope, intercept)
+
+        return best_line
+
+    def cal_high_trendline_series(self, df, lookback_next=5, max_pair_candidates=5, lookback_period=12):
+        """
+        모든 봉에 대해 get_latest_trendline_from_highs(df, current_idx=i) 값을 한 번에 계산
+        - 확정 고점은 이전 lookback_period 봉만 보고 결정되므로 전체 구간에서 한 번만 구함
+        - i 시점에는 i - lookback_next 이전의 확정 고점만 사용 (미래 데이터 차단)
+        - 새 확정 고점이 사용 가능해질 때만 추세선을 다시 고르고, 나머지 봉은 직선 연장
+
+        Returns:
+            np.ndarray: 봉 위치별 연장된 고점 추세선 값 (없으면 NaN)
+        """
+        n = len(df)
+        highs = pd.to_numeric(df['horizontal_high'], errors='coerce').to_numpy(dtype=float)
+        is_high = ~np.isnan(highs)
+
+        # 직전 lookback_period 봉 안에 다른 고점이 없는 고점만 확정 고점 (get_confirmed_highs_with_lookback 과 동일)
+        high_counts = np.concatenate([[0], np.cumsum(is_high)])
+        positions = np.arange(n)
+        recent_highs = high_counts[positions] - high_counts[np.maximum(0, positions - lookback_period)]
+        confirmed_positions = np.flatnonzero(is_high & (recent_highs == 0))
+
+        # 추세선 선택에는 최근 고점과 그 이전 max_pair_candidates 개만 쓰인다
+        window = max_pair_candidates + 1 if max_pair_candidates > 0 else n
+
+        trendline = np.full(n, np.nan)
+        best_line = None
+        confirmed_cnt = 0
+
+        for i in range(n):
+            max_idx = i - lookback_next
+            if max_idx <= 0:
+                continue
+
+            prev_cnt = confirmed_cnt
+            while confirmed_cnt < len(confirmed_positions) and confirmed_positions[confirmed_cnt] < max_idx:
+                confirmed_cnt += 1
+
+            if confirmed_cnt != prev_cnt:
+                if confirmed_cnt < 2:
+                    best_line = None
+                else:
+                    recent = confirmed_positions[max(0, confirmed_cnt - window):confirmed_cnt]
+                    best_line = self._find_best_high_trendline(
+                        recent.tolist(), highs[recent].tolist(), i, max_pair_candidates
+                    )
+
+            if best_line is not None:
+                slope, intercept = best_line
+                trendline[i] = slope * i + intercept
+
+        return trendline
 
 
     # def get_latest_trendline_from_highs(self, df, current_idx, window=2, lookback_next=5):
@@ -426,14 +528,14 @@ class TechnicalIndicator:
         """
 
         df = df.copy()
+        trendline = self.cal_high_trendline_series(df, lookback_next=lookback_next)
         extended_trendline = []
 
         for i in range(len(df)):
-            if i < window + lookback_next:
+            if i < window + lookback_next or np.isnan(trendline[i]):
                 extended_trendline.append(None)
             else:
-                trend_val = self.get_latest_trendline_from_highs(df, current_idx=i, lookback_next=lookback_next)
-                extended_trendline.append(trend_val)
+                extended_trendline.append(trendline[i])
 
         df['extended_high_trendline'] = extended_trendline
         return df
@@ -0,0 +1,216 @@
+import threading
+
+import numpy as np
+
+
+# 전체 구간을 한 번에 계산할 수 있는 매매 로직 등록소
+# - fn(df, support, resistance, high_trendline) -> 봉 위치별 bool 배열
+# - i 번째 값은 반드시 i 시점까지의 데이터만 사용해야 함 (lookahead 금지)
+VECTORIZED_SIGNALS = {
+    'BUY': {},
+    'SELL': {},
+}
+
+# 벡터화 로직 검증 상태 {(trade_type, trading_logic): 'verified' | 'rejected'} (없으면 검증 대기)
+# - 프로세스에서 처음 쓰일 때 봉 단위 기존 로직(evaluate_bar)과 전체 구간을 비교
+# - 신호가 한 번이라도 나온 종목에서 일치해야 verified, 다르면 rejected → 이후 기존 로직으로 계산
+_verification = {}
+_verification_lock = threading.Lock()
+
+# 신호 비교 시작 봉 (기존 로직은 이전 봉이 있어야 계산되므로 1번째 봉부터)
+VERIFY_START_IDX = 1
+
+# _get_trading_logic_reasons 의 RSI 기준값 (시뮬레이션 신호 계산 시 기본값 사용)
+RSI_BUY_THRESHOLD = 30
+RSI_SELL_THRESHOLD = 70
+
+
+def register_vectorized_signal(trade_type, trading_logic, verified=False):
+    """
+    TradingLogic 로직의 전체 구간 계산 버전을 등록하는 데코레이터
+    - verified=True: 기존 로직 호출 없이 정의상 같은 값 (검증 생략)
+    """
+
+    def decorator(fn):
+        VECTORIZED_SIGNALS[trade_type][trading_logic] = fn
+        with _verification_lock:
+            if verified:
+                _verification[(trade_type, trading_logic)] = 'verified'
+            else:
+                _verification.pop((trade_type, trading_logic), None)
+        return fn
+
+    return decorator
+
+
+def _previous(values):
+    """한 봉 전 값 (첫 봉은 NaN)"""
+    previous = np.full(len(values), np.nan)
+    previous[1:] = values[:-1]
+    return previous
+
+
+@register_vectorized_signal('BUY', 'rsi_trading')
+def rsi_trading_buy(df, support, resistance, high_trendline):
+    """RSI 가 매수 기준값을 상향 돌파 (이전 봉 < 기준값 < 현재 봉)"""
+    rsi = df['rsi'].to_numpy(dtype=float)
+    return (_previous(rsi) < RSI_BUY_THRESHOLD) & (rsi > RSI_BUY_THRESHOLD)
+
+
+@register_vectorized_signal('SELL', 'rsi_trading')
+def rsi_trading_sell(df, support, resistance, high_trendline):
+    """RSI 가 매도 기준값 위에서 다시 하향 돌파 (이전 봉 > 기준값 > 현재 봉)"""
+    rsi = df['rsi'].to_numpy(dtype=float)
+    return (_previous(rsi) > RSI_SELL_THRESHOLD) & (rsi < RSI_SELL_THRESHOLD)
+
+
+@register_vectorized_signal('BUY', 'rsi_trading2', verified=True)
+def rsi_trading2_buy(df, support, resistance, high_trendline):
+    """rsi_trading2 는 매도 전용 (_get_trading_logic_reasons 매수 분기에 없음) → 매수 신호 없음"""
+    return np.zeros(len(df), dtype=bool)
+
+
+class TradingSignals:
+    """
+    종목 하나의 매수/매도 로직 신호 테이블
+    - 벡터화된 로직은 생성 시 전체 구간을 한 번에 계산해 bool 배열로 보관
+    - 벡터화되지 않은 로직은 기존 봉 단위 호출(evaluate_bar)로 계산하고 봉 위치별로 캐시
+    - 시뮬레이션 루프는 get_reasons()로 배열/캐시만 조회
+    """
+
+    def __init__(self, df, trading_logics, evaluate_bar, support, resistance, high_trendline):
+        """
+        Parameters:
+            df (pd.DataFrame): 전체 구간 지표 DataFrame
+            trading_logics (dict): {'BUY': [...], 'SELL': [...]}
+            evaluate_bar (callable): (trade_type, trading_logics, idx) -> 신호가 발생한 로직 목록
+            support, resistance, high_trendline (np.ndarray): 봉 위치별 확정 지지/저항선, 고점 추세선
+        """
+        self.trading_logics = {
+            trade_type: list(logics or []) for trade_type, logics in trading_logics.items()
+        }
+        self.evaluate_bar = evaluate_bar
+        self.length = len(df)
+
+        self.vectorized = {}
+        self.fallback_logics = {}
+        self.fallback_reasons = {}
+
+        for trade_type, logics in self.trading_logics.items():
+            self.vectorized[trade_type] = {}
+            self.fallback_logics[trade_type] = []
+            self.fallback_reasons[trade_type] = {}
+
+            for trading_logic in dict.fromkeys(logics):
+                fn = VECTORIZED_SIGNALS.get(trade_type, {}).get(trading_logic)
+
+                if fn is not None and _verification.get((trade_type, trading_logic)) != 'rejected':
+                    values = np.asarray(fn(df, support, resistance, high_trendline), dtype=bool)
+                    if self._verify(trade_type, trading_logic, values):
+                        self.vectorized[trade_type][trading_logic] = values
+                        continue
+
+                self.fallback_logics[trade_type].append(trading_logic)
+
+    def _verify(self, trade_type, trading_logic, values):
+        """
+        검증 대기 중인 벡터화 로직이면 이 종목 전체 구간을 기존 로직과 비교 (프로세스당 로직별로 한 번 통과하면 생략)
+        - 일치하지 않으면 rejected 로 기록하고 False (이 종목부터 기존 로직 사용)
+        """
+        key = (trade_type, trading_logic)
+        if _verification.get(key) == 'verified':
+            return True
+
+        expected = np.zeros(self.length, dtype=bool)
+        for idx in range(VERIFY_START_IDX, self.length):
+            expected[idx] = trading_logic in self.evaluate_bar(trade_type, [trading_logic], idx)
+
+        mismatches = np.flatnonzero(values[VERIFY_START_IDX:] != expected[VERIFY_START_IDX:]) + VERIFY_START_IDX
+
+        with _verification_lock:
+            if len(mismatches):
+                _verification[key] = 'rejected'
+                print(f"⚠️ 벡터화 신호 불일치로 기존 로직 사용: {trade_type}/{trading_logic} ({len(mismatches)}개 봉, 첫 위치 {mismatches[0]})")
+                return False
+
+            # 신호가 없는 종목에서는 일치해도 판단하지 않음 (다음 종목에서 다시 검증)
+            if expected.any():
+                _verification[key] = 'verified'
+
+        return True
+
+    def _get_fallback_reasons(self, trade_type, idx):
+        cache = self.fallback_reasons[trade_type]
+
+        if idx not in cache:
+            logics = self.fallback_logics[trade_type]
+            cache[idx] = set(self.evaluate_bar(trade_type, logics, idx)) if logics else set()
+
+        return cache[idx]
+
+    def get_reasons(self, trade_type, idx):
+        """idx 봉에서 신호가 발생한 로직 목록 (trading_logics 순서 유지)"""
+        fallback_reasons = self._get_fallback_reasons(trade_type, idx)
+        vectorized = self.vectorized[trade_type]
+
+        return [
+            trading_logic for trading_logic in self.trading_logics[trade_type]
+            if (vectorized[trading_logic][idx] if trading_logic in vectorized else trading_logic in fallback_reasons)
+        ]
+
+    def precompute(self, start_idx=0, end_idx=None):
+        """start_idx ~ end_idx 구간의 봉 단위 로직을 미리 계산"""
+        if end_idx is None:
+            end_idx = self.length
+
+        for trade_type in self.trading_logics:
+            for idx in range(start_idx, end_idx):
+                self._get_fallback_reasons(trade_type, idx)
+
+    def to_arrays(self):
+        """
+        trading_logics 순서의 봉 위치별 신호 bool 배열 {'BUY': (봉 수, 로직 수), 'SELL': ...}
+        - 봉 단위 로직은 precompute()로 계산된 구간만 채워짐
+        """
+        arrays = {}
+
+        for trade_type, logics in self.trading_logics.items():
+            matrix = np.zeros((self.length, len(logics)), dtype=bool)
+            vectorized = self.vectorized[trade_type]
+            fallback_reasons = self.fallback_reasons[trade_type]
+
+            for j, trading_logic in enumerate(logics):
+                if trading_logic in vectorized:
+                    matrix[:, j] = vectorized[trading_logic]
+                    continue
+
+                for idx, reasons in fallback_reasons.items():
+                    matrix[idx, j] = trading_logic in reasons
+
+            arrays[trade_type] = matrix
+
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, trading_logics, arrays):
+        """to_arrays() 결과로 신호 테이블 복원 (워커 프로세스에서 계산된 결과 사용)"""
+        signals = cls.__new__(cls)
+        signals.trading_logics = {
+            trade_type: list(logics or []) for trade_type, logics in trading_logics.items()
+        }
+        signals.evaluate_bar = None
+        signals.length = len(next(iter(arrays.values()))) if arrays else 0
+
+        signals.vectorized = {}
+        signals.fallback_logics = {}
+        signals.fallback_reasons = {}
+
+        for trade_type, logics in signals.trading_logics.items():
+            matrix = arrays[trade_type]
+            signals.vectorized[trade_type] = {
+                trading_logic: matrix[:, j] for j, trading_logic in enumerate(logics)
+            }
+            signals.fallback_logics[trade_type] = []
+            signals.fallback_reasons[trade_type] = {}
+
+        return signals
@@ -0,0 +1,261 @@
+"""
+시뮬레이션 엔진 오프라인 벤치마크 (KIS / AWS 접속 없이 실행)
+
+- 랜덤 워크 OHLCV(종목 N × 영업일 M) + 가짜 공매도 데이터를 AutoTradingBot 에 주입
+- _create_ohlc_df, simulate_trading, simulate_trading_bulk 를 크기별로 측정
+  (_create_ohlc_df / simulate_trading 은 종목별로 N 번 호출, bulk 는 N 종목 한 번)
+- 결과: 소요 시간, 종목·일(symbol-days)/초, 최대 RSS (케이스마다 새 프로세스에서 측정)
+
+실행 예)
+    python benchmarks/simulation_benchmark.py --sizes 10x250,100x500 --output bench_output.json
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from pytz import timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.bar_store import OhlcBar
+
+
+KST = timezone("Asia/Seoul")
+
+CASES = ('create_ohlc_df', 'simulate_trading', 'simulate_trading_bulk')
+
+# 지표 계산 구간 (simulate_trading 은 시작일 300일 전, bulk 는 180일 전부터 조회)
+WARMUP_DAYS = 300
+
+
+def make_synthetic_bars(symbol_cnt, day_cnt, end_date, seed=0):
+    """
+    종목별 랜덤 워크 일봉 {symbol: [OhlcBar, ...]}
+    - 봉 시각은 pykis 차트 봉처럼 KST tz-aware, 영업일 기준
+    - 지표 워밍업 구간(WARMUP_DAYS 달력일)을 앞에 추가
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=end_date, periods=day_cnt + int(WARMUP_DAYS * 5 / 7), tz=KST)
+
+    bars_by_symbol = {}
+    for i in range(symbol_cnt):
+        symbol = f"{i:06d}"
+
+        close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+        open_ = close * (1 + rng.normal(0, 0.005, len(dates)))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, len(dates))))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, len(dates))))
+        volume = rng.integers(10_000, 1_000_000, len(dates))
+
+        bars_by_symbol[symbol] = [
+            OhlcBar(t, float(o), float(h), float(l), float(c), int(v))
+            for t, o, h, l, c, v in zip(dates, open_.round(0), high.round(0), low.round(0), close.round(0), volume)
+        ]
+
+    return bars_by_symbol
+
+
+def make_synthetic_short_sale(bars):
+    """봉 날짜 기준 가짜 공매도 데이터 (get_short_sale_daily_trend_df_multi 와 같은 한글 컬럼, naive 날짜 index)"""
+    index = pd.DatetimeIndex([bar.time for bar in bars]).tz_localize(None).normalize()
+    volume = np.array([bar.volume for bar in bars], dtype=float)
+    ratio = np.linspace(0.5, 5.0, len(bars))
+
+    return pd.DataFrame({
+        '공매도체결수량': (volume * ratio / 100).round(0),
+        '공매도거래량비중': ratio.round(2),
+        '공매도거래대금': (volume * ratio / 100 * np.array([bar.close for bar in bars])).round(0),
+        '공매도평균가격': np.array([bar.close for bar in bars]),
+    }, index=index)
+
+
+def make_engine(bars_by_symbol):
+    """
+    UserInfo 조회 / 토큰 발급 없이 AutoTradingBot 생성 후 봉·공매도 조회를 합성 데이터로 교체
+    """
+    from app.utils.auto_trading_bot import AutoTradingBot
+
+    bot = AutoTradingBot.__new__(AutoTradingBot)
+    bot.virtual = False
+    bot.kis = None
+    bot.bar_store = None
+    bot.short_sale_store = None
+    bot.short_sale_fetch_workers = 1
+
+    short_by_symbol = {symbol: make_synthetic_short_sale(bars) for symbol, bars in bars_by_symbol.items()}
+
+    def get_ohlc(symbol, start_date, end_date, interval='day', mode='default'):
+        start, end = pd.Timestamp(start_date).date(), pd.Timestamp(end_date).date()
+        return [bar for bar in bars_by_symbol[symbol] if start <= bar.time.date() <= end]
+
+    def get_short_sale_df(symbol, start_date, end_date):
+        short_df = short_by_symbol[symbol]
+        return short_df.loc[pd.Timestamp(start_date).normalize():pd.Timestamp(end_date)]
+
+    bot._get_ohlc = get_ohlc
+    bot._get_short_sale_df = get_short_sale_df
+
+    return bot
+
+
+def _peak_rss_mb():
+    """현재 프로세스 / 자식 프로세스(지표 계산 풀) 최대 RSS (MB, Linux 는 KB 단위)"""
+    unit = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit,
+    )
+
+
+def run_case(case, symbol_cnt, day_cnt, args):
+    """케이스 하나 실행 후 측정 결과 dict"""
+    if not args.indicator_cache:
+        os.environ["INDICATOR_CACHE_ENABLED"] = "false"
+
+    end_date = datetime(2025, 6, 30)
+    start_date = pd.bdate_range(end=end_date, periods=day_cnt)[0].to_pydatetime()
+
+    bars_by_symbol = make_synthetic_bars(symbol_cnt, day_cnt, end_date, seed=args.seed)
+    bot = make_engine(bars_by_symbol)
+
+    buy_trading_logic = args.buy_logic.split(",")
+    sell_trading_logic = args.sell_logic.split(",")
+    take_profit_logic = {'name': 'fixed', 'params': {'ratio': 10}}
+    stop_loss_logic = {'name': 'fixed', 'params': {'ratio': 5}}
+
+    # 엔진의 print 는 그대로 실행되지만 (비용 포함) 화면에는 출력하지 않음
+    with open(os.devnull, "w") as devnull, (contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(devnull)):
+        started = time.perf_counter()
+
+        if case == 'create_ohlc_df':
+            for symbol in bars_by_symbol:
+                bot._create_ohlc_df(
+                    ohlc_data=bot._get_ohlc(symbol, start_date - timedelta(days=WARMUP_DAYS), end_date),
+                    symbol=symbol, start_date=start_date - timedelta(days=WARMUP_DAYS), end_date=end_date,
+                    rsi_period=25, use_short_sale=True,
+                )
+
+        elif case == 'simulate_trading':
+            for symbol in bars_by_symbol:
+                bot.simulate_trading(
+                    symbol=symbol, stock_name=symbol, stock_type='kospi200', start_date=start_date, end_date=end_date,
+                    target_trade_value_krw=1_000_000, target_trade_value_ratio=None, min_trade_value=0,
+                    buy_trading_logic=buy_trading_logic, sell_trading_logic=sell_trading_logic,
+                    initial_capital=100_000_000, take_profit_logic=take_profit_logic, stop_loss_logic=stop_loss_logic,
+                    indicators=[],
+                )
+
+        elif case == 'simulate_trading_bulk':
+            bot.simulate_trading_bulk({
+                'simulation_id': f"benchmark-{symbol_cnt}x{day_cnt}",
+                'start_date': start_date,
+                'end_date': end_date,
+                'interval': 'day',
+                'rsi_period': 25,
+                'stock_type': {symbol: 'kospi200' for symbol in bars_by_symbol},
+                'selected_symbols': {symbol: symbol for symbol in bars_by_symbol},
+                'buy_trading_logic': buy_trading_logic,
+                'sell_trading_logic': sell_trading_logic,
+                'initial_capital': 100_000_000,
+                'target_trade_value_krw': None,
+                'target_trade_value_ratio': 10,
+                'min_trade_value': 0,
+                'take_profit_logic': take_profit_logic,
+                'stop_loss_logic': stop_loss_logic,
+                'output_mode': args.output_mode,
+                'prep_workers': args.prep_workers,
+            }, progress_writer=lambda **kwargs: None)
+
+        elapsed = time.perf_counter() - started
+
+    peak_rss_mb, peak_child_rss_mb = _peak_rss_mb()
+
+    return {
+        'case': case,
+        'symbols': symbol_cnt,
+        'days': day_cnt,
+        'seconds': round(elapsed, 3),
+        'symbol_days_per_sec': round(symbol_cnt * day_cnt / elapsed, 1) if elapsed > 0 else None,
+        'peak_rss_mb': round(peak_rss_mb, 1),
+        'peak_child_rss_mb': round(peak_child_rss_mb, 1),
+    }
+
+
+def _run_case_process(queue, case, symbol_cnt, day_cnt, args):
+    try:
+        queue.put(run_case(case, symbol_cnt, day_cnt, args))
+    except Exception as e:
+        queue.put({'case': case, 'symbols': symbol_cnt, 'days': day_cnt, 'error': f"{type(e).__name__}: {e}"})
+
+
+def run_isolated(case, symbol_cnt, day_cnt, args):
+    """케이스별 새 프로세스(spawn)에서 실행 → 최대 RSS 가 이전 케이스 영향을 받지 않음"""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+
+    # 지표 계산 프로세스 풀을 띄울 수 있도록 daemon 이 아닌 프로세스 사용
+    process = context.Process(target=_run_case_process, args=(queue, case, symbol_cnt, day_cnt, args))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def parse_sizes(sizes):
+    """'10x250,100x500' → [(10, 250), (100, 500)]"""
+    return [tuple(int(v) for v in size.lower().split("x")) for size in sizes.split(",") if size]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시뮬레이션 엔진 오프라인 벤치마크")
+    parser.add_argument("--sizes", default="10x250,100x500,500x750", help="종목수x영업일수 목록 (쉼표 구분)")
+    parser.add_argument("--cases", default=",".join(CASES), help=f"측정할 케이스 (쉼표 구분, 가능: {','.join(CASES)})")
+    parser.add_argument("--buy-logic", default="rsi_trading")
+    parser.add_argument("--sell-logic", default="rsi_trading")
+    parser.add_argument("--output-mode", default="full", choices=["full", "sparse"])
+    parser.add_argument("--prep-workers", type=int, default=1)
+    parser.add_argument("--indicator-cache", action="store_true", help="지표 캐시 사용 (기본은 매번 계산)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="엔진 print 출력")
+    parser.add_argument("--output", help="결과 json 저장 경로")
+    args = parser.parse_args()
+
+    results = []
+    for symbol_cnt, day_cnt in parse_sizes(args.sizes):
+        for case in args.cases.split(","):
+            result = run_isolated(case, symbol_cnt, day_cnt, args)
+            results.append(result)
+
+            if 'error' in result:
+                print(f"❌ {case:<22} {symbol_cnt:>5} x {day_cnt:<5} {result['error']}")
+            else:
+                print(
+                    f"⏱️ {case:<22} {symbol_cnt:>5} x {day_cnt:<5} "
+                    f"{result['seconds']:>9.3f}s {result['symbol_days_per_sec']:>12,.1f} symbol-days/s "
+                    f"peak RSS {result['peak_rss_mb']:,.1f} MB (workers {result['peak_child_rss_mb']:,.1f} MB)"
+                )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                'created_at': datetime.now(KST).isoformat(),
+                'args': vars(args),
+                'results': results,
+            }, f, ensure_ascii=False, indent=4)
+        print(f"📦 결과 저장: {args.output}")
+
+    # 한 케이스라도 실패하면 비정상 종료 (CI 회귀 확인용)
+    if any('error' in result for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
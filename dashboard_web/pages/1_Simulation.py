@@ -31,6 +31,7 @@ from app.utils.dynamodb.model.simulation_history_model import SimulationHistory
 from app.utils.dynamodb.model.user_info_model import UserInfo
 from app.utils.dynamodb.model.auto_trading_balance_model import AutoTradingBalance
 from app.utils.utils import setup_env
+from app.utils.simulation_history import read_history_parquet
 
 
 # env 파일 로드
@@ -1129,6 +1130,34 @@ def read_json_from_presigned_url(presigned_url):
     
     return data
 
+def load_simulation_histories(result_json_data, history_presigned_url):
+    # 기존 형식(json 안의 dict 목록)이 있으면 그대로, 없으면 컬럼형 Parquet 히스토리를 DataFrame 으로 로드
+    if 'simulation_histories' in result_json_data:
+        return result_json_data['simulation_histories']
+
+    response = requests.get(history_presigned_url)
+    response.raise_for_status()
+
+    return read_history_parquet(response.content)
+
+def draw_stage_profile(stage_profile):
+    # 단계별 소요 시간 / 호출 횟수 / 바이트 (StageProfiler.to_dict 결과)
+    if not stage_profile or not stage_profile.get("stages"):
+        return
+
+    profile_df = pd.DataFrame([
+        {"stage": name, "seconds": stage["seconds"], "count": stage["count"], "KB": round(stage["bytes"] / 1024, 1)}
+        for name, stage in stage_profile["stages"].items()
+    ]).sort_values(by="seconds", ascending=False)
+
+    st.markdown("---")
+    st.subheader(f"⏱️ 단계별 소요 시간 (전체 {stage_profile['total_seconds']:,.1f}초)")
+    st.caption("prep.* 는 워커 프로세스 시간 합계라 병렬 실행 시 실제 경과 시간(symbol_prep)보다 클 수 있습니다.")
+
+    fig = px.bar(profile_df, x="seconds", y="stage", orientation="h", labels={"seconds": "초", "stage": "단계"})
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(profile_df, use_container_width=True, hide_index=True)
+
 def format_date_ymd(value):
     if isinstance(value, (datetime, date)):
         return value.strftime("%Y-%m-%d")
@@ -1155,7 +1184,10 @@ def draw_bulk_simulation_result(assets, results, simulation_settings):
     # debug 용
     # st.json(results, expanded=False)
     
-    results_df = pd.DataFrame(results)
+    # Parquet 히스토리는 DataFrame 으로 전달됨
+    history_df = results if isinstance(results, pd.DataFrame) else pd.DataFrame(results)
+
+    results_df = history_df.copy()
 
     results_df["timestamp"] = pd.to_datetime(results_df["timestamp_str"])
     results_df = results_df.sort_values(by=["timestamp", "symbol"]).reset_index(drop=True)
@@ -1174,7 +1206,7 @@ def draw_bulk_simulation_result(assets, results, simulation_settings):
     
 
     signal_logs = []
-    for row in results:
+    for row in (results if isinstance(results, list) else history_df.to_dict("records")):
         raw_reasons = row.get("signal_reasons", [])
         
         # 문자열이면 리스트로 변환
@@ -1262,7 +1294,7 @@ def draw_bulk_simulation_result(assets, results, simulation_settings):
     st.json(trading_logic_dict["sell_trading_logic"], expanded=False)
 
     ### 시뮬레이션 상세 내용 코드
-    results_df = pd.DataFrame(results)
+    results_df = history_df.copy()
 
     # 표출하고 싶은 컬럼 필터
     columns_to_show = [
@@ -1425,7 +1457,25 @@ def draw_bulk_simulation_result(assets, results, simulation_settings):
         st.metric("🧾 총 수수료", f"{total_fee:,.0f} KRW")
         st.metric("📜 총 거래세", f"{total_tax:,.0f} KRW")
 
+    # ✅ 일별 포트폴리오 평가 (equity curve)
+    if assets.get("equity_curve"):
+        equity_df = pd.DataFrame(assets["equity_curve"])
+
+        st.markdown("---")
+        st.subheader("📈 일별 포트폴리오 평가")
+
+        fig = px.line(
+            equity_df,
+            x="timestamp_str",
+            y=["portfolio_value", "krw_balance", "market_value"],
+            labels={"timestamp_str": "날짜", "value": "KRW", "variable": "구분"},
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
     # ✅ 거래 여부와 무관한 신호 발생 통계 요약
+    if assets.get("output_mode") == "sparse":
+        st.caption("ℹ️ sparse 결과는 매수/매도 행만 기록하므로 신호 통계는 실제 매매가 발생한 신호만 집계됩니다.")
+
     if signal_logs:
         df_signals_stat = pd.DataFrame(signal_logs)
         total_buy_signals = len(df_signals_stat[df_signals_stat["signal"] == "BUY_SIGNAL"])
@@ -1918,6 +1968,15 @@ def main():
         rsi_sell_threshold = st.number_input("📈 RSI 매도 임계값", min_value=0, max_value=100, value=70, step=1, key = 'rsi_sell_threshold')
         rsi_period = st.number_input("📈 RSI 기간 설정", min_value=0, max_value=100, value=25, step=1, key = 'rsi_period')
 
+        #✅ 결과 기록 방식 (sparse: 매수/매도 + 일별 포트폴리오 평가만 기록, 종목 수가 많을 때 결과 크기 감소)
+        output_mode = st.radio(
+            "🗂️ 결과 기록 방식",
+            ["full", "sparse"],
+            index=0,
+            horizontal=True,
+            key='output_mode'
+        )
+
         # 시뮬레이션 polling request 여부 확인
         polling_request = False
 
@@ -1945,6 +2004,7 @@ def main():
                 "rsi_period" : rsi_period,
                 "take_profit_logic": take_profit_logic,
                 "stop_loss_logic": stop_loss_logic,
+                "output_mode": output_mode,
             }
 
             # ✅ 저장된 설정 확인
@@ -1979,6 +2039,7 @@ def main():
                     "rsi_period": simulation_settings['rsi_period'],
                     "take_profit_logic": simulation_settings['take_profit_logic'],
                     "stop_loss_logic": simulation_settings['stop_loss_logic'],
+                    "output_mode": simulation_settings['output_mode'],
                 }
 
                 response = requests.post(url, json=payload).json()
@@ -2013,6 +2074,7 @@ def main():
 
                     if response["status"] == "completed":
                         result_presigned_url = response["result_presigned_url"]
+                        history_presigned_url = response.get("history_presigned_url")
                         break
 
                     time.sleep(5)
@@ -2022,10 +2084,11 @@ def main():
                 json_data = read_json_from_presigned_url(result_presigned_url)
 
                 assets = json_data['assets']
-                results = json_data['simulation_histories']
+                results = load_simulation_histories(json_data, history_presigned_url)
                 failed_stocks = json_data['failed_stocks']
 
                 draw_bulk_simulation_result(assets, results, simulation_settings)
+                draw_stage_profile(response.get("stage_profile") or json_data.get("stage_profile"))
     
     with tabs[3]:
         st.header("🏠 Simulation Result")
@@ -2038,7 +2101,8 @@ def main():
             "trigger_type": [],
             "trigger_user": [],
             "status": [],
-            "description": []
+            "description": [],
+            "elapsed_sec": []
         }
 
         result = list(SimulationHistory.scan())
@@ -2057,6 +2121,7 @@ def main():
             data["trigger_user"].append(row.trigger_user)
             data["status"].append(row.status)
             data["description"].append(row.description)
+            data["elapsed_sec"].append(json.loads(row.stage_profile)["total_seconds"] if row.stage_profile else None)
 
         df = pd.DataFrame(data)
         
@@ -2101,10 +2166,11 @@ def main():
                 result_json_data = read_json_from_presigned_url(result_presigned_url)
 
                 assets = result_json_data['assets']
-                simulation_histories = result_json_data['simulation_histories']
+                simulation_histories = load_simulation_histories(result_json_data, response.get("history_presigned_url"))
                 failed_stocks = result_json_data['failed_stocks']
                                 
                 draw_bulk_simulation_result(assets, simulation_histories, simulation_settings)
+                draw_stage_profile(response.get("stage_profile") or result_json_data.get("stage_profile"))
             
     with tabs[4]:
         st.header("🏠 Auto Trading Bot Balance")
@@ -2,6 +2,7 @@ import os
 import sys
 import requests
 from io import StringIO, BytesIO
+from time import perf_counter
 import boto3
 import json
 from datetime import datetime
@@ -12,6 +13,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app.utils.dynamodb.model.simulation_history_model import SimulationHistory
 from app.utils.dynamodb.crud import DynamoDBExecutor
 from app.utils.auto_trading_bot import AutoTradingBot
+from app.utils.simulation_checkpoint import SimulationCheckpointStore
+from app.utils.stage_profiler import StageProfiler
 
 
 def read_json_from_presigned_url(presigned_url):
@@ -26,7 +29,9 @@ def read_json_from_presigned_url(presigned_url):
     
     return data
 
-def save_json_to_s3(response_dict, bucket_name, save_path="simulation-results/"):
+def save_json_to_s3(response_dict, bucket_name, save_path="simulation-results/", profiler=None):
+
+    started = perf_counter()
 
     s3_client = boto3.client('s3', region_name='ap-northeast-2', endpoint_url='https://s3.ap-northeast-2.amazonaws.com', config=boto3.session.Config(signature_version='s3v4'))
 
@@ -47,17 +52,39 @@ def save_json_to_s3(response_dict, bucket_name, save_path="simulation-results/")
         Params={'Bucket': bucket_name, 'Key': s3_key},
         ExpiresIn=3600
     )
+
+    if profiler is not None:
+        profiler.add('result_json_s3', perf_counter() - started, bytes=json_bytes.getbuffer().nbytes)
+
     return presigned_url
 
 
+def save_parquet_to_s3(parquet_bytes, bucket_name, save_path):
+
+    s3_client = boto3.client('s3', region_name='ap-northeast-2', endpoint_url='https://s3.ap-northeast-2.amazonaws.com', config=boto3.session.Config(signature_version='s3v4'))
+
+    s3_client.put_object(
+        Bucket=bucket_name,
+        Key=save_path,
+        Body=BytesIO(parquet_bytes),
+        ContentType='application/vnd.apache.parquet'
+    )
+
+
 def run_job():
     simulation_data_url = os.environ.get("SIMULATION_DATA_S3_PATH")
     simulation_id = os.environ.get("simulation_id")
     result_save_path = os.environ.get("result_save_path")
 
-    simulation_data = read_json_from_presigned_url(simulation_data_url)
+    # 단계별 소요 시간 (결과 json 과 SimulationHistory.stage_profile 에 저장)
+    profiler = StageProfiler()
+
+    with profiler.stage('simulation_data_fetch'):
+        simulation_data = read_json_from_presigned_url(simulation_data_url)
 
-    auto_trading_stock = AutoTradingBot(id=simulation_data["user_id"], virtual=False)
+    # 사용자 정보 조회 + KIS 토큰 준비
+    with profiler.stage('engine_init'):
+        auto_trading_stock = AutoTradingBot(id=simulation_data["user_id"], virtual=False)
     simulation_data["start_date"] = datetime.fromisoformat(simulation_data["start_date"])
     simulation_data["end_date"] = datetime.fromisoformat(simulation_data["end_date"])
     simulation_data["simulation_id"] = simulation_id
@@ -81,21 +108,43 @@ def run_job():
         status=status
     )
 
-    result = dynamodb_executor.execute_update(data_model, pk_name)
+    with profiler.stage('dynamodb_status'):
+        result = dynamodb_executor.execute_update(data_model, pk_name)
+
+    # 같은 simulation_id 로 태스크가 다시 실행되면 S3 체크포인트부터 재개
+    checkpoint_store = SimulationCheckpointStore.from_env(simulation_id, bucket_name="sb-fsts")
+
+    assets, simulation_histories, failed_stocks = auto_trading_stock.simulate_trading_bulk(simulation_data, checkpoint_store=checkpoint_store, profiler=profiler)
 
-    assets, simulation_histories, failed_stocks = auto_trading_stock.simulate_trading_bulk(simulation_data)
+    # 히스토리는 컬럼형 Parquet(zstd)으로 별도 저장 (결과 json 과 같은 경로)
+    history_save_path = os.path.join(os.path.dirname(result_save_path), "simulation_history.parquet")
+    with profiler.stage('history_parquet_build'):
+        history_bytes = simulation_histories.to_parquet_bytes()
+    with profiler.stage('history_parquet_s3', bytes=len(history_bytes)):
+        save_parquet_to_s3(history_bytes, bucket_name="sb-fsts", save_path=history_save_path)
 
     json_dict = {
         "assets": assets,
-        "simulation_histories": simulation_histories,
+        "simulation_histories_path": history_save_path,
         # "data_df": data_df_cleaned.to_dict(orient="records") if hasattr(data_df_cleaned, "to_dict") else data_df_cleaned,
         "failed_stocks": failed_stocks
     }
 
-    simulation_result_json_url = save_json_to_s3(json_dict, bucket_name="sb-fsts", save_path=result_save_path)
+    # 기존 형식(dict 목록)도 필요하면 json 에 포함
+    if os.getenv("SIMULATION_HISTORY_JSON_ENABLED", "false").lower() == "true":
+        json_dict["simulation_histories"] = simulation_histories.to_records()
+
+    # 결과 json 에는 json 저장 직전까지의 단계별 소요 시간 기록 (최종 값은 SimulationHistory.stage_profile)
+    json_dict["stage_profile"] = profiler.to_dict()
+
+    simulation_result_json_url = save_json_to_s3(json_dict, bucket_name="sb-fsts", save_path=result_save_path, profiler=profiler)
 
     print(f'simulation_result_json_url = {simulation_result_json_url}')
 
+    # 결과 저장이 끝났으면 체크포인트 정리
+    if checkpoint_store is not None:
+        checkpoint_store.clear()
+
     # 한국 시간대
     kst = timezone("Asia/Seoul")
     # 현재 시간을 KST로 변환
@@ -108,7 +157,8 @@ def run_job():
         simulation_id=simulation_id,
         updated_at=updated_at,
         updated_at_dt=updated_at_dt,
-        status=status
+        status=status,
+        stage_profile=profiler.to_json()
     )
 
     result = dynamodb_executor.execute_update(data_model, pk_name)
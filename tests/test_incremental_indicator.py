@@ -0,0 +1,148 @@
+"""
+증분 지표 계산(IncrementalIndicators) ↔ 배치 계산(build_indicator_df) 일치 테스트
+
+- 입력 봉은 test_technical_indicator 와 같은 golden 입력 (1000봉)
+- parity_check() 가 빈 dict 여야 함 (배치 함수가 바뀌면 증분 계산도 같이 바꿔야 함)
+"""
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from pytz import timezone
+
+from app.utils import symbol_prep
+from app.utils.bar_store import OhlcBar
+from app.utils.incremental_indicator import OHLC_COLUMNS, IncrementalIndicators
+from app.utils.symbol_prep import build_indicator_df, get_indicator_df
+from app.utils.technical_indicator import TechnicalIndicator
+
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "data", "technical_indicator_golden.npz")
+
+
+@pytest.fixture(scope="module")
+def bars():
+    with np.load(GOLDEN_PATH) as data:
+        times = pd.bdate_range(end="2025-06-30", periods=len(data['input_Close']), tz=timezone("Asia/Seoul"))
+        return [
+            OhlcBar(t, o, h, l, c, v)
+            for t, o, h, l, c, v in zip(
+                times, data['input_Open'], data['input_High'], data['input_Low'], data['input_Close'], data['input_Volume']
+            )
+        ]
+
+
+def to_bar_dict(bar):
+    return {'Time': bar.time, 'Open': bar.open, 'High': bar.high, 'Low': bar.low, 'Close': bar.close, 'Volume': bar.volume}
+
+
+@pytest.mark.parametrize("n", [1, 2, 5, 11, 14, 20, 30, 200, 1000])
+def test_parity_with_batch(bars, n):
+    batch_df = build_indicator_df(bars[:n])
+    state = TechnicalIndicator().create_incremental_state(batch_df[OHLC_COLUMNS])
+
+    assert len(state) == n
+    assert state.parity_check(batch_df) == {}
+
+
+def test_parity_after_append_to_copy(bars):
+    """어제까지 상태를 복사해 오늘 봉을 append → 전체 배치 계산과 같고 원래 상태는 그대로"""
+    state = IncrementalIndicators.from_df(build_indicator_df(bars[:-1])[OHLC_COLUMNS])
+
+    live_state = state.copy()
+    live_state.append(to_bar_dict(bars[-1]))
+
+    assert live_state.parity_check(build_indicator_df(bars)) == {}
+    assert len(state) == len(bars) - 1
+    assert state.parity_check(build_indicator_df(bars[:-1])) == {}
+
+
+def test_parity_with_short_sale_columns(bars):
+    """공매도 등 추가 컬럼은 그대로 전달"""
+    index = pd.DatetimeIndex([bar.time for bar in bars]).tz_localize(None).normalize()
+    short_df = pd.DataFrame({
+        '공매도체결수량': np.arange(len(bars), dtype=float),
+        '공매도거래량비중': np.linspace(0.5, 5.0, len(bars)),
+    }, index=index)
+
+    batch_df = build_indicator_df(bars, short_df)
+    extra_columns = [column for column in batch_df.columns if column in short_df.columns]
+    state = IncrementalIndicators.from_df(batch_df[OHLC_COLUMNS + extra_columns])
+
+    assert extra_columns == list(short_df.columns)
+    assert state.parity_check(batch_df) == {}
+
+
+def test_parity_check_reports_drift(bars):
+    """배치 결과가 달라지면 불일치 컬럼/행 수를 반환"""
+    batch_df = build_indicator_df(bars[:300])
+    state = IncrementalIndicators.from_df(batch_df[OHLC_COLUMNS])
+
+    batch_df.loc[batch_df.index[-1], 'BB_Upper'] += 1
+    batch_df.loc[batch_df.index[-3:], 'rsi'] += 0.5
+
+    assert state.parity_check(batch_df) == {'BB_Upper': 1, 'rsi': 3}
+
+
+def test_to_df_keeps_none_horizontal_levels(bars):
+    """수평선 컬럼은 배치 계산과 같이 None 유지"""
+    df = IncrementalIndicators.from_df(build_indicator_df(bars[:50])[OHLC_COLUMNS]).to_df()
+
+    assert df['horizontal_high'].dtype == object
+    assert df['horizontal_high'].iloc[0] is None
+    assert df['horizontal_high'].notna().sum() > 0
+
+
+@pytest.fixture
+def intraday_bars(bars):
+    """마지막 봉이 오늘인 봉 데이터 (장중)"""
+    today = datetime.now(timezone("Asia/Seoul")).date()
+    times = pd.date_range(end=pd.Timestamp(today), periods=len(bars), freq="D", tz=timezone("Asia/Seoul"))
+    return [OhlcBar(t, bar.open, bar.high, bar.low, bar.close, bar.volume) for t, bar in zip(times, bars)]
+
+
+@pytest.fixture
+def intraday_states(monkeypatch):
+    monkeypatch.setenv("INDICATOR_CACHE_ENABLED", "false")
+    monkeypatch.setattr(symbol_prep, "_intraday_states", {})
+
+    from_df_calls = []
+    from_df = IncrementalIndicators.from_df.__func__
+
+    def counting_from_df(cls, df, **kwargs):
+        from_df_calls.append(len(df))
+        return from_df(cls, df, **kwargs)
+
+    monkeypatch.setattr(IncrementalIndicators, "from_df", classmethod(counting_from_df))
+    return from_df_calls
+
+
+def test_intraday_indicator_df_matches_batch(intraday_bars, intraday_states):
+    """장중(마지막 봉이 오늘) get_indicator_df → 증분 상태 사용, 배치 계산과 같은 DataFrame"""
+    df, cache_hit = get_indicator_df('000001', 'day', intraday_bars)
+
+    assert not cache_hit
+    assert intraday_states == [len(intraday_bars) - 1]
+    pd.testing.assert_frame_equal(df, build_indicator_df(intraday_bars), check_exact=False, rtol=1e-9, atol=1e-9)
+
+
+def test_intraday_state_is_reused_while_today_bar_changes(intraday_bars, intraday_states):
+    """오늘 봉만 바뀌면 어제까지 상태를 다시 만들지 않음"""
+    get_indicator_df('000001', 'day', intraday_bars)
+
+    last = intraday_bars[-1]
+    updated_bars = intraday_bars[:-1] + [OhlcBar(last.time, last.open, last.high * 1.02, last.low, last.high * 1.01, last.volume * 2)]
+    df, _ = get_indicator_df('000001', 'day', updated_bars)
+
+    assert intraday_states == [len(intraday_bars) - 1]
+    pd.testing.assert_frame_equal(df, build_indicator_df(updated_bars), check_exact=False, rtol=1e-9, atol=1e-9)
+
+
+def test_intraday_state_is_disabled_by_env(intraday_bars, intraday_states, monkeypatch):
+    monkeypatch.setenv("INCREMENTAL_INDICATOR_ENABLED", "false")
+
+    get_indicator_df('000001', 'day', intraday_bars)
+
+    assert intraday_states == []
@@ -0,0 +1,96 @@
+"""
+패널 모드(IndicatorPanel) ↔ 종목별 배치 계산(build_indicator_df) 일치 테스트
+
+- 입력 봉은 test_technical_indicator 와 같은 golden 입력으로 만든 여러 종목
+  (상장일/거래정지로 날짜가 서로 다른 종목, 창 크기보다 짧은 종목 포함)
+- 패널 결과는 종목별 계산과 반올림 오차 없이 정확히 같아야 함
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from pytz import timezone
+
+from app.utils.bar_store import OhlcBar
+from app.utils.indicator_dependency import resolve_indicators
+from app.utils.symbol_prep import PANEL_COLUMNS, attach_panel_indicators, build_indicator_df
+from app.utils.technical_indicator import TechnicalIndicator
+
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "data", "technical_indicator_golden.npz")
+
+PANEL_INDICATOR_COLUMNS = (
+    ['EMA_5', 'EMA_20', 'EMA_200', 'SMA_5', 'SMA_200', 'rsi']
+    + PANEL_COLUMNS['macd'] + PANEL_COLUMNS['stochastic'] + PANEL_COLUMNS['bollinger']
+)
+
+
+@pytest.fixture(scope="module")
+def bars_by_symbol():
+    with np.load(GOLDEN_PATH) as data:
+        columns = [data[f"input_{column}"] for column in ['Open', 'High', 'Low', 'Close', 'Volume']]
+
+    times = pd.bdate_range(end="2025-06-30", periods=len(columns[0]), tz=timezone("Asia/Seoul"))
+    bars = [OhlcBar(t, *values) for t, *values in zip(times, *columns)]
+
+    # 거래정지 구간 (중간 봉 30개 없음)
+    suspended = bars[100:400] + bars[430:800]
+
+    return {
+        '000001': bars,
+        '000002': suspended,
+        '000003': bars[-15:],
+    }
+
+
+def make_tasks(bars_by_symbol, required=None, rsi_period=25):
+    return [
+        {'symbol': symbol, 'ohlc_data': bars, 'short_df': None, 'rsi_period': rsi_period, 'required_indicators': required}
+        for symbol, bars in bars_by_symbol.items()
+    ]
+
+
+def test_panel_frame_matches_batch(bars_by_symbol):
+    panel = TechnicalIndicator().cal_panel_indicators(bars_by_symbol)
+
+    for symbol, bars in bars_by_symbol.items():
+        frame = panel.frame(symbol)
+        batch_df = build_indicator_df(bars)
+
+        assert frame.index.equals(batch_df.index)
+        for column in PANEL_INDICATOR_COLUMNS:
+            np.testing.assert_array_equal(
+                frame[column].to_numpy(dtype=float), batch_df[column].to_numpy(dtype=float), err_msg=f"{symbol} {column}"
+            )
+
+
+@pytest.mark.parametrize("logics", [None, ['rsi_trading']])
+def test_build_with_panel_matches_batch(bars_by_symbol, logics):
+    """attach_panel_indicators 결과를 넘긴 build_indicator_df == 종목별 계산 (필요 지표만 계산하는 경우 포함)"""
+    required = resolve_indicators(logics, logics) if logics else None
+    tasks = attach_panel_indicators(make_tasks(bars_by_symbol, required))
+
+    for task in tasks:
+        panel_df = build_indicator_df(task['ohlc_data'], required=required, panel_df=task['panel_df'])
+        pd.testing.assert_frame_equal(panel_df, build_indicator_df(task['ohlc_data'], required=required), check_exact=True)
+
+
+def test_panel_groups_by_rsi_period(bars_by_symbol):
+    tasks = make_tasks(bars_by_symbol)
+    tasks[1]['rsi_period'] = 14
+    attach_panel_indicators(tasks)
+
+    for task in tasks:
+        batch_df = build_indicator_df(task['ohlc_data'], rsi_period=task['rsi_period'])
+        np.testing.assert_array_equal(task['panel_df']['rsi'].to_numpy(dtype=float), batch_df['rsi'].to_numpy(dtype=float))
+
+
+def test_mismatched_panel_is_ignored(bars_by_symbol):
+    """봉 시각이 다른 패널 결과는 쓰지 않고 종목별로 계산"""
+    tasks = attach_panel_indicators(make_tasks(bars_by_symbol))
+    bars = bars_by_symbol['000001']
+
+    df = build_indicator_df(bars, panel_df=tasks[1]['panel_df'])
+
+    pd.testing.assert_frame_equal(df, build_indicator_df(bars), check_exact=True)
@@ -0,0 +1,105 @@
+"""
+TechnicalIndicator 벡터화 결과 golden 값 테스트
+
+- tests/data/technical_indicator_golden.npz 는 벡터화 이전(rolling.apply / df.apply / 이중 루프) 구현으로 만든 고정 값
+  · input_*: 1000봉 랜덤 워크 (보합 구간, 호가 단위 반올림으로 같은 고가/저가 반복, 거래량 0 구간 포함)
+  · full_*: 1000봉 전체 결과
+  · n{N}_horizontal_*: 앞 N봉만 넣었을 때 수평선 결과 (수평선은 이후 봉을 보므로 봉 수별로 저장)
+- WMA/볼린저/MFI 는 이전 봉만 보므로 앞 N봉 결과 = 전체 결과의 앞 N개 (golden 생성 시 N=0~1000 모두 확인)
+- 값은 반올림 오차 없이 정확히 같아야 함
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.technical_indicator import TechnicalIndicator
+
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "data", "technical_indicator_golden.npz")
+
+WMA_COLUMNS = ['WMA_5', 'WMA_20', 'WMA_200']
+BOLLINGER_COLUMNS = ['BB_Middle', 'BB_Upper', 'BB_Lower']
+MFI_COLUMNS = ['TP', 'RMF', 'Prev_TP', 'Positive_MF', 'Negative_MF', 'PMF', 'NMF', 'MFR', 'mfi']
+HORIZONTAL_COLUMNS = ['horizontal_high', 'horizontal_low']
+
+# 창 크기 경계 (WMA 5/20/200, 볼린저 20, MFI 14) 와 1~3봉
+PREFIX_SIZES = [0, 1, 2, 3, 4, 5, 6, 13, 14, 15, 16, 19, 20, 21, 199, 200, 201, 500, 1000]
+
+# 수평선 golden 이 저장된 봉 수 (lookback 5 + 5 → 11봉 경계)
+HORIZONTAL_SIZES = [0, 1, 2, 5, 6, 10, 11, 12, 16, 50]
+
+
+@pytest.fixture(scope="module")
+def golden():
+    with np.load(GOLDEN_PATH) as data:
+        return dict(data)
+
+
+def make_df(golden, n):
+    return pd.DataFrame({
+        column: golden[f"input_{column}"][:n]
+        for column in ['Open', 'High', 'Low', 'Close', 'Volume']
+    })
+
+
+def calculate(df):
+    indicator = TechnicalIndicator()
+    for period in (5, 20, 200):
+        df = indicator.cal_wma_df(df, period)
+    df = indicator.cal_bollinger_band(df)
+    df = indicator.cal_mfi_df(df)
+    df = indicator.cal_horizontal_levels_df(df)
+    return df
+
+
+def to_float(values):
+    """수평선 object 컬럼(None / 가격) → float (None 은 NaN)"""
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=float)
+
+
+@pytest.mark.parametrize("n", PREFIX_SIZES)
+def test_rolling_indicators_match_golden(golden, n):
+    df = calculate(make_df(golden, n))
+
+    for column in WMA_COLUMNS + BOLLINGER_COLUMNS + MFI_COLUMNS:
+        np.testing.assert_array_equal(df[column].to_numpy(dtype=float), golden[f"full_{column}"][:n], err_msg=column)
+
+
+@pytest.mark.parametrize("n", HORIZONTAL_SIZES)
+def test_horizontal_levels_match_golden(golden, n):
+    df = calculate(make_df(golden, n))
+
+    for column in HORIZONTAL_COLUMNS:
+        np.testing.assert_array_equal(to_float(df[column]), golden[f"n{n}_{column}"], err_msg=column)
+
+
+def test_horizontal_levels_full_match_golden(golden):
+    df = calculate(make_df(golden, 1000))
+
+    for column in HORIZONTAL_COLUMNS:
+        np.testing.assert_array_equal(to_float(df[column]), golden[f"full_{column}"], err_msg=column)
+
+    # None 이 아닌 값은 float 그대로 (이후 조건식에서 None 비교)
+    assert df['horizontal_high'].dtype == object
+    assert df['horizontal_high'].notna().sum() > 0
+
+
+@pytest.mark.parametrize("n", [0, 1, 2])
+def test_money_flow_columns_are_float(golden, n):
+    """이전 df.apply 구현은 2봉 이하에서 Positive_MF/Negative_MF 가 int 였음 → 현재는 항상 float"""
+    df = calculate(make_df(golden, n))
+
+    assert df['Positive_MF'].dtype == np.float64
+    assert df['Negative_MF'].dtype == np.float64
+
+
+@pytest.mark.parametrize("n", [0, 1, 4, 19])
+def test_short_frames_have_no_values(golden, n):
+    """창 크기보다 봉이 적으면 WMA_20/볼린저는 모두 NaN"""
+    df = calculate(make_df(golden, n))
+
+    assert len(df) == n
+    assert df['WMA_20'].isna().all()
+    assert df[BOLLINGER_COLUMNS].isna().all().all()
@@ -0,0 +1,156 @@
+"""
+벡터화 매매 신호(trading_signal.VECTORIZED_SIGNALS) ↔ 봉 단위 기존 로직 일치 테스트
+
+- 입력 봉은 test_technical_indicator 와 같은 golden 입력 (1000봉)
+- 기존 로직(AutoTradingBot._get_trading_logic_reasons → TradingLogic) 비교는 pykis / trading_logic 이 설치된 환경에서만 실행
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from pytz import timezone
+
+from app.utils import trading_signal
+from app.utils.bar_store import OhlcBar
+from app.utils.indicator_dependency import resolve_indicators
+from app.utils.level_tracker import ConfirmedLevelTracker
+from app.utils.symbol_prep import build_indicator_df
+from app.utils.technical_indicator import TechnicalIndicator
+from app.utils.trading_signal import (
+    RSI_BUY_THRESHOLD, RSI_SELL_THRESHOLD, VECTORIZED_SIGNALS, VERIFY_START_IDX, TradingSignals,
+)
+
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "data", "technical_indicator_golden.npz")
+
+# import 시점 검증 상태 (verified=True 로 등록된 로직만 있음)
+INITIAL_VERIFICATION = dict(trading_signal._verification)
+
+BUY_LOGICS = ['rsi_trading', 'rsi_trading2']
+SELL_LOGICS = ['rsi_trading', 'rsi_trading2']
+
+
+@pytest.fixture(scope="module")
+def symbol_data():
+    with np.load(GOLDEN_PATH) as data:
+        times = pd.bdate_range(end="2025-06-30", periods=len(data['input_Close']), tz=timezone("Asia/Seoul"))
+        bars = [
+            OhlcBar(t, o, h, l, c, v)
+            for t, o, h, l, c, v in zip(
+                times, data['input_Open'], data['input_High'], data['input_Low'], data['input_Close'], data['input_Volume']
+            )
+        ]
+
+    df = build_indicator_df(bars, required=resolve_indicators(BUY_LOGICS, SELL_LOGICS))
+    return {
+        'symbol': '000001',
+        'ohlc_data': bars,
+        'df': df,
+        'level_tracker': ConfirmedLevelTracker(df, lookback_next=5),
+        'high_trendline': TechnicalIndicator().cal_high_trendline_series(df),
+    }
+
+
+@pytest.fixture(autouse=True)
+def reset_verification(monkeypatch):
+    """테스트마다 검증 상태를 import 시점으로 초기화"""
+    monkeypatch.setattr(trading_signal, "_verification", dict(INITIAL_VERIFICATION))
+
+
+def rsi_crossing_bar(df):
+    """봉 단위 RSI 기준값 돌파 판정 (i 번째 봉까지의 데이터만 사용)"""
+    rsi = df['rsi']
+
+    def evaluate_bar(trade_type, trading_logics, idx):
+        previous, current = rsi.iloc[idx - 1], rsi.iloc[idx]
+        reasons = []
+        for trading_logic in trading_logics:
+            if trading_logic != 'rsi_trading':
+                continue
+            if trade_type == 'BUY' and previous < RSI_BUY_THRESHOLD < current:
+                reasons.append(trading_logic)
+            if trade_type == 'SELL' and previous > RSI_SELL_THRESHOLD > current:
+                reasons.append(trading_logic)
+        return reasons
+
+    return evaluate_bar
+
+
+def make_signals(symbol_data, evaluate_bar, buy_logics=BUY_LOGICS, sell_logics=SELL_LOGICS):
+    return TradingSignals(
+        df=symbol_data['df'],
+        trading_logics={'BUY': buy_logics, 'SELL': sell_logics},
+        evaluate_bar=evaluate_bar,
+        support=symbol_data['level_tracker'].support,
+        resistance=symbol_data['level_tracker'].resistance,
+        high_trendline=symbol_data['high_trendline'],
+    )
+
+
+def test_rsi_fixture_has_signals(symbol_data):
+    """fixture 에 매수/매도 돌파 신호가 모두 있어야 비교 의미가 있음"""
+    df = symbol_data['df']
+    args = (df, None, None, None)
+
+    assert VECTORIZED_SIGNALS['BUY']['rsi_trading'](*args).sum() > 0
+    assert VECTORIZED_SIGNALS['SELL']['rsi_trading'](*args).sum() > 0
+
+
+def test_matching_vectorized_logic_is_verified(symbol_data):
+    signals = make_signals(symbol_data, rsi_crossing_bar(symbol_data['df']))
+
+    assert 'rsi_trading' in signals.vectorized['BUY']
+    assert 'rsi_trading' in signals.vectorized['SELL']
+    assert trading_signal._verification[('BUY', 'rsi_trading')] == 'verified'
+    assert trading_signal._verification[('SELL', 'rsi_trading')] == 'verified'
+
+    # 검증이 끝나면 다음 종목은 봉 단위 로직을 호출하지 않음
+    def fail(trade_type, trading_logics, idx):
+        raise AssertionError("봉 단위 로직이 호출됨")
+
+    signals = make_signals(symbol_data, fail, buy_logics=['rsi_trading'], sell_logics=['rsi_trading'])
+    assert signals.fallback_logics == {'BUY': [], 'SELL': []}
+
+
+def test_mismatching_vectorized_logic_falls_back(symbol_data):
+    """벡터화 결과가 기존 로직과 다르면 rejected → 기존 로직 결과 사용"""
+    def never(trade_type, trading_logics, idx):
+        return []
+
+    signals = make_signals(symbol_data, never, buy_logics=['rsi_trading'], sell_logics=[])
+
+    assert trading_signal._verification[('BUY', 'rsi_trading')] == 'rejected'
+    assert signals.fallback_logics['BUY'] == ['rsi_trading']
+    assert all(signals.get_reasons('BUY', idx) == [] for idx in range(len(symbol_data['df'])))
+
+
+def test_no_signal_symbol_stays_pending(symbol_data):
+    """신호가 없는 종목(평평한 RSI)에서는 일치해도 verified 로 기록하지 않음"""
+    flat = dict(symbol_data, df=symbol_data['df'].assign(rsi=50.0))
+    make_signals(flat, rsi_crossing_bar(flat['df']), buy_logics=['rsi_trading'], sell_logics=[])
+
+    assert ('BUY', 'rsi_trading') not in trading_signal._verification
+
+
+def test_rsi_trading2_has_no_buy_signal(symbol_data):
+    """rsi_trading2 는 매수 분기에 없으므로 기존 로직 호출 없이 항상 False"""
+    signals = make_signals(symbol_data, rsi_crossing_bar(symbol_data['df']), buy_logics=['rsi_trading2'], sell_logics=[])
+
+    assert not signals.vectorized['BUY']['rsi_trading2'].any()
+
+
+def test_parity_with_trading_logic(symbol_data, monkeypatch):
+    """등록된 벡터화 로직 == 기존 봉 단위 로직 (_get_trading_logic_reasons, df.iloc[:idx + 1])"""
+    pytest.importorskip("pykis")
+    pytest.importorskip("app.utils.trading_logic")
+    from app.utils.auto_trading_bot import AutoTradingBot
+
+    vectorized = AutoTradingBot._create_trading_signals(symbol_data, BUY_LOGICS, SELL_LOGICS)
+
+    monkeypatch.setattr(trading_signal, "VECTORIZED_SIGNALS", {'BUY': {}, 'SELL': {}})
+    fallback = AutoTradingBot._create_trading_signals(symbol_data, BUY_LOGICS, SELL_LOGICS)
+
+    for trade_type in ('BUY', 'SELL'):
+        for idx in range(VERIFY_START_IDX, len(symbol_data['df'])):
+            assert vectorized.get_reasons(trade_type, idx) == fallback.get_reasons(trade_type, idx), (trade_type, idx)